@@ -0,0 +1 @@
+"""Benchmarks für SolrHelper gegen einen lokalen Solr-Ersatz (siehe run.py)."""
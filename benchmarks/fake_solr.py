@@ -0,0 +1,150 @@
+"""
+Lokaler Solr-Ersatz für Benchmarks.
+
+Ein `ThreadingHTTPServer`, der synthetische Cores (synthetic_core.py) unter
+`/solr/<core>/...` bedient: `/select`, `/get`, `/schema` (inkl. `/schema/zkversion`),
+`/config`, `/update` und `/admin/cores?action=STATUS`. Größe, Anzahl der Textfelder und
+eine künstliche Latenz (pro Anfrage, mit Streuung) sind einstellbar.
+
+Eigenständig starten:
+
+    python -m benchmarks.fake_solr --port 8983 --docs 100000 --latency 5
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .synthetic_core import SyntheticCore
+
+class FakeSolrServer:
+    """HTTP-Server mit mehreren synthetischen Cores und einstellbarer Latenz (Sekunden)."""
+
+    def __init__(self, cores: Dict[str, SyntheticCore], host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0):
+        self.cores = cores
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._requests_lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Header und Body getrennt zu senden trifft sonst auf Nagle + Delayed ACK (~40 ms)
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.handle(self)
+
+            def do_POST(self):
+                server.handle(self)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/solr'
+
+    def start(self) -> 'FakeSolrServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-solr', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'FakeSolrServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _send(self, handler: BaseHTTPRequestHandler, status: int, body: Dict[str, Any]):
+        payload = json.dumps(body).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json;charset=utf-8')
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        with self._requests_lock:
+            self.requests += 1
+        parts = urlsplit(handler.path)
+        params = parse_qs(parts.query, keep_blank_values=True)
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+        if handler.headers.get('Content-Type', '').startswith('application/x-www-form-urlencoded'):
+            params.update(parse_qs(body.decode('utf-8'), keep_blank_values=True))
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+        path = parts.path.rstrip('/').split('/')[2:]  # ohne '' und 'solr'
+        if path[:2] == ['admin', 'cores']:
+            name = params.get('core', [None])[0]
+            status = {n: {'name': n, 'startTime': c.start_time} for n, c in self.cores.items() if name in (None, n)}
+            return self._send(handler, 200, {'status': status})
+        core = self.cores.get(path[0]) if path else None
+        if core is None:
+            return self._send(handler, 404, {'error': {'msg': f'Core nicht gefunden: {parts.path}', 'code': 404}})
+        endpoint = '/'.join(path[1:])
+        if endpoint == 'select':
+            return self._send(handler, 200, core.select(params))
+        if endpoint == 'get':
+            ids = params.get('id', []) + [i for v in params.get('ids', []) for i in v.split(',') if i]
+            fl = params.get('fl', [None])[0]
+            if 'id' in params and len(params['id']) == 1 and 'ids' not in params:
+                found = core.get(ids, fl)['response']['docs']
+                return self._send(handler, 200, {'doc': found[0] if found else None})
+            return self._send(handler, 200, core.get(ids, fl))
+        if endpoint == 'schema':
+            return self._send(handler, 200, {'schema': core.schema})
+        if endpoint == 'schema/zkversion':
+            return self._send(handler, 200, {'zkversion': -1})
+        if endpoint == 'config':
+            return self._send(handler, 200, {'config': {'updateHandler': {'updateLog': {'dir': '${solr.ulog.dir:}'}}}})
+        if endpoint in ('update', 'update/json'):
+            try:
+                updates = json.loads(body) if body else []
+            except ValueError as e:
+                return self._send(handler, 400, {'error': {'msg': str(e), 'code': 400}})
+            if isinstance(updates, dict):
+                updates = [updates]
+            status, response = core.update(updates, params.get('versions', ['false'])[0] == 'true')
+            return self._send(handler, status, response)
+        return self._send(handler, 404, {'error': {'msg': f'Unbekannter Endpunkt: {endpoint}', 'code': 404}})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lokaler Solr-Ersatz mit synthetischen Cores.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8983)
+    parser.add_argument('--core', default='bench', help='Name des Cores.')
+    parser.add_argument('--docs', type=int, default=10000, help='Anzahl Dokumente.')
+    parser.add_argument('--text-fields', type=int, default=5, help='Anzahl Textfelder pro Dokument.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Künstliche Latenz pro Anfrage in ms.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Streuung der Latenz in ms (±).')
+    args = parser.parse_args()
+    core = SyntheticCore(args.core, args.docs, args.text_fields)
+    server = FakeSolrServer({args.core: core}, args.host, args.port, args.latency / 1000, args.jitter / 1000)
+    print(f'Solr-Ersatz läuft auf {server.url}/{args.core} ({args.docs} Dokumente)')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+Benchmarks für SolrClient und die wichtigsten Flask-Routen gegen den lokalen Solr-Ersatz.
+
+Jedes Szenario wird mit `--requests` Aufrufen auf `--concurrency` Threads ausgeführt.
+Gemessen werden die Latenzen pro Aufruf (p50/p95/p99, Mittelwert, Maximum) und der
+Durchsatz. Mit `--save-baseline` werden die Ergebnisse als Referenz gespeichert, mit
+`--baseline` wird gegen eine Referenz verglichen; Verschlechterungen über `--tolerance`
+führen zum Exit-Code 1.
+
+    python -m benchmarks.run --docs 20000 --latency 2 --concurrency 8
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+Standardmäßig sind Such- und Dokument-Cache abgeschaltet, damit jeder Aufruf Solr
+erreicht; `--warm` misst mit Caches.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .fake_solr import FakeSolrServer
+from .synthetic_core import SyntheticCore
+
+CORE = 'bench'
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Perzentil nach der Nearest-Rank-Methode."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), int(round(fraction * len(sorted_values) + 0.5))))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], wall: float, errors: int) -> Dict[str, Any]:
+    values = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'p50_ms': ms(percentile(values, 0.50)),
+        'p95_ms': ms(percentile(values, 0.95)),
+        'p99_ms': ms(percentile(values, 0.99)),
+        'mean_ms': ms(sum(values) / len(values)) if values else 0.0,
+        'max_ms': ms(values[-1]) if values else 0.0,
+        'throughput_rps': round(len(values) / wall, 1) if wall else 0.0,
+    }
+
+
+def run_scenario(operation: Callable[[random.Random, Any], bool], make_context: Callable[[], Any],
+                 requests: int, concurrency: int, seed: int) -> Dict[str, Any]:
+    """
+    Führt `operation` `requests`-mal auf `concurrency` Threads aus.
+
+    `make_context` liefert pro Thread einen eigenen Kontext (z.B. Flask-Test-Client).
+    `operation` gibt False zurück, wenn die Antwort fachlich fehlerhaft war.
+    """
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    local = threading.local()
+    counter = iter(range(requests))
+
+    def worker(worker_id: int):
+        nonlocal errors
+        rng = random.Random(seed + worker_id)
+        local.context = make_context()
+        own, failed = [], 0
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    break
+            started = time.perf_counter()
+            try:
+                ok = operation(rng, local.context)
+            except Exception:
+                ok = False
+            own.append(time.perf_counter() - started)
+            failed += 0 if ok else 1
+        with lock:
+            latencies.extend(own)
+            errors += failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bench') as executor:
+        list(executor.map(worker, range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def build_scenarios(client, app, core: SyntheticCore) -> Dict[str, Dict[str, Any]]:
+    """Die Szenarien: Name -> {'operation', 'context'}."""
+    schema = client.get_schema()
+    doc_ids = list(core.positions)
+    words = core.words
+
+    def term(rng: random.Random) -> str:
+        return rng.choice(words)[:4]
+
+    def client_search(rng, _):
+        results = client.search_documents(f'{term(rng)}*', 'title', rows=20, unique_key_field='id',
+                                          schema=schema, profile='results')
+        return results['numFound'] >= 0
+
+    def client_search_substring(rng, _):
+        results = client.search_documents(term(rng)[1:], 'title', rows=20, unique_key_field='id',
+                                          schema=schema, profile='results')
+        return results['numFound'] >= 0
+
+    def client_get(rng, _):
+        return client.get_document_by_id('id', rng.choice(doc_ids)) is not None
+
+    def client_update(rng, _):
+        doc_id = rng.choice(doc_ids)
+        client.update_document_field(True, 'id', doc_id, 'author_s', f'Autor {rng.randrange(500)}')
+        return True
+
+    def route_api_search(rng, test_client):
+        response = test_client.post('/api/search', data={'search_type': 'text', 'search_field': 'title',
+                                                         'search_query': f'{term(rng)}*'})
+        # Gestreamte Antworten vollständig lesen, sonst wird nur bis zum ersten Byte gemessen
+        return response.status_code == 200 and bool(response.get_data())
+
+    def route_search_results(rng, test_client):
+        response = test_client.get('/search-results', query_string={'query': f'{term(rng)}*', 'field': 'title',
+                                                                    'page': rng.randint(1, 3)})
+        return response.status_code == 200 and bool(response.get_data())
+
+    def route_record(rng, test_client):
+        return test_client.get(f'/record/{rng.choice(doc_ids)}').status_code == 200
+
+    def route_update_field(rng, test_client):
+        response = test_client.post(f'/record/{rng.choice(doc_ids)}/update-field',
+                                    data={'field_name': 'author_s', 'field_value': f'Autor {rng.randrange(500)}',
+                                          'is_multi_valued': 'false'})
+        # 409 (gleichzeitige Änderung desselben Dokuments) ist ein erwartetes Ergebnis
+        return response.status_code in (200, 409)
+
+    no_context = lambda: None
+    test_client = app.test_client
+    return {
+        'client.search_prefix': {'operation': client_search, 'context': no_context},
+        'client.search_substring': {'operation': client_search_substring, 'context': no_context},
+        'client.get_document': {'operation': client_get, 'context': no_context},
+        'client.update_field': {'operation': client_update, 'context': no_context},
+        'route.api_search': {'operation': route_api_search, 'context': test_client},
+        'route.search_results': {'operation': route_search_results, 'context': test_client},
+        'route.record': {'operation': route_record, 'context': test_client},
+        'route.update_field': {'operation': route_update_field, 'context': test_client},
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Vergleicht mit der Referenz; gibt die Verschlechterungen als Text zurück."""
+    regressions = []
+    print(f"\n{'Szenario':<26} | {'p95 (Ref.)':>12} | {'p95':>10} | {'Δ p95':>8} | {'rps (Ref.)':>10} | {'rps':>8} | {'Δ rps':>8}")
+    print('-' * 100)
+    for name, current in results['scenarios'].items():
+        reference = baseline.get('scenarios', {}).get(name)
+        if reference is None:
+            print(f"{name:<26} | {'-':>12} | {current['p95_ms']:>10} | {'neu':>8} |")
+            continue
+        p95_change = (current['p95_ms'] / reference['p95_ms'] - 1) if reference['p95_ms'] else 0.0
+        rps_change = (current['throughput_rps'] / reference['throughput_rps'] - 1) if reference['throughput_rps'] else 0.0
+        marker = ''
+        if p95_change > tolerance or rps_change < -tolerance:
+            marker = '  <-- schlechter'
+            regressions.append(f"{name}: p95 {p95_change:+.0%}, Durchsatz {rps_change:+.0%}")
+        print(f"{name:<26} | {reference['p95_ms']:>12} | {current['p95_ms']:>10} | {p95_change:>+8.0%} | "
+              f"{reference['throughput_rps']:>10} | {current['throughput_rps']:>8} | {rps_change:>+8.0%}{marker}")
+    if baseline.get('settings') != results['settings']:
+        print("\nHinweis: Die Referenz wurde mit anderen Einstellungen gemessen:", baseline.get('settings'))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks für SolrClient und Flask-Routen.')
+    parser.add_argument('--docs', type=int, default=20000, help='Dokumente im synthetischen Core.')
+    parser.add_argument('--text-fields', type=int, default=5, help='Textfelder pro Dokument.')
+    parser.add_argument('--latency', type=float, default=2.0, help='Künstliche Solr-Latenz in ms.')
+    parser.add_argument('--jitter', type=float, default=1.0, help='Streuung der Latenz in ms (±).')
+    parser.add_argument('--requests', type=int, default=300, help='Aufrufe pro Szenario.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Parallele Threads pro Szenario.')
+    parser.add_argument('--warmup', type=int, default=20, help='Ungemessene Aufrufe vor jedem Szenario.')
+    parser.add_argument('--scenario', action='append', help='Nur diese Szenarien (Präfix, mehrfach möglich).')
+    parser.add_argument('--warm', action='store_true', help='Such- und Dokument-Cache eingeschaltet lassen.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Ergebnisse zusätzlich als JSON in diese Datei schreiben.')
+    parser.add_argument('--baseline', help='Mit dieser Referenz (JSON) vergleichen.')
+    parser.add_argument('--save-baseline', help='Ergebnisse als Referenz in diese Datei schreiben.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Erlaubte Verschlechterung (0.2 = 20 %%).')
+    args = parser.parse_args(argv)
+
+    # Eigener Schema-Cache und Session-Schlüssel, damit nichts im Home-Verzeichnis des Nutzers landet
+    os.environ['SOLRHELPER_SCHEMA_CACHE_DIR'] = tempfile.mkdtemp(prefix='solrhelper-bench-')
+    os.environ.setdefault('SOLRHELPER_SECRET_KEY', 'benchmark')
+    from loguru import logger
+    from solr_helper.solr_client import get_client
+    from solr_helper.search_cache import search_cache
+    from solr_helper.web.app import create_app
+
+    print(f"Erzeuge Core mit {args.docs} Dokumenten...", file=sys.stderr)
+    core = SyntheticCore(CORE, args.docs, args.text_fields, args.seed)
+    settings = {key: getattr(args, key) for key in ('docs', 'text_fields', 'latency', 'jitter', 'requests',
+                                                     'concurrency', 'warm')}
+    results: Dict[str, Any] = {'settings': settings, 'python': platform.python_version(), 'scenarios': {}}
+
+    with FakeSolrServer({CORE: core}, latency=args.latency / 1000, jitter=args.jitter / 1000) as server:
+        client = get_client(server.url, CORE)
+        app = create_app(server.url, CORE, client.get_schema())
+        # create_app richtet das Logging ein; für die Messung nur Warnungen ausgeben
+        logger.remove()
+        logger.add(sys.stderr, level='WARNING')
+        if not args.warm:
+            search_cache.max_bytes = 0
+            client.document_cache.max_bytes = 0
+
+        for name, scenario in build_scenarios(client, app, core).items():
+            if args.scenario and not any(name.startswith(prefix) for prefix in args.scenario):
+                continue
+            # Ungemessene Aufrufe vorweg (Verbindungen, Schema-Cache, Template-Kompilierung)
+            context, rng = scenario['context'](), random.Random(args.seed - 1)
+            for _ in range(args.warmup):
+                scenario['operation'](rng, context)
+            before = server.requests
+            summary = run_scenario(scenario['operation'], scenario['context'], args.requests, args.concurrency,
+                                   args.seed)
+            summary['solr_requests'] = server.requests - before
+            results['scenarios'][name] = summary
+            print(f"{name:<26} p50 {summary['p50_ms']:>8} ms | p95 {summary['p95_ms']:>8} ms | "
+                  f"p99 {summary['p99_ms']:>8} ms | {summary['throughput_rps']:>8} req/s | "
+                  f"Solr-Anfragen {summary['solr_requests']:>5} | Fehler {summary['errors']}")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            print(f"Ergebnisse gespeichert: {path}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nVerschlechterungen gegenüber der Referenz:\n  " + "\n  ".join(regressions))
+            return 1
+        print("\nKeine Verschlechterung gegenüber der Referenz.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
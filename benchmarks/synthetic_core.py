@@ -0,0 +1,241 @@
+"""
+Synthetische Cores für den lokalen Solr-Ersatz (siehe fake_solr.py).
+
+Die Dokumente werden deterministisch aus einem Seed erzeugt, damit Läufe vergleichbar
+sind. Die Abfragesprache deckt genau das ab, was `SolrClient` erzeugt: `*:*`, `feld:*`,
+`feld:begriff*`, `feld:*begriff`, `feld:*begriff*`, `feld:"phrase"` und den
+`{!terms}`-Parser. Textfelder werden an Leerzeichen zerlegt und kleingeschrieben.
+Für jedes Feld gibt es einen invertierten Index, sodass die Antwortzeit von der
+eingestellten Latenz und nicht von der Größe des Cores bestimmt wird.
+"""
+import heapq
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+VOCABULARY_SIZE = 2000
+_QUERY = re.compile(r'^(?P<field>[\w.\-]+):(?P<value>.*)$')
+
+
+def _vocabulary(rng: random.Random) -> List[str]:
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'ber', 'buch', 'dres', 'en', 'gart', 'haus', 'lin', 'stadt']
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+class SyntheticCore:
+    """Ein Core mit erzeugten Dokumenten, Schema und invertiertem Index."""
+
+    def __init__(self, name: str, docs: int = 10000, text_fields: int = 5, seed: int = 42):
+        self.name = name
+        self.lock = threading.RLock()
+        rng = random.Random(seed)
+        self.words = _vocabulary(rng)
+        self.text_fields = ['title'] + [f'field{i}_t' for i in range(1, text_fields)]
+        self.schema = {
+            'uniqueKey': 'id',
+            'fields': [{'name': 'id', 'type': 'string', 'indexed': True, 'stored': True},
+                       {'name': '_version_', 'type': 'plong', 'indexed': False, 'stored': True, 'docValues': True},
+                       {'name': 'author_s', 'type': 'string', 'indexed': True, 'stored': True, 'docValues': True},
+                       {'name': 'year_i', 'type': 'pint', 'indexed': True, 'stored': True, 'docValues': True}]
+                      + [{'name': name, 'type': 'text', 'indexed': True, 'stored': True} for name in self.text_fields],
+            'dynamicFields': [{'name': '*_ss', 'type': 'string', 'multiValued': True, 'indexed': True, 'stored': True},
+                              {'name': '*_t', 'type': 'text', 'indexed': True, 'stored': True},
+                              {'name': '*_i', 'type': 'pint', 'indexed': True, 'stored': True}],
+            'fieldTypes': [{'name': 'string', 'class': 'solr.StrField', 'sortMissingLast': True},
+                           {'name': 'plong', 'class': 'solr.LongPointField'},
+                           {'name': 'pint', 'class': 'solr.IntPointField'},
+                           {'name': 'text', 'class': 'solr.TextField',
+                            'analyzer': {'tokenizer': {'class': 'solr.WhitespaceTokenizerFactory'},
+                                         'filters': [{'class': 'solr.LowerCaseFilterFactory'}]}}],
+            'copyFields': [],
+        }
+        self.start_time = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        self.docs: List[Dict[str, Any]] = []
+        self.positions: Dict[str, int] = {}
+        # Feld -> Token -> Positionen der Dokumente
+        self.index: Dict[str, Dict[str, Set[int]]] = {}
+        self.version = 1
+        for n in range(docs):
+            doc = {'id': f'doc{n:07d}', 'author_s': f'Autor {rng.randrange(500)}', 'year_i': rng.randint(1800, 2024),
+                   'tags_ss': rng.sample(self.words[:50], rng.randint(0, 3))}
+            for field in self.text_fields:
+                doc[field] = ' '.join(rng.choice(self.words) for _ in range(rng.randint(3, 12)))
+            self._store(doc)
+
+    # Index
+
+    @staticmethod
+    def _tokens(field: str, value: Any) -> Iterable[str]:
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            if field.endswith('_t') or field == 'title':
+                yield from str(item).lower().split()
+            else:
+                yield str(item)
+
+    def _store(self, doc: Dict[str, Any]):
+        self.version += 1
+        doc['_version_'] = self.version
+        position = self.positions.get(doc['id'])
+        if position is None:
+            position = self.positions[doc['id']] = len(self.docs)
+            self.docs.append(doc)
+        else:
+            self._unindex(position)
+            self.docs[position] = doc
+        for field, value in doc.items():
+            if field == '_version_':
+                continue
+            postings = self.index.setdefault(field, {})
+            for token in self._tokens(field, value):
+                postings.setdefault(token, set()).add(position)
+
+    def _unindex(self, position: int):
+        for field, value in self.docs[position].items():
+            postings = self.index.get(field, {})
+            for token in self._tokens(field, value):
+                postings.get(token, set()).discard(position)
+
+    # Abfragen
+
+    def match(self, query: str, params: Dict[str, List[str]]) -> Optional[Set[int]]:
+        """Positionen der Treffer; None bedeutet alle Dokumente."""
+        if query.startswith('{!terms'):
+            separator = params.get('ids_sep', [','])[0]
+            ids = params.get('ids', [''])[0].split(separator)
+            return {self.positions[i] for i in ids if i in self.positions}
+        if query in ('*:*', ''):
+            return None
+        m = _QUERY.match(query)
+        if not m:
+            return set()
+        field, value = m.group('field'), m.group('value')
+        postings = self.index.get(field, {})
+        if value == '*':
+            return set().union(*postings.values()) if postings else set()
+        if value.startswith('"') and value.endswith('"'):
+            phrase = value[1:-1].replace('\\"', '"')
+            tokens = list(self._tokens(field, phrase))
+            if not tokens:
+                return set()
+            hits = set(postings.get(tokens[0], set()))
+            for token in tokens[1:]:
+                hits &= postings.get(token, set())
+            if len(tokens) > 1:
+                hits = {p for p in hits if phrase.lower() in str(self.docs[p].get(field, '')).lower()}
+            return hits
+        term = value.replace('\\', '').lower() if field in self.text_fields or field.endswith('_t') else value.replace('\\', '')
+        leading, trailing = term.startswith('*'), term.endswith('*')
+        core = term.strip('*')
+        if leading and trailing:
+            test = lambda token: core in token
+        elif leading:
+            test = lambda token: token.endswith(core)
+        elif trailing:
+            test = lambda token: token.startswith(core)
+        else:
+            return set(postings.get(core, set()))
+        hits: Set[int] = set()
+        for token, positions in postings.items():
+            if test(token):
+                hits |= positions
+        return hits
+
+    def select(self, params: Dict[str, List[str]]) -> Dict[str, Any]:
+        first = lambda name, default=None: params.get(name, [default])[0]
+        rows, start = int(first('rows', 10)), int(first('start', 0))
+        cursor = first('cursorMark')
+        with self.lock:
+            hits = self.match(first('q', '*:*'), params)
+            for fq in params.get('fq', []):
+                filtered = self.match(fq, params)
+                if filtered is not None:
+                    hits = filtered if hits is None else hits & filtered
+            num_found = len(self.docs) if hits is None else len(hits)
+            candidates = range(len(self.docs)) if hits is None else hits
+            if cursor:
+                after = -1 if cursor == '*' else int(cursor)
+                page = heapq.nsmallest(rows, (p for p in candidates if p > after))
+            else:
+                page = heapq.nsmallest(start + rows, candidates)[start:]
+            docs = [dict(self.docs[p]) for p in page]
+        fl = first('fl')
+        if fl and fl != '*':
+            keys = [k.strip() for k in fl.split(',')]
+            docs = [{k: d[k] for k in keys if k in d} for d in docs]
+        response = {'responseHeader': {'status': 0, 'QTime': 1, 'params': {k: v[0] for k, v in params.items()}},
+                    'response': {'numFound': num_found, 'start': start, 'numFoundExact': True, 'docs': docs}}
+        if cursor:
+            response['nextCursorMark'] = str(page[-1]) if page else cursor
+        if first('hl') == 'true':
+            field = first('hl.fl', 'title')
+            field = field if field != '*' else 'title'
+            response['highlighting'] = {d['id']: {field: [f"<em>{str(self.docs[self.positions[d['id']]].get(field, ''))[:100]}</em>"]}
+                                        for d in docs}
+        if first('facet') == 'true' and 'facet.field' in params:
+            field = first('facet.field')
+            prefix = first('facet.prefix', '')
+            limit = int(first('facet.limit', 100))
+            with self.lock:
+                counts = [(token, len(positions & hits) if hits is not None else len(positions))
+                          for token, positions in self.index.get(field, {}).items() if token.startswith(prefix)]
+            counts = sorted((c for c in counts if c[1]), key=lambda c: (-c[1], c[0]))[:limit]
+            response['facet_counts'] = {'facet_fields': {field: [x for pair in counts for x in pair]}}
+        return response
+
+    def get(self, ids: List[str], fl: Optional[str] = None) -> Dict[str, Any]:
+        with self.lock:
+            docs = [dict(self.docs[self.positions[i]]) for i in ids if i in self.positions]
+        if fl and fl != '*':
+            keys = [k.strip() for k in fl.split(',')]
+            docs = [{k: d[k] for k in keys if k in d} for d in docs]
+        return {'response': {'numFound': len(docs), 'start': 0, 'docs': docs}}
+
+    def update(self, updates: List[Dict[str, Any]], versions: bool) -> Tuple[int, Dict[str, Any]]:
+        adds = []
+        with self.lock:
+            for update in updates:
+                doc_id = update.get('id')
+                position = self.positions.get(doc_id)
+                current = self.docs[position] if position is not None else None
+                expected = update.get('_version_')
+                if expected is not None and expected != 0:
+                    conflict = ((expected == 1 and current is None) or (expected < 0 and current is not None)
+                                or (expected > 1 and (current is None or current['_version_'] != expected)))
+                    if conflict:
+                        actual = current['_version_'] if current else -1
+                        return 409, {'responseHeader': {'status': 409}, 'error': {
+                            'msg': f'version conflict for {doc_id} expected={expected} actual={actual}', 'code': 409}}
+                atomic = any(isinstance(v, dict) for k, v in update.items() if k != 'id')
+                doc = dict(current or {}) if atomic else {}
+                for field, value in update.items():
+                    if field == '_version_':
+                        continue
+                    if isinstance(value, dict):
+                        if 'set' in value:
+                            if value['set'] is None:
+                                doc.pop(field, None)
+                            else:
+                                doc[field] = value['set']
+                        elif 'add' in value:
+                            existing = doc.get(field, [])
+                            existing = existing if isinstance(existing, list) else [existing]
+                            doc[field] = existing + (value['add'] if isinstance(value['add'], list) else [value['add']])
+                        elif 'inc' in value:
+                            doc[field] = doc.get(field, 0) + value['inc']
+                        elif 'remove' in value:
+                            removed = value['remove'] if isinstance(value['remove'], list) else [value['remove']]
+                            doc[field] = [v for v in doc.get(field, []) if v not in removed]
+                    else:
+                        doc[field] = value
+                self._store(doc)
+                adds.extend([doc_id, doc['_version_']])
+        response = {'responseHeader': {'status': 0, 'QTime': 1}}
+        if versions:
+            response['adds'] = adds
+        return 200, response
@@ -0,0 +1,307 @@
+"""
+Asynchroner Solr-Client auf Basis von httpx (optional: `pip install solr-helper[async]`).
+
+`SolrClient` blockiert bei jedem Aufruf (pysolr/requests). Für Funktionen mit vielen
+gleichzeitigen Anfragen - z.B. eine Suche über mehrere Verbindungen - bietet
+`AsyncSolrClient` dieselben Kernmethoden als Coroutinen über einen httpx-Verbindungspool.
+
+Der asynchrone Client teilt sich den Zustand mit dem `SolrClient` derselben Verbindung
+(`get_client()`): Commit-Strategie, Dokument-Cache, UpdateLog- und Real-Time-Get-Status
+sowie den Such-Cache. Schreibzugriffe über beide Clients halten die Caches also konsistent.
+
+Code ohne Event-Loop (Flask-Routen, CLI) startet Coroutinen per `submit()` auf einer
+gemeinsamen Hintergrund-Event-Loop und holt sich die Clients über `get_async_client()`;
+so nutzt die föderierte Suche (federated.py) einen Verbindungspool statt eines Threads
+pro Core.
+"""
+import asyncio
+import concurrent.futures
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Coroutine, Dict, Optional, Tuple, TypeVar
+
+import pysolr
+from loguru import logger
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from . import metrics
+from .search_cache import search_cache
+from .search_profiles import response_stats
+from .solr_client import get_client, update_log_enabled
+from .solr_updates import (VersionConflictError, _solr_error_message, atomic_update_doc, full_update_doc,
+                           merged_document, new_version_of)
+
+DEFAULT_MAX_CONNECTIONS = 100  # Gleichzeitige Verbindungen pro Client; weitere Anfragen warten auf einen Slot
+
+T = TypeVar('T')
+
+
+def _require_httpx():
+    if httpx is None:
+        raise ImportError("Für AsyncSolrClient wird httpx benötigt: pip install 'solr-helper[async]'")
+
+
+def _httpx_timeout(timeout) -> 'httpx.Timeout':
+    """Übersetzt das (connect, read)-Timeout aus `transport` in ein httpx.Timeout."""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+    else:
+        connect = read = timeout
+    # pool=None: Anfragen warten beliebig lange auf eine freie Verbindung statt abzubrechen
+    return httpx.Timeout(read, connect=connect, pool=None)
+
+
+async def _start_timer(request: 'httpx.Request'):
+    request.extensions['solrhelper_started'] = time.perf_counter()
+
+
+async def _observe(response: 'httpx.Response'):
+    """Response-Hook: liest den Body und erfasst die Anfrage in `metrics`."""
+    await response.aread()
+    started = response.request.extensions.get('solrhelper_started', time.perf_counter())
+    metrics.observe(str(response.request.url), time.perf_counter() - started, response.content,
+                    failed=response.status_code >= 400)
+
+
+class AsyncSolrClient:
+    """Asynchroner Client für einen Solr-Core mit gepoolten HTTP-Verbindungen."""
+
+    def __init__(self, solr_url: str = "http://localhost:8983/solr", core: str = "testing", timeout=None,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS):
+        """
+        Args:
+            solr_url (str): Basis-URL des Solr-Servers (wie bei SolrClient).
+            core (str): Name des Solr-Cores.
+            timeout (float | tuple, optional): Request-Timeout; Standard aus der Transport-Konfiguration.
+            max_connections (int): Größe des Verbindungspools.
+
+        Raises:
+            ImportError: Wenn httpx nicht installiert ist.
+        """
+        _require_httpx()
+        self.client = get_client(solr_url, core)
+        self.core_url = self.client.core_url
+        self.timeout = timeout if timeout is not None else self.client.timeout
+        self._http = httpx.AsyncClient(
+            timeout=_httpx_timeout(self.timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            # Messung wie bei TimedSession; ohne Metriken keine Hooks
+            event_hooks={'request': [_start_timer], 'response': [_observe]} if metrics.enabled else None,
+        )
+
+    async def __aenter__(self) -> 'AsyncSolrClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Schließt den Verbindungspool."""
+        await self._http.aclose()
+
+    async def _get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        response = await self._http.get(f"{self.core_url}/{path}", params={'wt': 'json', **(params or {})})
+        response.raise_for_status()
+        return response.json()
+
+    async def get_schema(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Liefert das Schema über den Schema-Cache.
+
+        Der Cache ist synchron (Festplatte) und fragt Solr nur selten; er läuft daher in
+        einem Worker-Thread, ohne die Event-Loop zu blockieren.
+        """
+        return await asyncio.to_thread(self.client.get_schema, force_refresh)
+
+    async def check_update_log_status(self) -> bool:
+        """Prüft, ob der <updateLog/> für den Core aktiviert ist (Ergebnis wird mit SolrClient geteilt)."""
+        if self.client._update_log_status is not None:
+            return self.client._update_log_status
+        try:
+            has_update_log = update_log_enabled(await self._get_json('config'))
+        except httpx.HTTPError as e:
+            logger.warning(f"Konnte Konfiguration nicht abrufen, um UpdateLog-Status zu prüfen: {e}. Nehme an, er ist deaktiviert.")
+            has_update_log = False
+        self.client._update_log_status = has_update_log
+        return has_update_log
+
+    async def get_document_by_id(self, unique_key_field: str, doc_id: str,
+                                 use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """Wie SolrClient.get_document_by_id(): Dokument-Cache, dann Real-Time-Get, sonst Suche."""
+        document_cache = self.client.document_cache
+        if use_cache:
+            doc = document_cache.get(doc_id)
+            if doc is not None:
+                return doc
+        try:
+            doc = None
+            found = False
+            if self.client._realtime_get_supported is not False:
+                response = await self._http.get(f"{self.core_url}/get", params={'id': doc_id, 'wt': 'json'})
+                if response.status_code in (400, 404) and self.client._realtime_get_supported is None:
+                    logger.info(f"Real-Time-Get ist für {self.core_url} nicht verfügbar (HTTP {response.status_code}), nutze Suche.")
+                    self.client._realtime_get_supported = False
+                else:
+                    response.raise_for_status()
+                    self.client._realtime_get_supported = True
+                    doc = response.json().get('doc')
+                    found = True
+            if not found:
+                result = await self._get_json('select', {'q': f'{unique_key_field}:"{doc_id}"'})
+                docs = result.get('response', {}).get('docs', [])
+                doc = docs[0] if docs else None
+            if doc is not None:
+                document_cache.put(doc_id, doc)
+            return doc
+        except Exception as e:
+            logger.error(f"Fehler beim Abrufen des Dokuments mit ID {doc_id}: {e}")
+            raise
+
+    async def search_documents(self, query: str, field: str = None, rows: int = 10, start: int = 0,
+                               cursor_mark: Optional[str] = None, unique_key_field: str = 'id',
+                               schema: Optional[Dict[str, Any]] = None, profile: str = 'full') -> Dict[str, Any]:
+        """Wie SolrClient.search_documents(), inklusive Query-Planung, Antwortprofil und Such-Cache."""
+        client = self.client
+        cache_key = client._search_cache_key(query, field, rows, start, cursor_mark, unique_key_field, profile)
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        generation = search_cache.generation(self.core_url)
+        try:
+            plan, response_profile, params = client._prepare_search(query, field, rows, start, cursor_mark,
+                                                                    unique_key_field, schema, profile)
+            response = await self._http.get(f"{self.core_url}/select", params={'wt': 'json', **params})
+            if response.status_code != 200:
+                raise pysolr.SolrError(f"Solr responded with an error (HTTP {response.status_code}): "
+                                       f"{_solr_error_message(response)}")
+            results = pysolr.Results(json.loads(response.content))
+            response_stats.record(response_profile.name, len(response.content), len(results.docs))
+            result = client._search_result(plan, response_profile, results, rows, start, cursor_mark, unique_key_field)
+            search_cache.put(cache_key, result, len(response.content), generation)
+            return dict(result)
+        except Exception as e:
+            logger.error(f"Fehler bei der Suche mit Query '{query}' in Feld '{field}': {e}")
+            raise
+
+    async def _send_update(self, docs, commit_params: Optional[Dict[str, str]] = None, **params) -> Dict[str, Any]:
+        """Wie SolrUpdateMixin._send_update(); Caches und Gruppen-Commit werden mit SolrClient geteilt."""
+        client = self.client
+        request_params = client._update_params(commit_params, params)
+        try:
+            response = await self._http.post(f"{self.core_url}/update", params=request_params,
+                                             content=json.dumps(docs), headers={'Content-Type': 'application/json'})
+        except httpx.HTTPError as e:
+            client.document_cache.clear()
+            raise pysolr.SolrError(f"Update an {self.core_url} fehlgeschlagen: {e}")
+        finally:
+            search_cache.invalidate(self.core_url, pending_for=client._visible_after(request_params, commit_params))
+        return client._handle_update_response(response, docs, use_policy=commit_params is None)
+
+    async def update_document_field(self, use_atomic_update: bool, unique_key_field: str, doc_id: str,
+                                    field_name: str, field_value: Any, copy_fields: list = None,
+                                    doc: Optional[Dict[str, Any]] = None,
+                                    expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Wie SolrClient.update_document_field() (atomar oder Full-Document, mit optimistischer Sperre)."""
+        try:
+            if use_atomic_update:
+                update = atomic_update_doc(unique_key_field, doc_id, field_name, field_value, expected_version)
+            else:
+                if doc is None:
+                    doc = await self.get_document_by_id(unique_key_field, doc_id, use_cache=False)
+                update = full_update_doc(doc, doc_id, field_name, field_value, copy_fields, expected_version)
+            try:
+                result = await self._send_update([update])
+            except VersionConflictError:
+                raise VersionConflictError(doc_id)
+            logger.success(f"Feld '{field_name}' für Dokument '{doc_id}' erfolgreich aktualisiert.")
+        except VersionConflictError:
+            logger.warning(f"Versionskonflikt beim Aktualisieren von '{field_name}' in Dokument '{doc_id}'")
+            self.client.document_cache.invalidate(doc_id)
+            raise
+        except Exception as e:
+            logger.error(f"Fehler beim Aktualisieren des Feldes '{field_name}' für Dokument '{doc_id}': {e}")
+            raise
+        return merged_document(doc, field_name, field_value, new_version_of(result, doc_id))
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_loop_lock = threading.Lock()
+# Clients der aktuellen Hintergrund-Loop; ein httpx.AsyncClient gehört zu der Loop, auf der er läuft
+_clients: "OrderedDict[Tuple[str, str], AsyncSolrClient]" = OrderedDict()
+MAX_POOLED_CLIENTS = 32
+
+
+def httpx_available() -> bool:
+    """Ob der asynchrone Client nutzbar ist (Extra `async`)."""
+    return httpx is not None
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Startet bei Bedarf die gemeinsame Event-Loop in einem Daemon-Thread. Aufruf unter `_loop_lock`."""
+    global _loop, _loop_pid
+    if _loop is None or _loop.is_closed():
+        _loop, _loop_pid = asyncio.new_event_loop(), os.getpid()
+        threading.Thread(target=_loop.run_forever, name='solr-async-loop', daemon=True).start()
+    return _loop
+
+
+def get_async_client(solr_url: str, core: str) -> AsyncSolrClient:
+    """
+    Gepoolter AsyncSolrClient für Coroutinen auf der Hintergrund-Loop (siehe `submit()`).
+
+    Die Clients gehören zur aktuellen Loop und werden mit ihr verworfen; höchstens
+    `MAX_POOLED_CLIENTS`, der am längsten unbenutzte wird geschlossen.
+    """
+    key = (solr_url.rstrip('/'), core)
+    with _loop_lock:
+        client = _clients.get(key)
+        if client is not None:
+            _clients.move_to_end(key)
+            return client
+        client = _clients[key] = AsyncSolrClient(solr_url, core)
+        if len(_clients) > MAX_POOLED_CLIENTS:
+            _, evicted = _clients.popitem(last=False)
+            asyncio.run_coroutine_threadsafe(evicted.aclose(), _background_loop())
+        return client
+
+
+def submit(coro: Coroutine[Any, Any, T]) -> 'concurrent.futures.Future[T]':
+    """
+    Startet eine Coroutine auf der Hintergrund-Event-Loop, für Code ohne eigene Loop (Flask, CLI).
+
+    `cancel()` auf dem zurückgegebenen Future bricht die Coroutine samt HTTP-Anfrage ab.
+    """
+    with _loop_lock:
+        loop = _background_loop()
+    return asyncio.run_coroutine_threadsafe(coro, loop)
+
+
+async def _close_clients(clients):
+    await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+
+def reset_background_loop():
+    """
+    Hält die Hintergrund-Event-Loop an und verwirft ihre Clients; die nächste Anfrage startet neu.
+
+    Nach einem Fork existiert der Thread der geerbten Loop nicht mehr, die geerbten Clients
+    hängen aber an ihr - daher werden beide gemeinsam ersetzt.
+    """
+    global _loop, _loop_lock
+    # Neue Sperre: nach einem Fork könnte die geerbte von einem nicht mehr existierenden Thread gehalten sein
+    loop, _loop, _loop_lock = _loop, None, threading.Lock()
+    clients = list(_clients.values())
+    _clients.clear()
+    if loop is None or loop.is_closed() or _loop_pid != os.getpid():
+        # Im geforkten Prozess läuft die Loop nicht mehr; ihre Clients werden nur verworfen
+        return
+    closing = asyncio.run_coroutine_threadsafe(_close_clients(clients), loop)
+    closing.add_done_callback(lambda _: loop.call_soon_threadsafe(loop.stop))
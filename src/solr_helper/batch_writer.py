@@ -0,0 +1,145 @@
+"""
+Paralleles, begrenztes Schreiben von Dokument-Batches nach Solr.
+
+Der `BatchWriter` verteilt Batches auf einen festen Thread-Pool. `submit()` blockiert,
+sobald zu viele Batches unterwegs sind, sodass der Leser nie beliebig weit vorausläuft
+und der Speicherbedarf begrenzt bleibt. Fehlgeschlagene Batches werden mit
+exponentiellem Backoff wiederholt. Scheitert ein Batch endgültig, rückt die Fortschrittsmarke
+nicht mehr über ihn hinaus (siehe `completed()`).
+
+Gegendruck (Back-Pressure): Die Zahl gleichzeitig offener Batches passt sich nach dem
+AIMD-Prinzip an. Antwortet Solr langsamer als `slow_seconds` oder schlägt ein Versuch
+fehl, wird das Fenster halbiert; jede zügige Antwort vergrößert es wieder um eins, bis
+`max_in_flight` erreicht ist.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+class BatchWriter:
+    """Thread-Pool mit begrenzter Anzahl laufender Batches, Retries und Fortschrittsmarken."""
+
+    def __init__(self, send_fn: Callable[[List[Dict[str, Any]]], Any], workers: int = 4,
+                 max_in_flight: Optional[int] = None, retries: int = 3, retry_backoff: float = 1.0,
+                 slow_seconds: Optional[float] = None):
+        """
+        Args:
+            send_fn (callable): Schreibt einen Batch, wirft bei Fehlern eine Exception.
+            workers (int): Anzahl paralleler Schreib-Threads.
+            max_in_flight (int, optional): Max. gleichzeitig offene Batches (Standard: 2 * workers).
+            retries (int): Wiederholungen pro Batch nach einem Fehler.
+            retry_backoff (float): Wartezeit vor der ersten Wiederholung in Sekunden (verdoppelt sich).
+            slow_seconds (float, optional): Antwortzeit, ab der ein Batch als Überlast gilt und das
+                                            Fenster verkleinert wird (None = feste Fenstergröße).
+        """
+        self._send_fn = send_fn
+        self.workers = workers
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='solr-writer')
+        self.max_in_flight = max_in_flight or 2 * workers
+        self.slow_seconds = slow_seconds
+        self.window = self.max_in_flight if slow_seconds is None else workers
+        self._in_flight = 0
+        self._pending: Deque[Tuple[Future, Any]] = deque()
+        self._lock = threading.Lock()
+        self._slot_free = threading.Condition(self._lock)
+        self.started_at = time.monotonic()
+        self.docs_written = 0
+        self.docs_failed = 0
+        self.failed_batches: List[Tuple[Any, str]] = []
+        # Marken erfolgreicher Batches hinter dem ersten fehlgeschlagenen (nicht im Fortschritts-Präfix)
+        self.written_after_failure: List[Any] = []
+        self._prefix_broken = False
+
+    def submit(self, batch: List[Dict[str, Any]], tag: Any = None):
+        """
+        Reiht einen Batch zum Schreiben ein; blockiert, wenn alle Slots belegt sind.
+
+        Args:
+            batch (list): Die Dokumente.
+            tag: Beliebige Marke (z.B. ein cursorMark), die über completed() zurückkommt.
+        """
+        with self._slot_free:
+            while self._in_flight >= self.window:
+                self._slot_free.wait()
+            self._in_flight += 1
+        future = self._executor.submit(self._write, batch, tag)
+        with self._lock:
+            self._pending.append((future, tag))
+
+    def _write(self, batch: List[Dict[str, Any]], tag: Any) -> bool:
+        """Schreibt einen Batch mit Wiederholungen; True, wenn er geschrieben wurde."""
+        try:
+            for attempt in range(self.retries + 1):
+                started = time.monotonic()
+                try:
+                    self._send_fn(batch)
+                    with self._lock:
+                        self.docs_written += len(batch)
+                        self._adjust_window(time.monotonic() - started)
+                    return True
+                except Exception as e:
+                    with self._lock:
+                        self._adjust_window(None)
+                    if attempt >= self.retries:
+                        logger.error(f"Batch ({len(batch)} Dokumente) endgültig fehlgeschlagen: {e}")
+                        with self._lock:
+                            self.docs_failed += len(batch)
+                            self.failed_batches.append((tag, str(e)))
+                        return False
+                    wait = self.retry_backoff * (2 ** attempt)
+                    logger.warning(f"Batch fehlgeschlagen ({e}), neuer Versuch in {wait:.1f}s")
+                    time.sleep(wait)
+        finally:
+            with self._slot_free:
+                self._in_flight -= 1
+                self._slot_free.notify_all()
+
+    def _adjust_window(self, elapsed: Optional[float]):
+        """AIMD-Anpassung des Fensters; `elapsed` None bedeutet Fehler. Aufruf unter `_lock`."""
+        if self.slow_seconds is None:
+            return
+        if elapsed is None or elapsed > self.slow_seconds:
+            if self.window > 1:
+                self.window = max(1, self.window // 2)
+                logger.warning(f"Solr antwortet langsam, reduziere parallele Batches auf {self.window}")
+        elif self.window < self.max_in_flight:
+            self.window += 1
+
+    @property
+    def docs_per_second(self) -> float:
+        """Bisheriger Durchsatz in Dokumenten pro Sekunde."""
+        elapsed = time.monotonic() - self.started_at
+        return self.docs_written / elapsed if elapsed > 0 else 0.0
+
+    def completed(self) -> List[Any]:
+        """
+        Gibt die Marken aller neu erfolgreich geschriebenen Batches zurück, in Einreichungsreihenfolge.
+
+        Da Batches parallel laufen, wird nur das lückenlose Präfix geliefert: die letzte
+        zurückgegebene Marke ist damit ein sicherer Fortsetzungspunkt. Ab dem ersten endgültig
+        fehlgeschlagenen Batch (`failed_batches`) endet das Präfix; danach erfolgreich
+        geschriebene Batches landen in `written_after_failure`.
+        """
+        tags = []
+        with self._lock:
+            while self._pending and self._pending[0][0].done():
+                future, tag = self._pending.popleft()
+                if not future.result():
+                    self._prefix_broken = True
+                elif self._prefix_broken:
+                    self.written_after_failure.append(tag)
+                else:
+                    tags.append(tag)
+        return tags
+
+    def close(self) -> List[Any]:
+        """Wartet auf alle Batches, beendet den Pool und gibt die restlichen Marken zurück."""
+        self._executor.shutdown(wait=True)
+        return self.completed()
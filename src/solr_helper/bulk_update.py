@@ -0,0 +1,386 @@
+"""
+Query-gesteuerte Massenänderungen: eine Feldoperation auf alle Treffer einer Query anwenden.
+
+Ablauf:
+1. IDs und `_version_` aller Treffer werden per cursorMark gestreamt.
+2. Pro Seite wird ein Batch atomarer Updates gebaut und über den `BatchWriter` parallel
+   geschrieben. Jedes Update trägt den gelesenen `_version_` des Dokuments: Ein Batch, den
+   Solr trotz Timeout oder 5xx schon ausgeführt hat, wird bei der Wiederholung mit 409
+   abgelehnt statt `add`/`inc` doppelt anzuwenden. Ein während des Jobs gelöschtes Dokument
+   wird übersprungen, statt als Rumpf neu angelegt zu werden; ein zwischenzeitlich
+   geändertes wird als Konflikt gezählt.
+   Ohne <updateLog/> werden die Dokumente stattdessen per Real-Time-Get gelesen, lokal
+   geändert und komplett neu indiziert - wie bei `update_document_field()`. Solr prüft dann
+   keine Versionen; nicht idempotente Operationen (`add`, `inc`) werden deshalb nie wiederholt.
+3. Erst am Ende wird einmal committet.
+
+Der Fortschritt (letzter Cursor, bis zu dem alle Batches geschrieben wurden) wird in einer
+Statusdatei unter `~/.solrhelper/bulk_jobs/` gesichert. Scheitert ein Batch endgültig, endet
+der Job; ein erneuter Start mit identischen Parametern setzt beim gesicherten Cursor fort und
+überspringt Seiten, die parallel dahinter bereits geschrieben wurden. Fehlgeschlagene Batches
+werden mit ihren ursprünglichen Versionen erneut geschickt, damit bereits angewendete
+Updates nicht ein zweites Mal greifen.
+
+Daneben schreibt jeder Job seinen Stand nach `<job_id>.status.json` im selben Verzeichnis
+(`load_job_status()`), und ein Abbruch kann über `<job_id>.cancel` angefordert werden
+(`request_cancel()`). So können alle Worker-Prozesse eines Servers den Fortschritt anzeigen
+und den Job abbrechen, nicht nur der Prozess, in dem er läuft.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .batch_writer import BatchWriter
+from .solr_updates import VersionConflictError, strip_copy_field_targets
+
+BULK_OPERATIONS = ('set', 'add', 'remove', 'inc', 'removeregex')
+IDEMPOTENT_OPERATIONS = ('set', 'remove', 'removeregex')  # Zweimal angewendet = einmal angewendet
+STATE_DIR = Path.home() / ".solrhelper" / "bulk_jobs"
+_JOB_ID = re.compile(r'^[0-9a-f]{12}$')
+_CONFLICT = re.compile(r'version conflict for (.+?) expected=-?\d+ actual=(-?\d+)')
+
+
+def apply_operation(doc: Dict[str, Any], field_name: str, operation: str, value: Any) -> Dict[str, Any]:
+    """Wendet eine Operation lokal auf ein Dokument an (für Full-Document-Updates)."""
+    current = doc.get(field_name)
+    values = value if isinstance(value, list) else [value]
+    if operation == 'set':
+        if value is None:
+            doc.pop(field_name, None)
+        else:
+            doc[field_name] = value
+    elif operation == 'add':
+        existing = [] if current is None else (current if isinstance(current, list) else [current])
+        doc[field_name] = existing + values
+    elif operation == 'remove':
+        if isinstance(current, list):
+            doc[field_name] = [v for v in current if v not in values]
+        elif current in values:
+            doc.pop(field_name, None)
+    elif operation == 'removeregex':
+        patterns = [re.compile(p) for p in values]
+        if isinstance(current, list):
+            doc[field_name] = [v for v in current if not any(p.fullmatch(str(v)) for p in patterns)]
+        elif current is not None and any(p.fullmatch(str(current)) for p in patterns):
+            doc.pop(field_name, None)
+    elif operation == 'inc':
+        doc[field_name] = (current or 0) + value
+    else:
+        raise ValueError(f"Unbekannte Operation '{operation}' (erlaubt: {', '.join(BULK_OPERATIONS)})")
+    return doc
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Existiert, gehört aber einem anderen Benutzer
+    return True
+
+
+class BulkJobStatus:
+    """Zuletzt veröffentlichter Stand eines Jobs (aus `<job_id>.status.json`), evtl. aus einem anderen Prozess."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.job_id = data['job_id']
+        self.core_url = data.get('core_url')
+        self.query = data.get('query')
+        self.field_name = data.get('field_name')
+        self.operation = data.get('operation')
+        self.status = data.get('status', 'bereit')
+        self.total = data.get('total', 0)
+        self.processed = data.get('processed', 0)
+        self.failed = data.get('failed', 0)
+        self.skipped = data.get('skipped', 0)
+        self.conflicts = data.get('conflicts', 0)
+        self.error = data.get('error')
+        self.updated_at = data.get('updated_at', 0)
+        if self.status in ('bereit', 'läuft') and not _process_alive(data.get('pid')):
+            # Der ausführende Prozess wurde beendet (Neustart, Absturz): der Job läuft nicht mehr
+            self.status = 'abgebrochen'
+            self.error = self.error or "Der ausführende Prozess wurde beendet."
+
+    @property
+    def running(self) -> bool:
+        return self.status in ('bereit', 'läuft')
+
+
+def _state_dir(state_dir: Optional[Path]) -> Path:
+    return Path(state_dir or STATE_DIR)
+
+
+def load_job_status(job_id: str, state_dir: Optional[Path] = None) -> Optional[BulkJobStatus]:
+    """Liest den veröffentlichten Stand eines Jobs; None bei unbekannter oder ungültiger ID."""
+    if not _JOB_ID.match(job_id or ''):
+        return None
+    try:
+        data = json.loads((_state_dir(state_dir) / f"{job_id}.status.json").read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    return BulkJobStatus(data)
+
+
+def list_job_status(core_url: Optional[str] = None, state_dir: Optional[Path] = None,
+                    limit: int = 20) -> List[BulkJobStatus]:
+    """Die zuletzt aktualisierten Jobs (optional nur eines Cores), neueste zuerst."""
+    jobs = []
+    for path in _state_dir(state_dir).glob('*.status.json'):
+        status = load_job_status(path.name.split('.', 1)[0], state_dir)
+        if status is not None and (core_url is None or status.core_url == core_url):
+            jobs.append(status)
+    return sorted(jobs, key=lambda job: job.updated_at, reverse=True)[:limit]
+
+
+def request_cancel(job_id: str, state_dir: Optional[Path] = None) -> bool:
+    """Fordert den Abbruch eines Jobs an, egal in welchem Prozess er läuft."""
+    if not _JOB_ID.match(job_id or ''):
+        return False
+    path = _state_dir(state_dir) / f"{job_id}.cancel"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return True
+
+
+class BulkUpdateJob:
+    """Wendet eine Feldoperation auf alle Dokumente einer Query an, fortsetzbar nach Abbruch."""
+
+    def __init__(self, client, schema: Dict[str, Any], query: str, field_name: str, operation: str,
+                 value: Any = None, batch_size: int = 500, workers: int = 4,
+                 use_atomic_update: Optional[bool] = None, state_dir: Optional[Path] = None):
+        if operation not in BULK_OPERATIONS:
+            raise ValueError(f"Unbekannte Operation '{operation}' (erlaubt: {', '.join(BULK_OPERATIONS)})")
+        self.client = client
+        self.unique_key_field = schema.get('unique_key', 'id')
+        self.copy_fields = schema.get('copy_fields', [])
+        self.query = query or '*:*'
+        self.field_name = field_name
+        self.operation = operation
+        self.value = value
+        self.batch_size = batch_size
+        self.workers = workers
+        self.use_atomic_update = (client.check_update_log_status()
+                                  if use_atomic_update is None else use_atomic_update)
+        signature = json.dumps([client.core_url, self.query, field_name, operation, value], sort_keys=True, default=str)
+        self.job_id = hashlib.sha1(signature.encode('utf-8')).hexdigest()[:12]
+        self.state_file = _state_dir(state_dir) / f"{self.job_id}.json"
+        self.status_file = self.state_file.with_name(f"{self.job_id}.status.json")
+        self.cancel_file = self.state_file.with_name(f"{self.job_id}.cancel")
+
+        self.status = 'bereit'
+        self.total = 0
+        self.processed = 0
+        self.failed = 0
+        self.skipped = 0  # Während des Jobs gelöschte Dokumente (Versionskonflikt)
+        self.conflicts = 0  # Zwischenzeitlich geänderte oder bereits geschriebene Dokumente
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._checkpoint = '*'
+        # Start-Cursor von Seiten hinter dem Fortsetzungspunkt, die schon geschrieben sind
+        self._written_ahead: set = set()
+        # Endgültig fehlgeschlagene Seiten: Start-Cursor -> (Start, nächster Cursor, [[ID, Version], ...])
+        self._failed_pages: Dict[str, Any] = {}
+
+    def _load_state(self) -> Dict[str, Any]:
+        if not self.state_file.exists():
+            return {}
+        try:
+            return json.loads(self.state_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_file.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'cursor': self._checkpoint, 'processed': self.processed, 'skipped': self.skipped,
+                                   'conflicts': self.conflicts, 'written_ahead': sorted(self._written_ahead),
+                                   'failed': list(self._failed_pages.values())}), encoding='utf-8')
+        os.replace(tmp, self.state_file)
+
+    def publish(self):
+        """Veröffentlicht den Stand für andere Prozesse (siehe `load_job_status()`)."""
+        snapshot = {'job_id': self.job_id, 'core_url': self.client.core_url, 'query': self.query,
+                    'field_name': self.field_name, 'operation': self.operation, 'status': self.status,
+                    'total': self.total, 'processed': self.processed, 'failed': self.failed,
+                    'skipped': self.skipped, 'conflicts': self.conflicts, 'error': self.error,
+                    'pid': os.getpid(), 'updated_at': time.time()}
+        try:
+            self.status_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.status_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(snapshot), encoding='utf-8')
+            os.replace(tmp, self.status_file)
+        except OSError as e:
+            logger.warning(f"Konnte Status von Bulk-Job {self.job_id} nicht schreiben: {e}")
+
+    def _cancelled(self) -> bool:
+        return self._cancel.is_set() or self.cancel_file.exists()
+
+    def _send_batch(self, items: List[List[Any]]):
+        """Schreibt eine Seite; `items` sind [ID, _version_]-Paare aus dem Cursor."""
+        if self.use_atomic_update:
+            # Die gelesene Version macht das Update einmalig: eine Wiederholung endet mit 409
+            docs = [{self.unique_key_field: doc_id, '_version_': version or 1,
+                     self.field_name: {self.operation: self.value}}
+                    for doc_id, version in items]
+        else:
+            ids = [doc_id for doc_id, _ in items]
+            docs = [strip_copy_field_targets(apply_operation(doc, self.field_name, self.operation, self.value),
+                                             self.copy_fields)
+                    for doc in self.client.get_documents_by_ids(self.unique_key_field, ids, len(ids))]
+        skipped = conflicts = 0
+        while docs:
+            try:
+                self.client.write_batch(docs)
+                break
+            except VersionConflictError as e:
+                # Solr hat die Updates vor dem abgelehnten bereits ausgeführt: ab dem nächsten weiter
+                conflict = self._conflict(docs, str(e))
+                if conflict is None:
+                    raise
+                position, deleted = conflict
+                doc_id = docs[position][self.unique_key_field]
+                if deleted:
+                    logger.info(f"Dokument '{doc_id}' existiert nicht mehr, übersprungen")
+                    skipped += 1
+                else:
+                    logger.warning(f"Dokument '{doc_id}' wurde zwischenzeitlich geändert oder schon geschrieben, "
+                                   f"übersprungen")
+                    conflicts += 1
+                docs = docs[position + 1:]
+        with self._lock:
+            self.skipped += skipped
+            self.conflicts += conflicts
+
+    def _conflict(self, docs: List[Dict[str, Any]], message: str) -> Optional[Tuple[int, bool]]:
+        """Position des von Solr abgelehnten Dokuments und ob es gelöscht ist (laut Fehlermeldung)."""
+        match = _CONFLICT.search(message)
+        if match is None:
+            return None
+        position = next((i for i, doc in enumerate(docs) if str(doc[self.unique_key_field]) == match.group(1)), None)
+        return None if position is None else (position, int(match.group(2)) <= 0)
+
+    def cancel(self):
+        """Bricht den Job nach den laufenden Batches ab; der Fortschritt bleibt erhalten."""
+        self._cancel.set()
+        request_cancel(self.job_id, self.state_file.parent)
+
+    def run(self, restart: bool = False, progress: Optional[Callable[['BulkUpdateJob'], None]] = None) -> 'BulkUpdateJob':
+        """
+        Führt den Job aus (blockierend).
+
+        Args:
+            restart (bool): Gespeicherten Fortschritt ignorieren und von vorne beginnen.
+            progress (callable, optional): Wird nach jeder gelesenen Seite mit dem Job aufgerufen.
+        """
+        state = {} if restart else self._load_state()
+        self.cancel_file.unlink(missing_ok=True)  # Abbruchwunsch eines früheren Laufs
+        cursor = self._checkpoint = state.get('cursor', '*')
+        self.processed = state.get('processed', 0)
+        self.skipped = state.get('skipped', 0)
+        self.conflicts = state.get('conflicts', 0)
+        self._written_ahead = set(state.get('written_ahead', []))
+        self._failed_pages = {page[0]: tuple(page) for page in state.get('failed', [])}
+        if cursor != '*':
+            logger.info(f"Setze Bulk-Job {self.job_id} nach {self.processed} Dokumenten fort")
+        self.status = 'läuft'
+        self.started_at = time.time()
+        idempotent = self.operation in IDEMPOTENT_OPERATIONS
+        if self._failed_pages and not (self.use_atomic_update or idempotent):
+            # Ohne Versionsprüfung ist nicht feststellbar, ob der Batch trotz Fehler geschrieben wurde
+            self.status = 'fehlgeschlagen'
+            self.error = (f"Fortsetzen nicht möglich: '{self.operation}' ohne UpdateLog könnte "
+                          f"{sum(len(page[2]) for page in self._failed_pages.values())} Dokumente doppelt ändern. "
+                          f"Betroffene Dokumente prüfen und den Job neu starten.")
+            logger.error(f"Bulk-Job {self.job_id}: {self.error}")
+            self.publish()
+            if progress:
+                progress(self)
+            return self
+        self.total = self.client.count_documents(self.query)
+        logger.info(f"Bulk-Job {self.job_id}: {self.operation} auf '{self.field_name}' für {self.total} Treffer "
+                    f"({'atomar' if self.use_atomic_update else 'Full-Document'})")
+        self.publish()
+
+        # Ohne Versionsprüfung würde eine Wiederholung add/inc ein zweites Mal anwenden
+        retry = {} if self.use_atomic_update or idempotent else {'retries': 0}
+        writer = BatchWriter(self._send_batch, workers=self.workers, **retry)
+        try:
+            resent = set()
+            if self.use_atomic_update:
+                # Zuerst die fehlgeschlagenen Seiten, mit den damals gelesenen Versionen
+                for start, next_cursor, items in list(self._failed_pages.values()):
+                    writer.submit(items, tag=(start, next_cursor, items))
+                    resent.add(start)
+            page_start = cursor
+            for docs, next_cursor in self.client.iter_cursor(self.query, self.unique_key_field,
+                                                             fl=f"{self.unique_key_field},_version_",
+                                                             rows=self.batch_size, cursor_mark=cursor):
+                if self._cancelled() or writer.failed_batches:
+                    break
+                if page_start not in self._written_ahead and page_start not in resent:
+                    items = [[str(d[self.unique_key_field]), d.get('_version_')] for d in docs]
+                    writer.submit(items, tag=(page_start, next_cursor, items))
+                page_start = next_cursor
+                self._advance(writer.completed())
+                if progress:
+                    progress(self)
+            self._advance(writer.close())
+            self.failed = writer.docs_failed
+            if writer.failed_batches:
+                # Der Fortsetzungspunkt bleibt vor dem fehlgeschlagenen Batch
+                for start, _, items in writer.written_after_failure:
+                    self._written_ahead.add(start)
+                    self._failed_pages.pop(start, None)
+                    self.processed += len(items)
+                self._failed_pages.update((tag[0], tag) for tag, _ in writer.failed_batches)
+                self._save_state()
+                self.client.commit()
+                self.status = 'fehlgeschlagen'
+                self.error = f"Batch endgültig fehlgeschlagen: {writer.failed_batches[0][1]}"
+                logger.error(f"Bulk-Job {self.job_id} nach {self.processed} Dokumenten angehalten: {self.error}")
+                return self
+            if self._cancelled():
+                # Bereits geschriebene Batches sichtbar machen; der Rest folgt beim Fortsetzen
+                self.client.commit()
+                self.status = 'abgebrochen'
+                logger.info(f"Bulk-Job {self.job_id} nach {self.processed} Dokumenten abgebrochen")
+                return self
+            self.client.commit()
+            self.state_file.unlink(missing_ok=True)
+            self.status = 'fertig'
+            logger.success(f"Bulk-Job {self.job_id}: {self.processed} Dokumente verarbeitet, "
+                           f"{self.skipped} übersprungen (gelöscht), {self.conflicts} Konflikte")
+        except Exception as e:
+            writer.close()
+            self.status = 'fehlgeschlagen'
+            self.error = str(e)
+            logger.error(f"Bulk-Job {self.job_id} fehlgeschlagen: {e}")
+        finally:
+            self.cancel_file.unlink(missing_ok=True)
+            self.publish()
+            if progress:
+                progress(self)
+        return self
+
+    def _advance(self, tags: List[Any]):
+        """Übernimmt neu geschriebene Seiten des Writers und sichert den Fortschritt."""
+        if not tags:
+            return
+        for start, _, items in tags:
+            self.processed += len(items)
+            self._failed_pages.pop(start, None)
+        self._checkpoint = tags[-1][1]
+        self._save_state()
+        self.publish()
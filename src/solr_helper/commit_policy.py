@@ -0,0 +1,114 @@
+"""
+Commit-Strategien für Schreibzugriffe und Gruppen-Commits.
+
+Ein harter Commit nach jeder Feldänderung öffnet jedes Mal einen neuen Searcher. Pro
+Verbindung kann daher gewählt werden:
+
+- `hard`:        commit=true nach jedem Update (bisheriges Verhalten)
+- `soft`:        softCommit=true (sichtbar, aber ohne fsync)
+- `within:<ms>`: commitWithin=<ms>, Solr fasst Commits selbst zusammen
+- `none`:        kein Commit, Sichtbarkeit über autoCommit/autoSoftCommit des Servers
+- `group:<ms>`:  kein Commit pro Update; ein Soft-Commit pro Zeitfenster für alle Editoren
+
+Die eigenen Änderungen bleiben dank Real-Time-Get (/get) trotzdem sofort sichtbar.
+"""
+import atexit
+import threading
+import weakref
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+COMMIT_MODES = ('hard', 'soft', 'within', 'none', 'group')
+DEFAULT_WITHIN_MS = 1000
+DEFAULT_GROUP_WINDOW_MS = 500
+
+
+class CommitPolicy:
+    """Beschreibt, wie nach einem Update committet wird."""
+
+    def __init__(self, mode: str = 'hard', interval_ms: Optional[int] = None):
+        if mode not in COMMIT_MODES:
+            raise ValueError(f"Unbekannte Commit-Strategie '{mode}' (erlaubt: {', '.join(COMMIT_MODES)})")
+        self.mode = mode
+        if interval_ms is None:
+            interval_ms = DEFAULT_GROUP_WINDOW_MS if mode == 'group' else DEFAULT_WITHIN_MS
+        self.interval_ms = int(interval_ms)
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> 'CommitPolicy':
+        """Erzeugt eine Policy aus 'hard', 'soft', 'none', 'within:5000' oder 'group:500'."""
+        if not spec:
+            return cls()
+        mode, _, interval = str(spec).strip().lower().partition(':')
+        return cls(mode, int(interval) if interval else None)
+
+    def update_params(self) -> Dict[str, str]:
+        """Commit-Parameter für den Update-Request."""
+        if self.mode == 'hard':
+            return {'commit': 'true'}
+        if self.mode == 'soft':
+            return {'softCommit': 'true'}
+        if self.mode == 'within':
+            return {'commitWithin': str(self.interval_ms)}
+        return {}
+
+    def __str__(self) -> str:
+        return f"{self.mode}:{self.interval_ms}" if self.mode in ('within', 'group') else self.mode
+
+
+class GroupCommitScheduler:
+    """
+    Fasst Commit-Wünsche mehrerer Editoren in einem Zeitfenster zu einem Commit zusammen.
+
+    Der erste Wunsch startet einen Timer; alle weiteren Wünsche bis zum Ablauf werden
+    mit demselben Commit erledigt.
+    """
+
+    def __init__(self, commit_fn: Callable[[], None], window_ms: int = DEFAULT_GROUP_WINDOW_MS):
+        self._commit_fn = commit_fn
+        self.window_ms = window_ms
+        self._timer: Optional[threading.Timer] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        _schedulers.add(self)
+
+    def request(self):
+        """Meldet ein Update an, das spätestens nach dem Zeitfenster committet werden soll."""
+        with self._lock:
+            self._pending += 1
+            if self._timer is None:
+                self._timer = threading.Timer(self.window_ms / 1000, self._fire)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _fire(self):
+        with self._lock:
+            pending, self._pending = self._pending, 0
+            self._timer = None
+        if not pending:
+            return
+        try:
+            self._commit_fn()
+            logger.debug(f"Gruppen-Commit für {pending} Update(s) durchgeführt")
+        except Exception as e:
+            logger.error(f"Gruppen-Commit fehlgeschlagen: {e}")
+
+    def flush(self):
+        """Führt einen anstehenden Commit sofort aus (z.B. beim Herunterfahren)."""
+        with self._lock:
+            timer = self._timer
+        if timer is not None:
+            timer.cancel()
+            self._fire()
+
+
+# Aktive Scheduler; schwach referenziert, damit ersetzte Strategien freigegeben werden
+_schedulers: "weakref.WeakSet[GroupCommitScheduler]" = weakref.WeakSet()
+
+
+@atexit.register
+def flush_all_schedulers():
+    """Anstehende Gruppen-Commits beim Beenden nicht verlieren."""
+    for scheduler in list(_schedulers):
+        scheduler.flush()
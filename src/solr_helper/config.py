@@ -1,4 +1,6 @@
 import os
+import secrets
+import tempfile
 from pathlib import Path
 
 try:
@@ -9,6 +11,26 @@ except ImportError:
 DEFAULT_SOLR_URL = "http://localhost:8983"
 DEFAULT_CORE = "testing"
 
+def load_config_file():
+    """
+    Lädt die erste gefundene config.toml (erst Projekt, dann Home).
+
+    Returns:
+        dict: Inhalt der Konfigurationsdatei oder ein leeres Dictionary.
+    """
+    config_paths = [
+        Path.cwd() / "config.toml",
+        Path.home() / ".solrhelper" / "config.toml"
+    ]
+    for cfg_path in config_paths:
+        if cfg_path.exists() and toml:
+            with open(cfg_path, "r") as f:
+                try:
+                    return toml.load(f)
+                except Exception:
+                    pass
+    return {}
+
 def load_solr_config(cli_solr_url=None, cli_core=None):
     """
     Lädt die Solr-Konfiguration aus CLI, ENV, config.toml oder Default.
@@ -25,20 +47,8 @@ def load_solr_config(cli_solr_url=None, cli_core=None):
         core = os.environ.get("SOLRHELPER_CORE")
 
     # 3. config.toml (erst Projekt, dann Home)
-    config = {}
     if not solr_url or not core:
-        config_paths = [
-            Path.cwd() / "config.toml",
-            Path.home() / ".solrhelper" / "config.toml"
-        ]
-        for cfg_path in config_paths:
-            if cfg_path.exists() and toml:
-                with open(cfg_path, "r") as f:
-                    try:
-                        config = toml.load(f)
-                        break
-                    except Exception:
-                        pass
+        config = load_config_file()
         if not solr_url:
             solr_url = config.get("solr_url")
         if not core:
@@ -51,3 +61,92 @@ def load_solr_config(cli_solr_url=None, cli_core=None):
         core = DEFAULT_CORE
 
     return solr_url.rstrip("/"), core
+
+HTTP_SETTINGS = {
+    # Schlüssel in [http] der config.toml -> (ENV-Variable, Typ)
+    'pool_connections': ("SOLRHELPER_HTTP_POOL_CONNECTIONS", int),
+    'pool_maxsize': ("SOLRHELPER_HTTP_POOL_MAXSIZE", int),
+    'max_retries': ("SOLRHELPER_HTTP_MAX_RETRIES", int),
+    'connect_timeout': ("SOLRHELPER_HTTP_CONNECT_TIMEOUT", float),
+    'read_timeout': ("SOLRHELPER_HTTP_READ_TIMEOUT", float),
+}
+
+def load_http_config(**cli_values):
+    """
+    Lädt Poolgrößen und Timeouts für die HTTP-Transportschicht.
+    Reihenfolge: CLI > ENV > [http] in config.toml. Nicht gesetzte Werte bleiben None,
+    dann gelten die Defaults aus solr_helper.transport.
+    """
+    file_config = load_config_file().get("http", {})
+    result = {}
+    for key, (env_name, cast) in HTTP_SETTINGS.items():
+        value = cli_values.get(key)
+        if value is None:
+            value = os.environ.get(env_name)
+        if value is None:
+            value = file_config.get(key)
+        result[key] = cast(value) if value is not None else None
+    return result
+
+def load_commit_policy(cli_value=None):
+    """
+    Lädt die Commit-Strategie für Schreibzugriffe (z.B. 'hard', 'soft', 'within:2000', 'group:500').
+    Reihenfolge: CLI > ENV > config.toml > 'hard'
+    """
+    value = cli_value or os.environ.get("SOLRHELPER_COMMIT_POLICY")
+    if not value:
+        value = load_config_file().get("commit_policy")
+    return value or "hard"
+
+def load_metrics_enabled(cli_value=False):
+    """
+    Prüft, ob Solr-Aufrufe gemessen werden sollen (/metrics, Server-Timing).
+    Reihenfolge: CLI > ENV (SOLRHELPER_METRICS=1/true/yes) > `metrics = true` in config.toml > aus
+    """
+    if cli_value:
+        return True
+    value = os.environ.get("SOLRHELPER_METRICS")
+    if value is not None:
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(load_config_file().get("metrics", False))
+
+def load_secret_key():
+    """
+    Lädt den Schlüssel, mit dem Flask die Session-Cookies signiert.
+    Reihenfolge: ENV (SOLRHELPER_SECRET_KEY) > `secret_key` in config.toml > Schlüsseldatei
+    (SOLRHELPER_SECRET_KEY_FILE, Standard ~/.solrhelper/secret_key).
+
+    Fehlt die Datei, wird ein zufälliger Schlüssel erzeugt und nur für den Benutzer lesbar
+    gespeichert. So behalten Sessions ihre Gültigkeit über Neustarts und alle Worker-Prozesse.
+    """
+    value = os.environ.get("SOLRHELPER_SECRET_KEY") or load_config_file().get("secret_key")
+    if value:
+        return value
+    path = Path(os.environ.get("SOLRHELPER_SECRET_KEY_FILE") or Path.home() / ".solrhelper" / "secret_key")
+    if path.exists():
+        return _read_secret_key(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Erst vollständig in eine temporäre Datei (Modus 0600) schreiben, dann per Hardlink
+    # veröffentlichen: Parallel startende Worker sehen keine oder die fertige Datei, und nur
+    # der erste Link gelingt.
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".secret_key.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(secrets.token_hex(32))
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.link(tmp_path, path)
+        except FileExistsError:
+            pass  # Ein anderer Prozess war schneller, sein Schlüssel gilt
+    finally:
+        os.unlink(tmp_path)
+    return _read_secret_key(path)
+
+
+def _read_secret_key(path):
+    """Liest die Schlüsseldatei; eine leere Datei würde Sessions mit leerem Schlüssel signieren."""
+    key = path.read_text(encoding="utf-8").strip()
+    if not key:
+        raise ValueError(f"Schlüsseldatei {path} ist leer. Bitte löschen, dann wird ein neuer Schlüssel erzeugt.")
+    return key
@@ -0,0 +1,128 @@
+"""
+Kopieren aller gespeicherten Dokumente von einem Core in einen anderen (z.B. für Schema-Migrationen).
+
+Mehrere Leser lesen je eine Hash-Partition des Unique Keys mit eigenem cursorMark
+(`fq={!hash workers=N worker=i partitionKeys=<uniqueKey>}`) und reichen ihre Seiten an
+einen gemeinsamen `BatchWriter` für das Ziel weiter. Unterstützt die Quelle den
+Hash-Parser nicht, wird mit einem einzelnen Leser kopiert.
+
+Vor dem Schreiben werden die Dokumente an das Zielschema angepasst: `_version_` und
+copyField-Ziele des Ziels werden entfernt, Felder, die das Zielschema nicht kennt,
+werden verworfen.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import pysolr
+from loguru import logger
+
+from .batch_writer import BatchWriter
+from .field_resolver import FieldResolver
+from .solr_updates import strip_copy_field_targets
+
+
+class SchemaMismatchError(Exception):
+    """Quell- und Zielschema sind nicht kompatibel (z.B. unterschiedlicher Unique Key)."""
+
+
+class DocumentMapper:
+    """Passt Dokumente des Quell-Cores an das Zielschema an."""
+
+    def __init__(self, source_schema: Dict[str, Any], target_schema: Dict[str, Any]):
+        self.unique_key_field = source_schema.get('unique_key', 'id')
+        target_key = target_schema.get('unique_key', 'id')
+        if self.unique_key_field != target_key:
+            raise SchemaMismatchError(f"Unique Key unterscheidet sich: Quelle '{self.unique_key_field}', Ziel '{target_key}'")
+        self.copy_fields = target_schema.get('copy_fields', [])
+        self._resolver = FieldResolver.for_schema(target_schema)
+        self._dropped: Set[str] = set()
+        self._lock = threading.Lock()
+        missing = [f['name'] for f in source_schema.get('fields', [])
+                   if f.get('stored', True) and self._resolver.resolve(f['name']) is None]
+        if missing:
+            logger.warning(f"Felder fehlen im Zielschema und werden nicht kopiert: {', '.join(missing)}")
+
+    @property
+    def dropped_fields(self) -> List[str]:
+        """Alle bisher verworfenen Feldnamen."""
+        return sorted(self._dropped)
+
+    def map(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        doc = strip_copy_field_targets(doc, self.copy_fields)
+        unknown = [name for name in doc if self._resolver.resolve(name) is None]
+        for name in unknown:
+            del doc[name]
+        if unknown:
+            new = set(unknown) - self._dropped
+            if new:
+                with self._lock:
+                    self._dropped.update(new)
+                logger.warning(f"Im Zielschema unbekannte Felder werden verworfen: {', '.join(sorted(new))}")
+        return doc
+
+
+def hash_partition_filter(unique_key_field: str, partitions: int, partition: int) -> str:
+    """Filter-Query für eine Hash-Partition des Unique Keys."""
+    return f"{{!hash workers={partitions} worker={partition} partitionKeys={unique_key_field}}}"
+
+
+def supports_hash_partitions(client, unique_key_field: str) -> bool:
+    """Prüft, ob der Quell-Core den Hash-Query-Parser unterstützt."""
+    try:
+        client.solr.search(q='*:*', rows=0, fq=hash_partition_filter(unique_key_field, 2, 0))
+        return True
+    except pysolr.SolrError as e:
+        logger.warning(f"Hash-Partitionierung nicht verfügbar ({e}), kopiere mit einem Leser")
+        return False
+
+
+def copy_core(source, target, query: str = '*:*', readers: int = 4, writers: int = 4, rows: int = 1000,
+              slow_seconds: float = 10.0, progress: Optional[Callable[[BatchWriter], None]] = None) -> BatchWriter:
+    """
+    Kopiert alle Treffer von `source` nach `target` und committet das Ziel einmal am Ende.
+
+    Args:
+        source (SolrClient): Quell-Core.
+        target (SolrClient): Ziel-Core.
+        query (str): Einschränkung der zu kopierenden Dokumente.
+        readers (int): Anzahl paralleler Leser (Hash-Partitionen).
+        writers (int): Anzahl paralleler Schreib-Threads.
+        rows (int): Dokumente pro Seite und Batch.
+        slow_seconds (float): Antwortzeit des Ziels, ab der der Gegendruck greift.
+        progress (callable, optional): Wird nach jeder gelesenen Seite mit dem Writer aufgerufen.
+
+    Raises:
+        SchemaMismatchError: Wenn die Schemas nicht kompatibel sind.
+    """
+    mapper = DocumentMapper(source.get_schema(), target.get_schema())
+    unique_key_field = mapper.unique_key_field
+    if readers > 1 and not supports_hash_partitions(source, unique_key_field):
+        readers = 1
+    writer = BatchWriter(target.write_batch, workers=writers, slow_seconds=slow_seconds)
+    progress_lock = threading.Lock()
+
+    def read_partition(partition: int) -> int:
+        params = {'fq': hash_partition_filter(unique_key_field, readers, partition)} if readers > 1 else {}
+        count = 0
+        for docs, _ in source.iter_cursor(query, unique_key_field, rows=rows, **params):
+            writer.submit([mapper.map(doc) for doc in docs])
+            count += len(docs)
+            with progress_lock:
+                writer.completed()
+                if progress:
+                    progress(writer)
+        logger.debug(f"Partition {partition + 1}/{readers}: {count} Dokumente gelesen")
+        return count
+
+    logger.info(f"Kopiere {source.core_url} -> {target.core_url} mit {readers} Leser(n) und {writers} Schreiber(n)")
+    try:
+        with ThreadPoolExecutor(max_workers=readers, thread_name_prefix='solr-reader') as pool:
+            read = sum(pool.map(read_partition, range(readers)))
+    finally:
+        writer.close()
+    if writer.docs_written:
+        target.commit()
+    logger.info(f"Kopie: {read} gelesen, {writer.docs_written} geschrieben, {writer.docs_failed} fehlgeschlagen "
+                f"({writer.docs_per_second:.0f} Dok./s)")
+    return writer
@@ -0,0 +1,239 @@
+"""
+Dokument-Cache pro Verbindung, gestempelt mit `_version_`.
+
+Die Ergebnisliste, `/record` und das Bearbeitungsformular lesen oft kurz nacheinander
+dasselbe Dokument. `SolrClient.get_document_by_id()` fragt daher zuerst diesen Cache.
+Gefüllt wird er durch Suchen mit vollständigen Dokumenten, durch Einzelabrufe und durch
+das Vorladen der ersten Treffer einer Ergebnisseite im Hintergrund.
+
+Jeder Schreibzugriff meldet die neuen Versionen der geschriebenen Dokumente
+(`versions=true`). Der Eintrag wird verworfen, und ältere Stände dieses Dokuments werden
+danach nicht mehr angenommen - auch nicht von einem Vorladen, das noch unterwegs war.
+
+Begrenzt wird der Cache über die geschätzte Größe der Dokumente (Länge als JSON), nicht
+über ihre Anzahl: Einzelne Datensätze mit tausenden Feldern sind leicht einige MB groß.
+Die Obergrenze pro Verbindung kommt aus `SOLRHELPER_DOCUMENT_CACHE_MAX_BYTES`. Von
+Dokumenten, die dafür zu groß sind, merkt sich der Cache nur die Feldnamen: `/record`
+lädt damit beim Scrollen einzelne Feldgruppen statt jedes Mal das ganze Dokument.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+MAX_VERSION_FLOORS = 1000  # Gemerkte Mindestversionen (siehe invalidate())
+MAX_FIELD_NAME_LISTS = 100  # Feldnamen zu großer Dokumente (siehe field_names())
+DEFAULT_TTL = 30.0  # Änderungen anderer Clients werden spätestens danach sichtbar
+PREFETCH_DOCUMENTS = 5  # Vorgeladene Treffer pro Ergebnisseite
+
+# Klein gehalten: Vorladen ist nur ein Bonus und soll Solr nicht zusätzlich belasten
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='solr-prefetch')
+# Schlüssel -> letzter Vorladeauftrag (siehe prefetch(replaces=...))
+_latest_prefetch: Dict[Any, Any] = {}
+_latest_lock = threading.Lock()
+
+
+def _version(doc: Dict[str, Any]) -> int:
+    try:
+        return int(doc.get('_version_') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _size(doc: Dict[str, Any]) -> int:
+    """Geschätzte Größe eines Dokuments in Bytes."""
+    return len(json.dumps(doc, ensure_ascii=False, default=str))
+
+
+class DocumentCache:
+    """LRU-Cache für vollständige Dokumente einer Verbindung, mit Ablaufzeit und Obergrenze in Bytes."""
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl: float = DEFAULT_TTL):
+        if max_bytes is None:
+            max_bytes = int(os.environ.get('SOLRHELPER_DOCUMENT_CACHE_MAX_BYTES') or DEFAULT_MAX_BYTES)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # ID -> (Ablaufzeit, Größe, Dokument)
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        # ID -> Mindestversion nach einem eigenen Schreibzugriff
+        self._floors: "OrderedDict[str, int]" = OrderedDict()
+        # ID -> (Version, Feldnamen) für Dokumente über einem Viertel der Obergrenze
+        self._names: "OrderedDict[str, Tuple[int, List[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Liefert eine Kopie des gecachten Dokuments oder None."""
+        doc_id = str(doc_id)
+        with self._lock:
+            entry = self._entries.get(doc_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(doc_id)
+                self.hits += 1
+                return dict(entry[2])
+            if entry is not None:
+                self._remove(doc_id)
+            self.misses += 1
+            return None
+
+    def __contains__(self, doc_id: str) -> bool:
+        entry = self._entries.get(str(doc_id))
+        return entry is not None and entry[0] > time.monotonic()
+
+    def put(self, doc_id: str, doc: Dict[str, Any]):
+        """
+        Speichert ein vollständiges Dokument.
+
+        Ein Stand, der älter ist als der gecachte oder als die zuletzt selbst geschriebene
+        Version, wird ignoriert. Von einem Dokument über einem Viertel der Obergrenze werden
+        nur die Feldnamen gespeichert.
+        """
+        doc_id = str(doc_id)
+        version = _version(doc)
+        size = _size(doc)
+        with self._lock:
+            floor = self._floors.get(doc_id)
+            if floor is not None and version < floor:
+                return
+            entry = self._entries.get(doc_id)
+            if entry is not None and version < _version(entry[2]):
+                return
+            if entry is not None:
+                self._remove(doc_id)
+            self._names.pop(doc_id, None)
+            if self.max_bytes <= 0 or size > self.max_bytes // 4:
+                # Einzelne Riesendokumente würden den Cache leerfegen
+                self._names[doc_id] = (version, list(doc))
+                while len(self._names) > MAX_FIELD_NAME_LISTS:
+                    self._names.popitem(last=False)
+                return
+            self._entries[doc_id] = (time.monotonic() + self.ttl, size, dict(doc))
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def field_names(self, doc_id: str, version: Optional[int] = None) -> Optional[List[str]]:
+        """
+        Die Feldnamen eines Dokuments, ohne es zu laden; None, wenn sie nicht bekannt sind.
+
+        Mit `version` nur für genau diesen Stand (z.B. den, mit dem `/record` gerendert wurde).
+        """
+        doc_id = str(doc_id)
+        with self._lock:
+            entry = self._entries.get(doc_id)
+            if entry is not None and entry[0] > time.monotonic():
+                known_version, names = _version(entry[2]), list(entry[2])
+            elif doc_id in self._names:
+                known_version, names = self._names[doc_id]
+                self._names.move_to_end(doc_id)
+            else:
+                return None
+        if version is not None and known_version != version:
+            return None
+        return list(names)
+
+    def _remove(self, doc_id: str):
+        _, size, _ = self._entries.pop(doc_id)
+        self._bytes -= size
+
+    def put_many(self, docs: Iterable[Dict[str, Any]], unique_key_field: str):
+        for doc in docs:
+            if doc.get(unique_key_field) is not None:
+                self.put(doc[unique_key_field], doc)
+
+    def invalidate(self, doc_id: str, new_version: Optional[int] = None):
+        """Verwirft ein Dokument; mit `new_version` werden ältere Stände künftig abgelehnt."""
+        doc_id = str(doc_id)
+        with self._lock:
+            if doc_id in self._entries:
+                self._remove(doc_id)
+            self._names.pop(doc_id, None)
+            if new_version:
+                self._floors[doc_id] = int(new_version)
+                self._floors.move_to_end(doc_id)
+                while len(self._floors) > MAX_VERSION_FLOORS:
+                    self._floors.popitem(last=False)
+
+    def written(self, adds: List[Any]):
+        """Verarbeitet die 'adds'-Liste einer Update-Antwort ([id, version, id, version, ...])."""
+        for i in range(0, len(adds) - 1, 2):
+            self.invalidate(adds[i], adds[i + 1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._names.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'field_name_lists': len(self._names),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+def prefetch(client, unique_key_field: str, doc_ids: Iterable[str], replaces: Any = None):
+    """
+    Lädt die noch nicht gecachten Dokumente im Hintergrund mit einer Anfrage in den Cache.
+
+    Mit `replaces` ersetzt der Auftrag einen noch wartenden Auftrag mit demselben Schlüssel
+    (z.B. die Live-Vorschau: nur die Treffer der letzten Eingabe werden noch geladen).
+    Fehler werden nur protokolliert - der spätere Einzelabruf funktioniert trotzdem.
+    """
+    missing = [str(doc_id) for doc_id in doc_ids if doc_id is not None and str(doc_id) not in client.document_cache]
+    if not missing:
+        return None
+
+    def load():
+        try:
+            docs = list(client.get_documents_by_ids(unique_key_field, missing, batch_size=len(missing)))
+            client.document_cache.put_many(docs, unique_key_field)
+            logger.debug(f"{len(docs)} Dokumente für {client.core_url} vorgeladen")
+        except Exception as e:
+            logger.warning(f"Vorladen von Dokumenten für {client.core_url} fehlgeschlagen: {e}")
+
+    future = _prefetch_pool.submit(load)
+    if replaces is not None:
+        with _latest_lock:
+            previous = _latest_prefetch.get(replaces)
+            _latest_prefetch[replaces] = future
+        if previous is not None:
+            previous.cancel()  # Läuft er schon, wird er normal beendet
+        future.add_done_callback(lambda done: _forget_prefetch(replaces, done))
+    return future
+
+
+def _forget_prefetch(key: Any, future):
+    with _latest_lock:
+        if _latest_prefetch.get(key) is future:
+            del _latest_prefetch[key]
+
+
+def reset_prefetch_pool():
+    """
+    Verwirft ausstehende Vorladeaufträge und ersetzt den Pool.
+
+    Nach einem Fork hat der Kindprozess keine Worker-Threads, der geerbte Pool würde
+    Aufträge nie ausführen. Beim Herunterfahren werden so keine neuen Aufträge mehr begonnen.
+    """
+    global _prefetch_pool
+    old, _prefetch_pool = _prefetch_pool, ThreadPoolExecutor(max_workers=2, thread_name_prefix='solr-prefetch')
+    with _latest_lock:
+        _latest_prefetch.clear()
+    old.shutdown(wait=False, cancel_futures=True)
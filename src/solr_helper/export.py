@@ -0,0 +1,129 @@
+"""
+Streamender Export aller Treffer einer Query als JSONL oder CSV.
+
+Die Dokumente werden per cursorMark seitenweise gelesen (`SolrClient.iter_cursor()`) und
+sofort geschrieben; es liegt nie mehr als eine Seite im Speicher, unabhängig von der
+Größe des Cores. Optional wird die Ausgabe mit gzip komprimiert.
+"""
+import csv
+import gzip
+import io
+import json
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO
+
+from loguru import logger
+
+EXPORT_FORMATS = ('jsonl', 'csv')
+
+
+def open_output(path: Optional[str], compress: bool = False) -> TextIO:
+    """Öffnet das Ausgabeziel ('-' oder None = stdout), bei `compress` bzw. '.gz' mit gzip."""
+    compress = compress or bool(path and path.endswith('.gz'))
+    if not path or path == '-':
+        if compress:
+            return io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb'),
+                                    encoding='utf-8', newline='')
+        return sys.stdout
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def csv_columns(fl: Optional[str], schema: Dict[str, Any], first_page: List[Dict[str, Any]]) -> List[str]:
+    """
+    Bestimmt die CSV-Spalten.
+
+    Eine explizite Feldliste ohne Wildcards wird direkt übernommen. Sonst werden die
+    gespeicherten Schema-Felder plus alle Felder der ersten Seite (dynamische Felder) verwendet.
+    """
+    requested = [f.strip() for f in (fl or '').split(',') if f.strip()]
+    if requested and not any('*' in f for f in requested):
+        return requested
+    columns = [f['name'] for f in schema.get('fields', [])
+               if f.get('stored', True) and f['name'] != '_version_']
+    seen = set(columns)
+    for doc in first_page:
+        for name in doc:
+            if name not in seen:
+                seen.add(name)
+                columns.append(name)
+    return columns
+
+
+class JsonlWriter:
+    """Schreibt ein Dokument pro Zeile als JSON."""
+
+    def __init__(self, out: TextIO):
+        self.out = out
+
+    def write_page(self, docs: List[Dict[str, Any]]):
+        self.out.write(''.join(json.dumps(doc, ensure_ascii=False) + '\n' for doc in docs))
+
+
+class CsvWriter:
+    """Schreibt Dokumente als CSV; Mehrfachwerte werden mit `separator` verbunden."""
+
+    def __init__(self, out: TextIO, columns: List[str], separator: str = '|'):
+        self.columns = columns
+        self.separator = separator
+        self._known = set(columns)
+        self._warned = set()
+        self._writer = csv.writer(out)
+        self._writer.writerow(columns)
+
+    def _cell(self, value: Any) -> str:
+        if value is None:
+            return ''
+        if isinstance(value, list):
+            return self.separator.join(str(v) for v in value)
+        return str(value)
+
+    def write_page(self, docs: List[Dict[str, Any]]):
+        for doc in docs:
+            unknown = doc.keys() - self._known - self._warned
+            if unknown:
+                # Spalten stehen nach der Kopfzeile fest; spät auftauchende Felder fehlen im CSV
+                logger.warning(f"Felder nicht in den CSV-Spalten, werden ausgelassen: {', '.join(sorted(unknown))}")
+                self._warned.update(unknown)
+        self._writer.writerows([self._cell(doc.get(c)) for c in self.columns] for doc in docs)
+
+
+def export_documents(client, out: TextIO, schema: Dict[str, Any], query: str = '*:*', fmt: str = 'jsonl',
+                     fl: Optional[str] = None, rows: int = 1000, filter_queries: Iterable[str] = (),
+                     separator: str = '|', progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Exportiert alle Treffer einer Query in `out` und gibt die Anzahl der Dokumente zurück.
+
+    Args:
+        client (SolrClient): Quelle.
+        out (TextIO): Ziel, z.B. aus open_output().
+        schema (dict): Schema des Cores (Unique Key, CSV-Spalten).
+        fmt (str): 'jsonl' oder 'csv'.
+        fl (str, optional): Feldliste (Projektion).
+        rows (int): Dokumente pro Seite.
+        filter_queries (Iterable[str]): Zusätzliche fq-Parameter.
+        progress (callable, optional): Wird nach jeder Seite mit der bisherigen Anzahl aufgerufen.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unbekanntes Format '{fmt}' (erlaubt: {', '.join(EXPORT_FORMATS)})")
+    unique_key_field = schema.get('unique_key', 'id')
+    params = {'fq': list(filter_queries)} if filter_queries else {}
+    writer = JsonlWriter(out) if fmt == 'jsonl' else None
+    count = 0
+    for docs, _ in client.iter_cursor(query or '*:*', unique_key_field, fl=fl, rows=rows, **params):
+        for doc in docs:
+            # Interne Versionsnummer gehört nicht in den Export, außer sie wurde angefordert
+            if not fl or '_version_' not in fl:
+                doc.pop('_version_', None)
+        if writer is None:
+            writer = CsvWriter(out, csv_columns(fl, schema, docs), separator)
+        writer.write_page(docs)
+        count += len(docs)
+        if progress:
+            progress(count)
+    if writer is None and fmt == 'csv':
+        # Leeres Ergebnis: zumindest die Kopfzeile schreiben
+        CsvWriter(out, csv_columns(fl, schema, []), separator)
+    out.flush()
+    return count
@@ -0,0 +1,145 @@
+"""
+Föderierte Suche: dieselbe Feldsuche parallel über mehrere Verbindungen/Cores.
+
+Jeder Core wird mit seinem (gecachten) Schema und dem Query-Planer durchsucht. Mit httpx
+(Extra `async`) laufen alle Suchen als Coroutinen des `AsyncSolrClient` auf der gemeinsamen
+Hintergrund-Loop, ohne Thread pro Core; sonst in einem Thread-Pool. Die Ergebnisse werden
+in der Reihenfolge geliefert, in der die Cores antworten. Überschreitet ein Core seine
+Zeitvorgabe, wird er als zu langsam gemeldet, statt die übrigen Ergebnisse aufzuhalten;
+seine Anfrage wird abgebrochen (im Thread-Pool läuft sie bis zum Request-Timeout weiter).
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional
+
+from loguru import logger
+
+from .async_client import get_async_client, httpx_available, submit
+from .field_resolver import FieldResolver
+from .solr_client import get_client
+
+DEFAULT_TIMEOUT = 5.0   # Sekunden pro Core
+DEFAULT_ROWS = 5        # Treffer pro Core
+MAX_WORKERS = 16
+
+
+class FederatedTarget:
+    """Ein zu durchsuchender Core (aus den gespeicherten Verbindungen)."""
+
+    def __init__(self, url: str, core: str, name: Optional[str] = None, connection_id: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        self.url = url
+        self.core = core
+        self.name = name or f"{core} @ {url}"
+        self.connection_id = connection_id
+        self.timeout = timeout
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FederatedTarget':
+        if not data.get('url') or not data.get('core'):
+            raise ValueError("Jedes Ziel braucht 'url' und 'core'")
+        return cls(data['url'], data['core'], data.get('name'),
+                   str(data['id']) if data.get('id') is not None else None, data.get('timeout'))
+
+
+class TargetResult:
+    """
+    Ergebnis eines Cores.
+
+    status: 'ok', 'no_field' (Feld im Schema unbekannt), 'timeout' oder 'error'.
+    """
+
+    def __init__(self, target: FederatedTarget, status: str, results: Optional[Dict[str, Any]] = None,
+                 unique_key_field: str = 'id', error: Optional[str] = None, elapsed: float = 0.0):
+        self.target = target
+        self.status = status
+        self.results = results or {'docs': [], 'numFound': 0, 'highlighting': {}}
+        self.unique_key_field = unique_key_field
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def num_found(self) -> int:
+        return self.results.get('numFound', 0)
+
+
+async def _search_target_async(target: FederatedTarget, query: str, field: str, rows: int) -> TargetResult:
+    started = time.monotonic()
+    try:
+        client = get_async_client(target.url, target.core)
+        schema = await client.get_schema()
+        unique_key_field = schema.get('unique_key', 'id')
+        if FieldResolver.for_schema(schema).resolve(field) is None:
+            return TargetResult(target, 'no_field', unique_key_field=unique_key_field,
+                                elapsed=time.monotonic() - started)
+        results = await client.search_documents(query, field, rows=rows, unique_key_field=unique_key_field,
+                                                schema=schema, profile='results')
+        return TargetResult(target, 'ok', results, unique_key_field, elapsed=time.monotonic() - started)
+    except Exception as e:
+        logger.warning(f"Föderierte Suche in '{target.name}' fehlgeschlagen: {e}")
+        return TargetResult(target, 'error', error=str(e), elapsed=time.monotonic() - started)
+
+
+def _search_target(target: FederatedTarget, query: str, field: str, rows: int) -> TargetResult:
+    """Wie `_search_target_async()`, blockierend für den Thread-Pool (ohne httpx)."""
+    started = time.monotonic()
+    try:
+        client = get_client(target.url, target.core)
+        schema = client.get_schema()
+        unique_key_field = schema.get('unique_key', 'id')
+        if FieldResolver.for_schema(schema).resolve(field) is None:
+            return TargetResult(target, 'no_field', unique_key_field=unique_key_field,
+                                elapsed=time.monotonic() - started)
+        results = client.search_documents(query, field, rows=rows, unique_key_field=unique_key_field,
+                                          schema=schema, profile='results')
+        return TargetResult(target, 'ok', results, unique_key_field, elapsed=time.monotonic() - started)
+    except Exception as e:
+        logger.warning(f"Föderierte Suche in '{target.name}' fehlgeschlagen: {e}")
+        return TargetResult(target, 'error', error=str(e), elapsed=time.monotonic() - started)
+
+
+def federated_search(targets: List[FederatedTarget], query: str, field: str, rows: int = DEFAULT_ROWS,
+                     timeout: float = DEFAULT_TIMEOUT) -> Iterator[TargetResult]:
+    """
+    Durchsucht alle `targets` parallel und liefert die Ergebnisse, sobald sie vorliegen.
+
+    Args:
+        targets (list): Die zu durchsuchenden Cores.
+        query (str): Suchbegriff (wie in der normalen Suche, inkl. `begriff*` / `*begriff`).
+        field (str): Suchfeld; Cores ohne dieses Feld werden mit Status 'no_field' gemeldet.
+        rows (int): Treffer pro Core.
+        timeout (float): Zeitvorgabe pro Core in Sekunden (falls das Ziel keine eigene hat).
+
+    Yields:
+        TargetResult: Je Core genau ein Ergebnis; zu langsame Cores zuletzt mit Status 'timeout'.
+    """
+    if not targets:
+        return
+    executor = None
+    started = time.monotonic()
+    if httpx_available():
+        pending = {submit(_search_target_async(target, query, field, rows)): target for target in targets}
+    else:
+        executor = ThreadPoolExecutor(max_workers=min(len(targets), MAX_WORKERS), thread_name_prefix='solr-federated')
+        pending = {executor.submit(_search_target, target, query, field, rows): target for target in targets}
+    deadlines = {future: started + (target.timeout or timeout) for future, target in pending.items()}
+    logger.info(f"Föderierte Suche nach '{query}' in Feld '{field}' über {len(targets)} Cores")
+    try:
+        while pending:
+            remaining = max(0.0, min(deadlines[future] for future in pending) - time.monotonic())
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                yield future.result()
+            now = time.monotonic()
+            for future in [f for f in pending if deadlines[f] <= now]:
+                target = pending.pop(future)
+                future.cancel()
+                logger.warning(f"Föderierte Suche: '{target.name}' antwortet nicht innerhalb der Zeitvorgabe")
+                yield TargetResult(target, 'timeout', elapsed=now - started)
+    finally:
+        # Nicht auf langsame Cores warten; noch nicht gestartete bzw. laufende Coroutinen entfallen
+        for future in pending:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,123 @@
+"""
+Vorberechneter Index zur Auflösung von Feldnamen auf Felddefinitionen eines Schemas.
+
+Statische Felder werden per Dictionary (O(1)) aufgelöst. Dynamische Felder werden nach
+den Solr-Regeln aufgelöst: Muster sind entweder `*_x` (Suffix) oder `x_*` (Präfix),
+längere Muster haben Vorrang, bei gleicher Länge gewinnt die Reihenfolge im Schema.
+Dafür gibt es je Musterlänge einen Suffix- und einen Präfix-Index, sodass pro Lookup nur
+so viele Dictionary-Zugriffe nötig sind, wie es unterschiedliche Musterlängen gibt.
+"""
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+MEMO_LIMIT = 50000  # Max. gemerkte Auflösungen pro Schema
+
+
+class FieldResolver:
+    """Löst Feldnamen gegen statische und dynamische Felder eines Schemas auf."""
+
+    def __init__(self, schema: Dict[str, Any]):
+        fields = schema.get('fields', [])
+        self._static: Dict[str, Dict[str, Any]] = {f['name']: f for f in fields}
+        self.sorted_static_fields: List[Dict[str, Any]] = sorted(self._static.values(), key=lambda f: f['name'])
+        self.static_names: List[str] = [f['name'] for f in self.sorted_static_fields]
+        self.dynamic_fields: List[Dict[str, Any]] = list(schema.get('dynamic_fields', []))
+
+        # Länge des Literal-Teils -> {Literal: (Schema-Position, Definition)}
+        self._suffixes: Dict[int, Dict[str, Tuple[int, Dict[str, Any]]]] = {}
+        self._prefixes: Dict[int, Dict[str, Tuple[int, Dict[str, Any]]]] = {}
+        self._catch_all: Optional[Dict[str, Any]] = None
+        for position, df in enumerate(self.dynamic_fields):
+            pattern = df['name']
+            if pattern == '*':
+                self._catch_all = self._catch_all or df
+            elif pattern.startswith('*'):
+                self._suffixes.setdefault(len(pattern) - 1, {}).setdefault(pattern[1:], (position, df))
+            elif pattern.endswith('*'):
+                self._prefixes.setdefault(len(pattern) - 1, {}).setdefault(pattern[:-1], (position, df))
+            else:
+                logger.warning(f"Ungültiges dynamisches Feldmuster ignoriert: {pattern}")
+        self._lengths = sorted(set(self._suffixes) | set(self._prefixes), reverse=True)
+        self._memo: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._memo_lock = threading.Lock()
+
+    def match_dynamic(self, field_name: str) -> Optional[Dict[str, Any]]:
+        """Gibt das dynamische Feldmuster zurück, das Solr für `field_name` verwenden würde."""
+        name_length = len(field_name)
+        for length in self._lengths:
+            if length > name_length:
+                continue
+            candidates = []
+            suffix_hit = self._suffixes.get(length, {}).get(field_name[-length:])
+            if suffix_hit:
+                candidates.append(suffix_hit)
+            prefix_hit = self._prefixes.get(length, {}).get(field_name[:length])
+            if prefix_hit:
+                candidates.append(prefix_hit)
+            if candidates:
+                return min(candidates, key=lambda c: c[0])[1]
+        return self._catch_all
+
+    def resolve(self, field_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Liefert die Felddefinition aus dem Schema (statisch oder dynamisch) oder None.
+
+        Für dynamische Felder wird eine Kopie des Musters mit dem konkreten Namen
+        zurückgegeben. Ergebnisse werden gemerkt.
+        """
+        try:
+            return self._memo[field_name]
+        except KeyError:
+            pass
+        definition = self._static.get(field_name)
+        if definition is None:
+            pattern = self.match_dynamic(field_name)
+            if pattern is not None:
+                definition = dict(pattern, name=field_name)
+                logger.debug(f"Dynamisches Feld erkannt: {field_name} -> {pattern['name']}")
+        with self._memo_lock:
+            if len(self._memo) >= MEMO_LIMIT:
+                self._memo.clear()
+            self._memo[field_name] = definition
+        return definition
+
+    def get_field_definition(self, field_name: str, doc: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Wie resolve(), aber mit Fallback-Definition für Felder, die nur im Dokument existieren."""
+        definition = self.resolve(field_name)
+        if definition is not None:
+            return definition
+        logger.debug(f"Unbekanntes Feld im Dokument: {field_name}")
+        return {
+            'name': field_name,
+            'type': 'unbekannt (nur im Dokument)',
+            'multiValued': isinstance(doc.get(field_name) if doc else None, list),
+            'stored': True
+        }
+
+    def is_static(self, field_name: str) -> bool:
+        """True, wenn `field_name` ein explizit definiertes Schema-Feld ist."""
+        return field_name in self._static
+
+    @classmethod
+    def for_schema(cls, schema: Dict[str, Any]) -> 'FieldResolver':
+        """Liefert den (einmal pro Schema-Objekt gebauten) Resolver für `schema`."""
+        key = id(schema)
+        entry = _resolvers.get(key)
+        # Das Schema wird mitgespeichert, damit eine recycelte id() nicht falsch trifft
+        if entry is not None and entry[0] is schema:
+            return entry[1]
+        resolver = cls(schema)
+        with _resolvers_lock:
+            if len(_resolvers) >= RESOLVER_LIMIT:
+                _resolvers.pop(next(iter(_resolvers)))
+            _resolvers[key] = (schema, resolver)
+        logger.debug(f"FieldResolver gebaut: {len(resolver.static_names)} statische, "
+                     f"{len(resolver.dynamic_fields)} dynamische Felder")
+        return resolver
+
+
+RESOLVER_LIMIT = 16  # Anzahl gleichzeitig gehaltener Schemas (z.B. mehrere Verbindungen)
+_resolvers: Dict[int, Tuple[Dict[str, Any], FieldResolver]] = {}
+_resolvers_lock = threading.Lock()
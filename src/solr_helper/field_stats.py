@@ -0,0 +1,239 @@
+"""
+Werteverteilung und Kennzahlen eines Feldes (häufigste Werte, Kardinalität, fehlende
+Werte, Wertebereiche).
+
+Die Art des Feldes (Text, String, Zahl, Datum, Boolean) wird aus dem Feldtyp im
+gecachten Schema bestimmt. Daraus ergibt sich, welche Abschnitte berechnet werden:
+
+- `values`: häufigste Werte per `facet.field`, fehlende Werte per `facet.missing`
+- `stats`: `stats.field` mit min/max, Anzahl und HyperLogLog-Kardinalität (nicht für Textfelder)
+- `ranges`: Histogramm per `facet.range` zwischen min und max (nur Zahlen und Datumswerte)
+
+Jeder Abschnitt ist eine eigene Solr-Anfrage. `FieldStatsCache` führt sie parallel in
+einem Thread-Pool aus, gleiche Anfragen laufen nur einmal gleichzeitig, und Ergebnisse
+bleiben `STATS_TTL` Sekunden gültig. `ranges` wartet auf das Ergebnis von `stats`.
+"""
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from loguru import logger
+
+from .field_resolver import FieldResolver
+
+STATS_TTL = 120.0       # Sekunden
+TOP_VALUES = 20
+RANGE_BUCKETS = 10
+MAX_WORKERS = 8
+SECTIONS = ('values', 'stats', 'ranges')
+
+_NUMERIC_CLASSES = ('IntPointField', 'LongPointField', 'FloatPointField', 'DoublePointField',
+                    'TrieIntField', 'TrieLongField', 'TrieFloatField', 'TrieDoubleField')
+_DATE_CLASSES = ('DatePointField', 'TrieDateField', 'DateRangeField')
+_INTEGER_CLASSES = ('IntPointField', 'LongPointField', 'TrieIntField', 'TrieLongField')
+
+# Datums-Schrittweiten für das Histogramm: (Solr-Gap, Rundung des Starts, Dauer in Sekunden)
+_DATE_GAPS = [('+1HOUR', 'HOUR', 3600), ('+1DAY', 'DAY', 86400), ('+1MONTH', 'MONTH', 30 * 86400),
+              ('+1YEAR', 'YEAR', 365 * 86400), ('+10YEARS', 'YEAR', 3650 * 86400)]
+
+
+def field_kind(schema: Dict[str, Any], field_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Ordnet `field_name` anhand des Schemas ein.
+
+    Returns:
+        Dict oder None (Feld unbekannt): name, type, kind ('text', 'string', 'numeric',
+        'date', 'boolean', 'other'), integer, multiValued, indexed, docValues.
+    """
+    definition = FieldResolver.for_schema(schema).resolve(field_name)
+    if definition is None:
+        return None
+    field_type = next((t for t in schema.get('field_types', []) if t.get('name') == definition.get('type')), {})
+    type_class = field_type.get('class', '').rsplit('.', 1)[-1]
+    if type_class in _NUMERIC_CLASSES:
+        kind = 'numeric'
+    elif type_class in _DATE_CLASSES:
+        kind = 'date'
+    elif type_class == 'StrField':
+        kind = 'string'
+    elif type_class in ('TextField', 'SortableTextField'):
+        kind = 'text'
+    elif type_class == 'BoolField':
+        kind = 'boolean'
+    else:
+        kind = 'other'
+    return {
+        'name': field_name,
+        'type': definition.get('type', 'unknown'),
+        'type_class': type_class or 'unbekannt',
+        'kind': kind,
+        'integer': type_class in _INTEGER_CLASSES,
+        'multiValued': definition.get('multiValued', field_type.get('multiValued', False)),
+        'indexed': definition.get('indexed', field_type.get('indexed', True)),
+        'docValues': definition.get('docValues', field_type.get('docValues', False)),
+        'dynamic': not FieldResolver.for_schema(schema).is_static(field_name),
+    }
+
+
+def sections_for(info: Dict[str, Any]) -> Tuple[str, ...]:
+    """Die für diese Feldart sinnvollen Abschnitte (keine, wenn das Feld weder indiziert ist noch DocValues hat)."""
+    if not info['indexed'] and not info['docValues']:
+        return ()
+    if info['kind'] in ('numeric', 'date'):
+        return SECTIONS
+    if info['kind'] == 'text':
+        return ('values',)
+    return ('values', 'stats')
+
+
+def top_values(client, info: Dict[str, Any], limit: int = TOP_VALUES) -> Dict[str, Any]:
+    """Häufigste Werte (bei Textfeldern: Terme) und Anzahl Dokumente ohne Wert."""
+    field = info['name']
+    results = client.solr.search(q='*:*', rows=0, **{
+        'facet': 'true', 'facet.field': field, 'facet.limit': limit, 'facet.mincount': 1,
+        'facet.missing': 'true'})
+    flat = results.facets.get('facet_fields', {}).get(field, [])
+    values, missing = [], 0
+    for i in range(0, len(flat) - 1, 2):
+        # facet.missing hängt die fehlenden Werte als Eintrag mit Wert null an
+        if flat[i] is None:
+            missing = flat[i + 1]
+        else:
+            values.append((str(flat[i]), flat[i + 1]))
+    total = results.hits
+    return {'total': total, 'missing': missing, 'with_value': total - missing, 'values': values,
+            'tokenized': info['kind'] == 'text'}
+
+
+def field_statistics(client, info: Dict[str, Any]) -> Dict[str, Any]:
+    """min/max, Anzahl Werte, fehlende Werte und geschätzte Kardinalität per stats.field."""
+    field = info['name']
+    flags = 'min=true max=true count=true missing=true cardinality=true'
+    if info['kind'] == 'numeric':
+        flags += ' mean=true'
+    results = client.solr.search(q='*:*', rows=0, **{'stats': 'true', 'stats.field': f'{{!{flags}}}{field}'})
+    stats = (results.stats or {}).get('stats_fields', {}).get(field) or {}
+    return {'min': stats.get('min'), 'max': stats.get('max'), 'count': stats.get('count', 0),
+            'missing': stats.get('missing', 0), 'cardinality': stats.get('cardinality'),
+            'mean': stats.get('mean')}
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
+
+
+def range_params(info: Dict[str, Any], minimum: Any, maximum: Any, buckets: int = RANGE_BUCKETS) -> Optional[Dict[str, Any]]:
+    """Start, Ende und Schrittweite für facet.range, oder None wenn es keinen Bereich gibt."""
+    if minimum is None or maximum is None:
+        return None
+    if info['kind'] == 'date':
+        start, end = _parse_date(minimum), _parse_date(maximum)
+        span = (end - start).total_seconds()
+        gap, rounding, _ = next((g for g in _DATE_GAPS if span / g[2] <= buckets * 3), _DATE_GAPS[-1])
+        return {'start': f'{minimum}/{rounding}', 'end': f'{maximum}+1{rounding}', 'gap': gap}
+    span = float(maximum) - float(minimum)
+    if span <= 0:
+        return None
+    gap = span / buckets
+    if info['integer']:
+        gap = max(1, math.ceil(gap))
+        return {'start': int(minimum), 'end': int(maximum) + 1, 'gap': gap}
+    return {'start': float(minimum), 'end': float(maximum) + gap, 'gap': gap}
+
+
+def value_ranges(client, info: Dict[str, Any], statistics: Dict[str, Any]) -> Dict[str, Any]:
+    """Histogramm zwischen min und max per facet.range."""
+    field = info['name']
+    params = range_params(info, statistics.get('min'), statistics.get('max'))
+    if params is None:
+        return {'buckets': [], 'gap': None}
+    results = client.solr.search(q='*:*', rows=0, **{
+        'facet': 'true', 'facet.range': field, f'f.{field}.facet.range.start': params['start'],
+        f'f.{field}.facet.range.end': params['end'], f'f.{field}.facet.range.gap': params['gap'],
+        f'f.{field}.facet.range.other': 'none'})
+    counts = results.facets.get('facet_ranges', {}).get(field, {}).get('counts', [])
+    buckets = [(str(counts[i]), counts[i + 1]) for i in range(0, len(counts) - 1, 2)]
+    return {'buckets': buckets, 'gap': params['gap']}
+
+
+class FieldStatsCache:
+    """
+    Berechnet Abschnitte parallel und cacht sie pro (Core, Feld, Abschnitt) mit TTL.
+
+    Gecacht werden Futures: eine laufende Berechnung wird von weiteren Anfragen geteilt
+    statt wiederholt. Fehlgeschlagene Berechnungen werden nicht gecacht.
+    """
+
+    def __init__(self, ttl: float = STATS_TTL, max_workers: int = MAX_WORKERS):
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='solr-field-stats')
+        self._entries: Dict[Tuple[str, str, str], Tuple[float, Future]] = {}
+        self._lock = threading.Lock()
+
+    def _submit(self, key: Tuple[str, str, str], fn: Callable[[], Any]) -> Future:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, future = entry
+                failed = future.done() and future.exception() is not None
+                if not failed and (not future.done() or expires > now):
+                    return future
+            future = self._executor.submit(fn)
+            self._entries[key] = (now + self.ttl, future)
+            # Abgelaufene Einträge bei Gelegenheit entfernen
+            for stale in [k for k, (expires, f) in self._entries.items() if f.done() and expires <= now]:
+                del self._entries[stale]
+        return future
+
+    def get(self, client, info: Dict[str, Any], section: str) -> Future:
+        """Future für einen Abschnitt (`values`, `stats` oder `ranges`) des Feldes `info`."""
+        key = (client.core_url, info['name'], section)
+        if section == 'values':
+            return self._submit(key, lambda: top_values(client, info))
+        if section == 'stats':
+            return self._submit(key, lambda: field_statistics(client, info))
+        if section == 'ranges':
+            # Vor dem Einreihen anstoßen, damit `stats` im Pool vor `ranges` startet
+            statistics = self.get(client, info, 'stats')
+            return self._submit(key, lambda: value_ranges(client, info, statistics.result()))
+        raise ValueError(f"Unbekannter Abschnitt: {section}")
+
+    def collect(self, client, info: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+        """
+        Startet alle Abschnitte des Feldes parallel und liefert (Abschnitt, Ergebnis) in fester Reihenfolge.
+
+        Ein fehlgeschlagener Abschnitt wird mit der Exception als Ergebnis geliefert.
+        """
+        futures = [(section, self.get(client, info, section)) for section in sections_for(info)]
+        for section, future in futures:
+            try:
+                yield section, future.result()
+            except Exception as e:
+                logger.warning(f"Feldstatistik '{section}' für '{info['name']}' fehlgeschlagen: {e}")
+                yield section, e
+
+    def invalidate(self, client, field_name: str):
+        """Verwirft die gecachten Abschnitte eines Feldes (z.B. für "Neu berechnen")."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == client.core_url and k[1] == field_name]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def reset(self):
+        """Leert den Cache und ersetzt den Thread-Pool (nach einem Fork oder beim Herunterfahren)."""
+        old = self._executor
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='solr-field-stats')
+        self._entries = {}
+        self._lock = threading.Lock()
+        old.shutdown(wait=False, cancel_futures=True)
+
+
+field_stats_cache = FieldStatsCache()
@@ -0,0 +1,161 @@
+"""
+Paralleler Import von JSONL-, CSV- und Solr-JSON-Dateien in einen Core.
+
+Die Eingabe wird zeilen- bzw. objektweise gelesen (auch gzip-komprimiert), zu Batches
+nach Anzahl und Größe gebündelt und über den `BatchWriter` mit mehreren Workern,
+Retries und adaptivem Gegendruck geschrieben. copyField-Ziele und `_version_` werden
+wie bei Full-Document-Updates entfernt. Committet wird einmal am Ende.
+"""
+import csv
+import gzip
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+from loguru import logger
+
+from .batch_writer import BatchWriter
+from .field_resolver import FieldResolver
+from .solr_updates import strip_copy_field_targets
+
+IMPORT_FORMATS = ('jsonl', 'csv', 'json')
+READ_CHUNK = 1 << 16
+
+
+def open_input(path: str) -> TextIO:
+    """Öffnet eine Eingabedatei, bei Endung '.gz' mit gzip."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def detect_format(path: str) -> str:
+    """Leitet das Format aus der Dateiendung ab (Standard: jsonl)."""
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith('.json'):
+        return 'json'
+    return 'jsonl'
+
+
+def iter_jsonl(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """Ein JSON-Dokument pro Zeile; Leerzeilen werden übersprungen."""
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Ungültiges JSON in Zeile {line_no}: {e}")
+
+
+def iter_solr_json(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Liest ein JSON-Array von Dokumenten (Solr-JSON, wie von /update/json/docs bzw. /select
+    geliefert) inkrementell, ohne die ganze Datei zu laden.
+
+    Unterstützt auch ein Objekt mit `response.docs` - das wird allerdings komplett geladen.
+    """
+    decoder = json.JSONDecoder()
+    buffer = stream.read(READ_CHUNK).lstrip()
+    if buffer.startswith('{'):
+        data = json.loads(buffer + stream.read())
+        yield from data.get('response', {}).get('docs', [data])
+        return
+    if not buffer.startswith('['):
+        raise ValueError("Solr-JSON muss ein Array von Dokumenten sein.")
+    buffer = buffer[1:]
+    eof = False
+    while True:
+        buffer = buffer.lstrip().lstrip(',').lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            doc, end = decoder.raw_decode(buffer)
+        except ValueError:
+            if eof:
+                raise ValueError("Unerwartetes Dateiende im Solr-JSON.")
+            chunk = stream.read(READ_CHUNK)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield doc
+        buffer = buffer[end:]
+
+
+def iter_csv(stream: TextIO, resolver: FieldResolver, separator: str = '|') -> Iterator[Dict[str, Any]]:
+    """
+    Liest CSV mit Kopfzeile. Leere Zellen werden ausgelassen; bei mehrwertigen Feldern
+    (laut Schema) wird der Wert an `separator` aufgeteilt - passend zum CSV-Export.
+    """
+    reader = csv.DictReader(stream)
+    multi = {name: bool((resolver.resolve(name) or {}).get('multiValued')) for name in reader.fieldnames or []}
+    for row in reader:
+        doc = {}
+        for name, value in row.items():
+            if value in (None, '') or name is None:
+                continue
+            doc[name] = value.split(separator) if multi.get(name) else value
+        yield doc
+
+
+def iter_documents(stream: TextIO, fmt: str, schema: Dict[str, Any], separator: str = '|') -> Iterator[Dict[str, Any]]:
+    """Liefert die Dokumente einer Eingabe im gewählten Format."""
+    if fmt == 'jsonl':
+        return iter_jsonl(stream)
+    if fmt == 'json':
+        return iter_solr_json(stream)
+    if fmt == 'csv':
+        return iter_csv(stream, FieldResolver.for_schema(schema), separator)
+    raise ValueError(f"Unbekanntes Format '{fmt}' (erlaubt: {', '.join(IMPORT_FORMATS)})")
+
+
+def iter_batches(docs: Iterator[Dict[str, Any]], batch_size: int, max_batch_bytes: int) -> Iterator[List[Dict[str, Any]]]:
+    """Bündelt Dokumente, bis `batch_size` Dokumente oder ca. `max_batch_bytes` erreicht sind."""
+    batch, size = [], 0
+    for doc in docs:
+        batch.append(doc)
+        size += len(json.dumps(doc, ensure_ascii=False))
+        if len(batch) >= batch_size or size >= max_batch_bytes:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def import_documents(client, docs: Iterator[Dict[str, Any]], schema: Dict[str, Any], batch_size: int = 1000,
+                     max_batch_bytes: int = 5 * 1024 * 1024, workers: int = 4, slow_seconds: float = 10.0,
+                     progress: Optional[Callable[[BatchWriter], None]] = None) -> BatchWriter:
+    """
+    Schreibt Dokumente parallel nach Solr und committet am Ende einmal.
+
+    Args:
+        client (SolrClient): Ziel.
+        docs (Iterator): Dokumente, z.B. aus iter_documents().
+        schema (dict): Schema des Ziel-Cores (für copyField-Ziele).
+        batch_size (int): Max. Dokumente pro Batch.
+        max_batch_bytes (int): Ungefähre max. Größe eines Batches in Bytes.
+        workers (int): Parallele Schreib-Threads.
+        slow_seconds (float): Antwortzeit, ab der der Gegendruck greift.
+        progress (callable, optional): Wird nach jedem eingereichten Batch mit dem Writer aufgerufen.
+
+    Returns:
+        BatchWriter: Der abgeschlossene Writer mit Zählern (docs_written, docs_failed, ...).
+    """
+    copy_fields = schema.get('copy_fields', [])
+    writer = BatchWriter(client.write_batch, workers=workers, slow_seconds=slow_seconds)
+    try:
+        for batch in iter_batches((strip_copy_field_targets(doc, copy_fields) for doc in docs),
+                                  batch_size, max_batch_bytes):
+            writer.submit(batch)
+            writer.completed()  # Abgeschlossene Futures freigeben, sonst wächst die Liste mit
+            if progress:
+                progress(writer)
+    finally:
+        writer.close()
+    if writer.docs_written:
+        client.commit()
+    logger.info(f"Import: {writer.docs_written} Dokumente geschrieben, {writer.docs_failed} fehlgeschlagen "
+                f"({writer.docs_per_second:.0f} Dok./s)")
+    return writer
@@ -2,12 +2,22 @@
 import click  # Für die Erstellung von Kommandozeilen-Interfaces
 from flask import Flask  # Das Web-Framework für unsere Anwendung
 import json  # Für die Formatierung der JSON-Ausgabe
+import sys
 from loguru import logger  # Für einfaches und effektives Logging
 
 # Importiert unseren neuen SolrClient und die zentrale Konfigurationsfunktion
-from .solr_client import SolrClient
+from .solr_client import get_client
 from .web.app import create_app, create_app_for_connection_management
-from .config import load_solr_config
+from .config import load_solr_config, load_http_config, load_commit_policy, load_metrics_enabled
+from .commit_policy import CommitPolicy
+from .bulk_update import BulkUpdateJob, BULK_OPERATIONS
+from .export import export_documents, open_output, EXPORT_FORMATS
+from .core_copy import copy_core, SchemaMismatchError
+from .search_profiles import PROFILES, response_stats
+from .field_stats import field_kind, field_stats_cache
+from .importer import import_documents, iter_documents, open_input, detect_format, IMPORT_FORMATS
+from .server import serve as serve_app, choose_server, SERVERS, DEFAULT_THREADS, DEFAULT_GRACEFUL_TIMEOUT
+from . import metrics, transport
 
 import functools
 
@@ -32,8 +42,10 @@ def home():
 @click.group()
 @click.option('--solr-url', default=None, help='Basis-URL des Solr-Servers, z.B. http://localhost:8983')
 @click.option('--core', default=None, help='Name des Solr-Cores, z.B. testing')
+@click.option('--pool-size', 'pool_maxsize', type=int, default=None, help='Max. Keep-Alive-Verbindungen pro Solr-Server.')
+@click.option('--timeout', 'read_timeout', type=float, default=None, help='Lese-Timeout für Solr-Anfragen in Sekunden.')
 @click.pass_context
-def cli(ctx, solr_url, core):
+def cli(ctx, solr_url, core, pool_maxsize, read_timeout):
     """Ein Helfer-Tool für die Interaktion mit Solr."""
     logger.remove()
     logger.add(lambda msg: click.echo(msg, err=True), colorize=True, format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>")
@@ -42,6 +54,8 @@ def cli(ctx, solr_url, core):
     ctx.ensure_object(dict)
     ctx.obj['solr_url'] = solr_url
     ctx.obj['core'] = core
+    # Gemeinsamen HTTP-Transport (Poolgrößen, Timeouts) konfigurieren
+    transport.configure(**load_http_config(pool_maxsize=pool_maxsize, read_timeout=read_timeout))
 
 @cli.command()
 @click.option('--host', default='127.0.0.1', help='Der Host, auf dem der Server laufen soll.')
@@ -58,7 +72,7 @@ def run(ctx, host, port, debug):
 def test_connection(solr_url, core):
     """Prüft die Verbindung zum Solr-Core."""
     try:
-        client = SolrClient(solr_url=solr_url, core=core)
+        client = get_client(solr_url, core)
         if client.check_connection():
             logger.success(f"Verbindung zu Solr-Core '{core}' unter '{solr_url}' erfolgreich.")
         else:
@@ -73,9 +87,19 @@ def test_connection(solr_url, core):
 @click.option('--port', default=5000, help='Port für den Webserver.')
 @click.option('--no-connection-check', is_flag=True, help='Startet ohne Verbindungstest (für Connection Management).')
 @click.option('--debug', '-d', is_flag=True, help='Startet im Debug-Modus (Flask Debug + DEBUG Logging).')
+@click.option('--commit-policy', default=None,
+              help="Commit-Strategie für Änderungen: hard, soft, none, within:<ms> oder group:<ms> (Standard: hard).")
+@click.option('--metrics', 'enable_metrics', is_flag=True,
+              help='Misst alle Solr-Aufrufe (/metrics im Prometheus-Format, Server-Timing-Header).')
 @pass_solr_config
-def start_web(solr_url, core, host, port, no_connection_check, debug):
+def start_web(solr_url, core, host, port, no_connection_check, debug, commit_policy, enable_metrics):
     """Startet den Flask-Webserver für die UI."""
+    try:
+        policy = CommitPolicy.parse(load_commit_policy(commit_policy))
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--commit-policy')
+    if load_metrics_enabled(enable_metrics):
+        metrics.enable()
 
     # Prüfe ob Solr-Parameter über CLI gegeben wurden
     ctx = click.get_current_context()
@@ -108,28 +132,75 @@ def start_web(solr_url, core, host, port, no_connection_check, debug):
     # Normale Startup-Logik mit Verbindungstest
     try:
         logger.info("Rufe aktuelles Schema vom Solr-Server ab...")
-        client = SolrClient(solr_url=solr_url, core=core)
+        client = get_client(solr_url, core, policy)
         schema = client.get_schema()
         logger.success("Schema erfolgreich vom Solr-Server abgerufen.")
     except Exception as e:
         logger.error(f"Konnte Schema nicht abrufen: {e}")
         raise click.ClickException("Der Webserver konnte nicht gestartet werden, da das Schema nicht abrufbar war.")
 
-    app = create_app(solr_url=solr_url, core=core, schema=schema, debug=debug)
+    app = create_app(solr_url=solr_url, core=core, schema=schema, debug=debug, commit_policy=str(policy))
     logger.info(f"Starte Webserver auf http://{host}:{port}")
     if debug:
         logger.debug("Debug-Modus aktiviert")
     app.run(host=host, port=port, debug=debug)
 
+@cli.command()
+@click.option('--host', default='127.0.0.1', help='Host für den Webserver.')
+@click.option('--port', default=5000, help='Port für den Webserver.')
+@click.option('--server', type=click.Choice(SERVERS), default='auto',
+              help='WSGI-Server (auto: gunicorn bei mehreren Prozessen, sonst waitress).')
+@click.option('--workers', '-w', default=1, help='Anzahl Prozesse (nur gunicorn).')
+@click.option('--threads', '-t', default=DEFAULT_THREADS, help='Threads pro Prozess.')
+@click.option('--graceful-timeout', default=DEFAULT_GRACEFUL_TIMEOUT,
+              help='Sekunden, die laufende Anfragen beim Beenden noch bekommen.')
+@click.option('--connection-management', is_flag=True,
+              help='Ohne feste Verbindung starten; Verbindungen werden in der Oberfläche gewählt.')
+@click.option('--commit-policy', default=None,
+              help="Commit-Strategie für Änderungen: hard, soft, none, within:<ms> oder group:<ms> (Standard: hard).")
+@click.option('--metrics', 'enable_metrics', is_flag=True,
+              help='Misst alle Solr-Aufrufe (/metrics im Prometheus-Format, Server-Timing-Header).')
+@pass_solr_config
+def serve(solr_url, core, host, port, server, workers, threads, graceful_timeout, connection_management,
+          commit_policy, enable_metrics):
+    """Startet die Web-Oberfläche für den Produktivbetrieb (waitress oder gunicorn)."""
+    try:
+        policy = CommitPolicy.parse(load_commit_policy(commit_policy))
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--commit-policy')
+    if workers < 1 or threads < 1:
+        raise click.BadParameter("--workers und --threads müssen mindestens 1 sein.")
+    try:
+        server = choose_server(server, workers)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    if load_metrics_enabled(enable_metrics):
+        metrics.enable()
+
+    if connection_management:
+        app = create_app_for_connection_management()
+    else:
+        try:
+            client = get_client(solr_url, core, policy)
+            schema = client.get_schema()
+        except Exception as e:
+            logger.error(f"Konnte Schema nicht abrufen: {e}")
+            raise click.ClickException("Der Webserver konnte nicht gestartet werden, da das Schema nicht abrufbar war.")
+        app = create_app(solr_url=solr_url, core=core, schema=schema, commit_policy=str(policy))
+
+    serve_app(app, host, port, server=server, workers=workers, threads=threads, graceful_timeout=graceful_timeout)
+
 @cli.command()
 @click.option('--format', type=click.Choice(['json', 'table'], case_sensitive=False), 
               default='table', help='Ausgabeformat (json oder table)')
+@click.option('--refresh', is_flag=True, help='Schema-Cache ignorieren und neu von Solr laden.')
+@click.option('--cached', is_flag=True, help='Nur das gecachte Schema verwenden (Solr wird nicht kontaktiert).')
 @pass_solr_config
-def show_schema(solr_url, core, format):
+def show_schema(solr_url, core, format, refresh, cached):
     """Zeigt das Schema des aktuellen Solr-Cores an."""
     try:
-        client = SolrClient(solr_url=solr_url, core=core)
-        schema = client.get_schema()
+        client = get_client(solr_url, core)
+        schema = client.get_schema(force_refresh=refresh, offline=cached)
         if format == 'json':
             print(json.dumps(schema, indent=2, ensure_ascii=False))
         else:
@@ -155,5 +226,225 @@ def show_schema(solr_url, core, format):
         logger.error(f"Fehler beim Abrufen des Schemas: {e}")
         raise click.ClickException("Konnte das Schema nicht abrufen. Bitte überprüfen Sie die Verbindungseinstellungen.")
 
+@cli.command(name="bulk-update")
+@click.option('--query', '-q', default='*:*', help='Solr-Query, deren Treffer geändert werden.')
+@click.option('--field', '-f', 'field_name', required=True, help='Zu änderndes Feld.')
+@click.option('--op', 'operation', type=click.Choice(BULK_OPERATIONS), default='set', help='Atomare Operation.')
+@click.option('--value', '-v', 'values', multiple=True, help='Wert(e); mehrfach angeben für Mehrfachwerte. Ohne Wert bei "set" wird das Feld geleert.')
+@click.option('--batch-size', default=500, help='Dokumente pro Seite/Batch.')
+@click.option('--workers', default=4, help='Parallele Schreib-Threads.')
+@click.option('--restart', is_flag=True, help='Gespeicherten Fortschritt verwerfen und neu beginnen.')
+@click.option('--yes', '-y', is_flag=True, help='Ohne Rückfrage ausführen.')
+@pass_solr_config
+def bulk_update(solr_url, core, query, field_name, operation, values, batch_size, workers, restart, yes):
+    """Wendet eine Feldoperation auf alle Treffer einer Query an."""
+    if operation == 'inc':
+        if len(values) != 1:
+            raise click.BadParameter("'inc' erwartet genau einen numerischen Wert.", param_hint='--value')
+        try:
+            value = float(values[0]) if '.' in values[0] else int(values[0])
+        except ValueError:
+            raise click.BadParameter(f"'{values[0]}' ist keine Zahl.", param_hint='--value')
+    else:
+        value = list(values) if len(values) > 1 else (values[0] if values else None)
+
+    try:
+        client = get_client(solr_url, core)
+        job = BulkUpdateJob(client, client.get_schema(), query, field_name, operation, value,
+                            batch_size=batch_size, workers=workers)
+        total = client.count_documents(job.query)
+    except Exception as e:
+        logger.error(f"Bulk-Update konnte nicht vorbereitet werden: {e}")
+        raise click.ClickException("Bulk-Update konnte nicht vorbereitet werden.")
+
+    if not yes:
+        click.confirm(f"{operation} auf '{field_name}' für {total} Dokumente in '{core}' ausführen?", abort=True)
+
+    def show_progress(j):
+        click.echo(f"\r{j.processed}/{j.total} Dokumente geschrieben", nl=False, err=True)
+
+    job.run(restart=restart, progress=show_progress)
+    click.echo(err=True)
+    if job.status == 'fehlgeschlagen':
+        raise click.ClickException(f"Bulk-Update fehlgeschlagen: {job.error}. Erneuter Aufruf setzt fort.")
+    if job.skipped:
+        click.echo(f"{job.skipped} Dokumente wurden während des Jobs gelöscht und übersprungen.", err=True)
+    if job.conflicts:
+        click.echo(f"{job.conflicts} Dokumente wurden zwischenzeitlich geändert (oder waren schon geschrieben) "
+                   f"und übersprungen.", err=True)
+
+@cli.command()
+@click.option('--query', '-q', default='*:*', help='Solr-Query für den Export.')
+@click.option('--fq', 'filter_queries', multiple=True, help='Filter-Query (mehrfach möglich).')
+@click.option('--fl', default=None, help='Feldliste, z.B. "id,title,author_*" (Standard: alle gespeicherten Felder).')
+@click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default='jsonl', help='Ausgabeformat.')
+@click.option('--output', '-o', default='-', help='Zieldatei ("-" = stdout, Endung .gz komprimiert).')
+@click.option('--gzip', 'compress', is_flag=True, help='Ausgabe mit gzip komprimieren.')
+@click.option('--rows', default=1000, help='Dokumente pro Seite.')
+@click.option('--separator', default='|', help='Trennzeichen für Mehrfachwerte im CSV.')
+@pass_solr_config
+def export(solr_url, core, query, filter_queries, fl, fmt, output, compress, rows, separator):
+    """Exportiert alle Treffer einer Query als JSONL oder CSV (Streaming per cursorMark)."""
+    def show_progress(count):
+        click.echo(f"\r{count} Dokumente exportiert", nl=False, err=True)
+
+    try:
+        client = get_client(solr_url, core)
+        schema = client.get_schema()
+        out = open_output(output, compress)
+        try:
+            count = export_documents(client, out, schema, query, fmt, fl, rows, filter_queries,
+                                     separator, progress=show_progress)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        click.echo(err=True)
+        logger.success(f"{count} Dokumente aus '{core}' exportiert.")
+    except Exception as e:
+        logger.error(f"Fehler beim Export: {e}")
+        raise click.ClickException("Der Export ist fehlgeschlagen.")
+
+@cli.command(name="import")
+@click.argument('files', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(IMPORT_FORMATS), default=None,
+              help='Eingabeformat (Standard: aus der Dateiendung, sonst jsonl).')
+@click.option('--batch-size', default=1000, help='Max. Dokumente pro Batch.')
+@click.option('--batch-mb', default=5.0, help='Max. Größe eines Batches in MB.')
+@click.option('--workers', default=4, help='Parallele Schreib-Threads.')
+@click.option('--slow-seconds', default=10.0, help='Antwortzeit, ab der weniger parallel geschrieben wird.')
+@click.option('--separator', default='|', help='Trennzeichen für Mehrfachwerte im CSV.')
+@pass_solr_config
+def import_(solr_url, core, files, fmt, batch_size, batch_mb, workers, slow_seconds, separator):
+    """Importiert JSONL-, CSV- oder Solr-JSON-Dateien parallel in den Core."""
+    def show_progress(writer):
+        click.echo(f"\r{writer.docs_written} Dokumente geschrieben ({writer.docs_per_second:.0f} Dok./s, "
+                   f"{writer.window} parallel)", nl=False, err=True)
+
+    try:
+        client = get_client(solr_url, core)
+        schema = client.get_schema()
+    except Exception as e:
+        logger.error(f"Fehler beim Vorbereiten des Imports: {e}")
+        raise click.ClickException("Der Import konnte nicht vorbereitet werden.")
+
+    failed = 0
+    for path in files:
+        logger.info(f"Importiere {path} ...")
+        try:
+            with open_input(path) as stream:
+                docs = iter_documents(stream, fmt or detect_format(path), schema, separator)
+                writer = import_documents(client, docs, schema, batch_size, int(batch_mb * 1024 * 1024),
+                                          workers, slow_seconds, progress=show_progress)
+            click.echo(err=True)
+            failed += writer.docs_failed
+        except Exception as e:
+            click.echo(err=True)
+            logger.error(f"Fehler beim Import von {path}: {e}")
+            raise click.ClickException(f"Import von {path} fehlgeschlagen.")
+    if failed:
+        raise click.ClickException(f"{failed} Dokumente konnten nicht geschrieben werden.")
+
+@cli.command(name="copy-core")
+@click.option('--target-url', default=None, help='Basis-URL des Ziel-Servers (Standard: Quell-Server).')
+@click.option('--target-core', required=True, help='Name des Ziel-Cores.')
+@click.option('--query', '-q', default='*:*', help='Nur Treffer dieser Query kopieren.')
+@click.option('--readers', default=4, help='Parallele Leser (Hash-Partitionen des Unique Keys).')
+@click.option('--writers', default=4, help='Parallele Schreib-Threads.')
+@click.option('--rows', default=1000, help='Dokumente pro Seite/Batch.')
+@click.option('--slow-seconds', default=10.0, help='Antwortzeit, ab der weniger parallel geschrieben wird.')
+@pass_solr_config
+def copy_core_command(solr_url, core, target_url, target_core, query, readers, writers, rows, slow_seconds):
+    """Kopiert alle gespeicherten Dokumente in einen anderen Core."""
+    target_url = target_url or solr_url
+    if (target_url, target_core) == (solr_url, core):
+        raise click.BadParameter("Quelle und Ziel sind identisch.", param_hint='--target-core')
+
+    def show_progress(writer):
+        click.echo(f"\r{writer.docs_written}/{total} Dokumente kopiert ({writer.docs_per_second:.0f} Dok./s)",
+                   nl=False, err=True)
+
+    try:
+        source = get_client(solr_url, core)
+        target = get_client(target_url, target_core)
+        total = source.count_documents(query)
+        writer = copy_core(source, target, query, readers, writers, rows, slow_seconds, progress=show_progress)
+        click.echo(err=True)
+    except SchemaMismatchError as e:
+        raise click.ClickException(str(e))
+    except Exception as e:
+        logger.error(f"Fehler beim Kopieren: {e}")
+        raise click.ClickException("Das Kopieren ist fehlgeschlagen.")
+    if writer.docs_failed:
+        raise click.ClickException(f"{writer.docs_failed} Dokumente konnten nicht geschrieben werden.")
+    logger.success(f"{writer.docs_written} Dokumente von '{core}' nach '{target_core}' kopiert.")
+
+@cli.command(name="measure-profiles")
+@click.option('--query', '-q', required=True, help='Suchbegriff (wie in der Web-Oberfläche).')
+@click.option('--field', '-f', 'field_name', required=True, help='Suchfeld.')
+@click.option('--rows', default=20, help='Anzahl Treffer pro Anfrage.')
+@pass_solr_config
+def measure_profiles(solr_url, core, query, field_name, rows):
+    """Vergleicht die Antwortgröße der Suchprofile (preview, results, full) für eine Suche."""
+    try:
+        client = get_client(solr_url, core)
+        schema = client.get_schema()
+        response_stats.reset()
+        for name in PROFILES:
+            client.search_documents(query, field_name, rows=rows, unique_key_field=schema.get('unique_key', 'id'),
+                                    schema=schema, profile=name)
+    except Exception as e:
+        logger.error(f"Fehler beim Messen der Suchprofile: {e}")
+        raise click.ClickException("Die Messung ist fehlgeschlagen.")
+    stats = response_stats.snapshot()
+    print(f"{'Profil':<10} | {'Bytes':>10} | {'Bytes/Dok.':>10} | {'Ersparnis':>9}")
+    print("-" * 49)
+    for name, entry in stats.items():
+        saved = f"{entry['saved_percent']:.1f} %" if 'saved_percent' in entry else '-'
+        print(f"{name:<10} | {entry['bytes']:>10} | {entry['bytes_per_doc'] or '-':>10} | {saved:>9}")
+
+@cli.command(name="field-stats")
+@click.option('--field', '-f', 'field_name', required=True, help='Auszuwertendes Feld.')
+@click.option('--format', 'fmt', type=click.Choice(['table', 'json'], case_sensitive=False), default='table',
+              help='Ausgabeformat (json oder table)')
+@pass_solr_config
+def field_stats(solr_url, core, field_name, fmt):
+    """Zeigt häufigste Werte, Kardinalität, fehlende Werte und Wertebereiche eines Feldes."""
+    try:
+        client = get_client(solr_url, core)
+        info = field_kind(client.get_schema(), field_name)
+    except Exception as e:
+        logger.error(f"Fehler beim Laden des Schemas: {e}")
+        raise click.ClickException("Konnte das Schema nicht abrufen. Bitte überprüfen Sie die Verbindungseinstellungen.")
+    if info is None:
+        raise click.ClickException(f"Feld '{field_name}' ist im Schema nicht bekannt.")
+    # Alle Abschnitte laufen parallel; ausgegeben wird in fester Reihenfolge
+    sections = dict(field_stats_cache.collect(client, info))
+    if not sections:
+        raise click.ClickException(f"Feld '{field_name}' ist weder indiziert noch hat es DocValues.")
+    if fmt == 'json':
+        print(json.dumps({'field': info, **{name: str(result) if isinstance(result, Exception) else result
+                                            for name, result in sections.items()}}, indent=2, ensure_ascii=False))
+        return
+    print(f"\nFeld: {field_name} ({info['type']}, {info['type_class']}"
+          f"{', mehrwertig' if info['multiValued'] else ''}{', dynamisch' if info['dynamic'] else ''})")
+    for name, result in sections.items():
+        print("-" * 60)
+        if isinstance(result, Exception):
+            print(f"{name}: Fehler: {result}")
+        elif name == 'values':
+            print(f"Dokumente: {result['total']}, mit Wert: {result['with_value']}, ohne Wert: {result['missing']}")
+            print("Häufigste " + ("Terme" if result['tokenized'] else "Werte") + ":")
+            for value, count in result['values']:
+                print(f"  {count:>10}  {value}")
+        elif name == 'stats':
+            print(f"Minimum: {result['min']}, Maximum: {result['max']}"
+                  + (f", Mittelwert: {result['mean']:.2f}" if result['mean'] is not None else ''))
+            print(f"Werte: {result['count']}, ohne Wert: {result['missing']}, "
+                  f"verschiedene Werte: ca. {result['cardinality']}")
+        elif name == 'ranges':
+            print(f"Wertebereiche (Schrittweite {result['gap']}):")
+            for start, count in result['buckets']:
+                print(f"  {start:>25}  {count}")
+
 if __name__ == '__main__':
     cli()
@@ -0,0 +1,195 @@
+"""
+Laufzeitmessung aller Solr-Aufrufe und Export im Prometheus-Textformat.
+
+Gemessen wird in der Transportschicht: jede Anfrage über eine geteilte Session (pysolr
+und direkte API-Aufrufe) wird nach Operation (`search`, `get`, `schema`, `config`,
+`update`, ...) und Core erfasst - mit Gesamtdauer, Solr-`QTime` und Antwortgröße, jeweils
+als Histogramm. Zusätzlich wird die Solr-Zeit je Web-Anfrage aufsummiert (für den
+`Server-Timing`-Header, siehe web/utils/timing.py).
+
+Die Messung ist standardmäßig aus. Solange `enabled` False ist, prüft die Transportschicht
+nur dieses Flag; es werden weder Zeiten genommen noch Antworten untersucht.
+"""
+import bisect
+import re
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+enabled = False
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_QTIME = re.compile(rb'"QTime"\s*:\s*(\d+)')
+_OPERATIONS = {'select': 'search', 'get': 'get', 'schema': 'schema', 'config': 'config',
+               'update': 'update', 'terms': 'terms', 'admin': 'admin'}
+
+
+class Histogram:
+    """Histogramm mit festen Grenzen pro Label-Kombination (kumuliert wie bei Prometheus)."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Label-Werte -> [Anzahl je Bucket (+Inf zuletzt), Summe, Anzahl]
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        for label_values, (counts, total, count) in sorted(series.items()):
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """Einfacher Zähler pro Label-Kombination."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            labels = ','.join(f'{name}="{_escape(v)}"' for name, v in zip(self.labels, label_values))
+            lines.append(f'{self.name}{{{labels}}} {value}')
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+solr_request_seconds = Histogram('solrhelper_solr_request_seconds',
+                                 'Dauer der Solr-Anfragen aus Sicht des Helpers (inkl. Netzwerk).',
+                                 ('operation', 'core'), SECONDS_BUCKETS)
+solr_qtime_seconds = Histogram('solrhelper_solr_qtime_seconds', 'Von Solr gemeldete QTime.',
+                               ('operation', 'core'), SECONDS_BUCKETS)
+solr_response_bytes = Histogram('solrhelper_solr_response_bytes', 'Größe der Solr-Antworten.',
+                                ('operation', 'core'), BYTES_BUCKETS)
+solr_errors = Counter('solrhelper_solr_errors_total', 'Fehlgeschlagene Solr-Anfragen (HTTP-Fehler, Netzwerk).',
+                      ('operation', 'core'))
+http_request_seconds = Histogram('solrhelper_http_request_seconds', 'Dauer der Web-Anfragen.',
+                                 ('endpoint',), SECONDS_BUCKETS)
+REGISTRY = (solr_request_seconds, solr_qtime_seconds, solr_response_bytes, solr_errors, http_request_seconds)
+
+
+class RequestTiming:
+    """Solr-Zeit und Template-Zeit einer Web-Anfrage (für Server-Timing)."""
+
+    __slots__ = ('solr_seconds', 'solr_calls', 'render_seconds')
+
+    def __init__(self):
+        self.solr_seconds = 0.0
+        self.solr_calls = 0
+        self.render_seconds = 0.0
+
+
+# Gilt nur im Thread der Web-Anfrage; Aufrufe aus Thread-Pools werden nicht zugerechnet
+current_timing: ContextVar[Optional[RequestTiming]] = ContextVar('solrhelper_request_timing', default=None)
+
+
+def enable():
+    """Schaltet die Messung ein (vor dem Anlegen der Sessions bzw. der Flask-App aufrufen)."""
+    global enabled
+    enabled = True
+    logger.info("Metriken für Solr-Aufrufe aktiviert (/metrics, Server-Timing).")
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def classify(url: str) -> Tuple[str, str]:
+    """(Operation, Core) aus einer Solr-URL, z.B. .../solr/core1/select -> ('search', 'core1')."""
+    parts = urlsplit(url).path.rstrip('/').split('/')
+    try:
+        index = parts.index('solr')
+    except ValueError:
+        return 'other', '-'
+    rest = parts[index + 1:]
+    if rest and rest[0] == 'admin':
+        return 'admin', '-'
+    if len(rest) < 2:
+        return 'other', rest[0] if rest else '-'
+    return _OPERATIONS.get(rest[1], 'other'), rest[0]
+
+
+def qtime_of(content: bytes) -> Optional[float]:
+    """QTime (in Sekunden) aus dem responseHeader, ohne die ganze Antwort zu parsen."""
+    match = _QTIME.search(content, 0, 512)
+    return int(match.group(1)) / 1000.0 if match else None
+
+
+def observe(url: str, seconds: float, content: Optional[bytes], failed: bool = False):
+    """Erfasst eine Solr-Anfrage in den Histogrammen und in der laufenden Web-Anfrage."""
+    operation, core = classify(url)
+    solr_request_seconds.observe(seconds, operation, core)
+    if failed:
+        solr_errors.inc(operation, core)
+    if content is not None:
+        solr_response_bytes.observe(len(content), operation, core)
+        qtime = qtime_of(content)
+        if qtime is not None:
+            solr_qtime_seconds.observe(qtime, operation, core)
+    timing = current_timing.get()
+    if timing is not None:
+        timing.solr_seconds += seconds
+        timing.solr_calls += 1
+
+
+def render() -> str:
+    """Alle Metriken im Prometheus-Textformat."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    for metric in REGISTRY:
+        metric.reset()
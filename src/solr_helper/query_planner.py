@@ -0,0 +1,244 @@
+"""
+Schema-basierte Planung von Substring-Suchen.
+
+Die naive Umsetzung `feld:*begriff*` zwingt Solr, das komplette Term-Wörterbuch des Feldes
+zu durchlaufen. Der `QueryPlanner` untersucht anhand des (gecachten) Schemas die
+Analyzer-Ketten des Feldes und seiner copyField-Ziele und wählt die günstigste korrekte
+Strategie:
+
+- `ngram`:    Begriffslänge liegt im Gram-Bereich eines N-Gram-Feldes -> Term-Abfrage
+- `edge`:     Präfixsuche (`begriff*`) über ein Edge-N-Gram-Feld -> Term-Abfrage
+- `prefix`:   Präfixsuche ohne Edge-N-Gram-Feld -> `feld:begriff*` (nur ein Term-Bereich)
+- `reversed`: Suffixsuche (`*begriff`) auf einem Feld mit ReversedWildcardFilter
+- `phrase`:   mehrere Wörter in einem tokenisierten Feld -> Phrasensuche
+- `wildcard`: Fallback `feld:*begriff*`
+
+Ein `*` am Ende bzw. Anfang der Eingabe drückt eine Präfix- bzw. Suffixsuche aus; ohne
+Stern wird wie bisher ein Teilstring gesucht. `\\*` steht für einen Stern als Zeichen.
+Präfix und Suffix beziehen sich auf die Terme des gewählten Feldes: bei tokenisierten
+Feldern auf jedes Wort, sonst auf den ganzen Wert. Hilfsfelder kommen dafür nur in Frage,
+wenn sie genauso tokenisiert sind.
+"""
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from .field_resolver import FieldResolver
+
+STRATEGY_LABELS = {
+    'all': 'Alle Dokumente',
+    'ngram': 'N-Gram-Feld',
+    'edge': 'Edge-N-Gram-Feld',
+    'prefix': 'Präfix-Abfrage',
+    'reversed': 'Reversed-Wildcard-Feld',
+    'phrase': 'Phrasensuche',
+    'wildcard': 'Wildcard (langsam)',
+}
+
+# Standardwerte der Solr-Filter, falls minGramSize/maxGramSize nicht gesetzt sind
+NGRAM_DEFAULTS = (1, 2)
+EDGE_NGRAM_DEFAULTS = (1, 1)
+
+_SPECIAL_CHARS = re.compile(r'([+\-!(){}\[\]^"~*?:\\/&|\s])')
+
+
+def escape_term(term: str) -> str:
+    """Maskiert Sonderzeichen der Lucene-Syntax in einem einzelnen Term."""
+    return _SPECIAL_CHARS.sub(r'\\\1', term)
+
+
+def escape_phrase(term: str) -> str:
+    """Maskiert einen Begriff für die Verwendung in Anführungszeichen."""
+    return term.replace('\\', '\\\\').replace('"', '\\"')
+
+
+class QueryPlan:
+    """Ergebnis der Planung: die Solr-Query und die gewählte Strategie."""
+
+    def __init__(self, strategy: str, field: str, query: str, search_field: Optional[str] = None):
+        self.strategy = strategy
+        self.field = field                          # Vom Benutzer gewähltes Feld
+        self.search_field = search_field or field   # Tatsächlich abgefragtes Feld (ggf. copyField-Ziel)
+        self.query = query
+
+    @property
+    def label(self) -> str:
+        label = STRATEGY_LABELS.get(self.strategy, self.strategy)
+        if self.search_field != self.field:
+            return f"{label} ({self.search_field})"
+        return label
+
+    def __repr__(self) -> str:
+        return f"QueryPlan({self.strategy!r}, {self.query!r})"
+
+
+class FieldAnalysis:
+    """Die für die Planung relevanten Eigenschaften eines Feldtyps."""
+
+    def __init__(self, field_type: Optional[Dict[str, Any]]):
+        field_type = field_type or {}
+        index_chain = _components(field_type.get('indexAnalyzer') or field_type.get('analyzer'))
+        query_chain = _components(field_type.get('queryAnalyzer') or field_type.get('analyzer'))
+        self.tokenized = field_type.get('class', '').endswith('TextField') and not any(
+            name == 'keywordtokenizer' for name, _ in index_chain[:1])
+        self.lowercase = any(name in ('lowercasefilter', 'lowercasetokenizer') for name, _ in index_chain)
+        query_names = {name for name, _ in query_chain}
+        # Wird die Query selbst in Grams zerlegt, passt eine einfache Term-Abfrage nicht mehr
+        query_grams = bool(query_names & {'ngramfilter', 'ngramtokenizer', 'edgengramfilter', 'edgengramtokenizer'})
+        self.ngram = self.edge_ngram = None
+        for name, args in index_chain:
+            if name in ('ngramfilter', 'ngramtokenizer') and not query_grams:
+                self.ngram = _gram_range(args, NGRAM_DEFAULTS)
+            elif name in ('edgengramfilter', 'edgengramtokenizer') and not query_grams:
+                self.edge_ngram = _gram_range(args, EDGE_NGRAM_DEFAULTS)
+        self.reversed_wildcard = any(name == 'reversedwildcardfilter' for name, _ in index_chain)
+
+
+def _components(analyzer: Optional[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Normalisierte Namen von Tokenizer und Filtern, z.B. 'solr.NGramFilterFactory' -> 'ngramfilter'."""
+    if not analyzer:
+        return []
+    parts = [analyzer.get('tokenizer') or {}] + list(analyzer.get('filters') or [])
+    result = []
+    for part in parts:
+        name = part.get('class') or part.get('name') or ''
+        name = name.rsplit('.', 1)[-1].lower()
+        if name.endswith('factory'):
+            name = name[:-len('factory')]
+        # SPI-Namen (Solr 9: "nGram", "edgeNGram", "lowercase") auf Klassennamen abbilden
+        name = {'ngram': 'ngramfilter', 'edgengram': 'edgengramfilter', 'lowercase': 'lowercasefilter',
+                'reversedwildcard': 'reversedwildcardfilter', 'keyword': 'keywordtokenizer'}.get(name, name)
+        result.append((name, part))
+    return result
+
+
+def _gram_range(args: Dict[str, Any], defaults: Tuple[int, int]) -> Tuple[int, int]:
+    return int(args.get('minGramSize', defaults[0])), int(args.get('maxGramSize', defaults[1]))
+
+
+class QueryPlanner:
+    """Wählt für eine Feldsuche die günstigste Abfrage anhand des Schemas."""
+
+    def __init__(self, schema: Dict[str, Any]):
+        self._resolver = FieldResolver.for_schema(schema)
+        self._types = {t['name']: t for t in schema.get('field_types', [])}
+        # copyField-Ziel -> alle Quellen (Namen oder Muster)
+        self._copy_sources: Dict[str, Set[str]] = {}
+        for copy_field in schema.get('copy_fields', []):
+            self._copy_sources.setdefault(copy_field['dest'], set()).add(copy_field['source'])
+        self._analysis: Dict[str, FieldAnalysis] = {}
+        self._candidates: Dict[str, List[Tuple[str, FieldAnalysis]]] = {}
+
+    def _analyze(self, field_name: str) -> FieldAnalysis:
+        analysis = self._analysis.get(field_name)
+        if analysis is None:
+            definition = self._resolver.resolve(field_name) or {}
+            analysis = self._analysis[field_name] = FieldAnalysis(self._types.get(definition.get('type')))
+        return analysis
+
+    def candidates(self, field_name: str) -> List[Tuple[str, FieldAnalysis]]:
+        """
+        Das Feld selbst und seine indexierten copyField-Ziele mit ihrer Analyse.
+
+        Ein Ziel zählt nur, wenn `field_name` seine einzige Quelle ist: Sammelt es weitere
+        Felder (oder eine Quelle per Muster), lieferte eine Suche darin auch deren Treffer.
+        """
+        result = self._candidates.get(field_name)
+        if result is None:
+            names = [field_name] + [dest for dest, sources in self._copy_sources.items()
+                                    if sources == {field_name} and '*' not in dest]
+            result = []
+            for name in dict.fromkeys(names):
+                definition = self._resolver.resolve(name)
+                if definition is not None and definition.get('indexed', True):
+                    result.append((name, self._analyze(name)))
+            self._candidates[field_name] = result
+        return result
+
+    def plan(self, field_name: str, term: str) -> QueryPlan:
+        """
+        Plant die Suche nach `term` in `field_name`.
+
+        Args:
+            field_name (str): Das vom Benutzer gewählte Feld.
+            term (str): Suchbegriff; `begriff*` = Präfix, `*begriff` = Suffix, sonst Teilstring.
+                `\\*` ist ein Stern als Zeichen.
+        """
+        core = term.strip()
+        leading = core.startswith('*')
+        core = core.lstrip('*')
+        trailing = False
+        while core.endswith('*') and not core.endswith('\\*'):
+            core, trailing = core[:-1], True
+        prefix = trailing and not leading
+        suffix = leading and not trailing
+        core = core.replace('\\*', '*')
+        if not core:
+            return QueryPlan('wildcard', field_name, f'{field_name}:*')
+        candidates = self.candidates(field_name)
+        multi_word = len(core.split()) > 1
+        tokenized = self._analyze(field_name).tokenized
+
+        if prefix:
+            # Nur Edge-N-Gram-Felder mit derselben Bedeutung: Wortanfang bzw. Wertanfang
+            same_terms = [(name, a) for name, a in candidates if a.tokenized == tokenized]
+            plan = self._plan_gram(field_name, core, same_terms, 'edge', lambda a: a.edge_ngram)
+            return plan or QueryPlan('prefix', field_name, f'{field_name}:{escape_term(self.normalize(core, field_name))}*')
+        if suffix:
+            for name, analysis in candidates:
+                if analysis.reversed_wildcard and analysis.tokenized == tokenized and not multi_word:
+                    return QueryPlan('reversed', field_name, f'{name}:*{escape_term(self.normalize(core, name))}', name)
+            return self.fallback(field_name, core, leading_only=True)
+
+        plan = self._plan_gram(field_name, core, candidates, 'ngram', lambda a: a.ngram)
+        if plan:
+            return plan
+        if multi_word and tokenized:
+            return QueryPlan('phrase', field_name, f'{field_name}:"{escape_phrase(core)}"')
+        return self.fallback(field_name, core)
+
+    def _plan_gram(self, field_name, core, candidates, strategy, gram_range) -> Optional[QueryPlan]:
+        for name, analysis in candidates:
+            sizes = gram_range(analysis)
+            # Tokenisierte Gram-Felder kennen keine Grams über Wortgrenzen hinweg
+            if sizes and sizes[0] <= len(core) <= sizes[1] and not (analysis.tokenized and len(core.split()) > 1):
+                value = core.lower() if analysis.lowercase else core
+                return QueryPlan(strategy, field_name, f'{name}:"{escape_phrase(value)}"', name)
+        return None
+
+    def normalize(self, term: str, field_name: str) -> str:
+        """Schreibt `term` klein, wenn das Feld kleingeschrieben indiziert wird."""
+        # Wildcard- und Präfix-Abfragen werden nicht analysiert, daher selbst klein schreiben
+        return term.lower() if self._analyze(field_name).lowercase else term
+
+    @staticmethod
+    def fallback(field_name: str, term: str, leading_only: bool = False) -> QueryPlan:
+        """
+        Die bisherige Wildcard-Suche `feld:*begriff*` (bzw. `feld:*begriff`).
+
+        Leerzeichen werden maskiert, damit mehrere Wörter ein Term bleiben (statt `feld:*zwei`
+        ODER `worte*` im Standardfeld).
+        """
+        escaped = escape_term(term)
+        return QueryPlan('wildcard', field_name, f'{field_name}:*{escaped}' + ('' if leading_only else '*'))
+
+    @classmethod
+    def for_schema(cls, schema: Dict[str, Any]) -> 'QueryPlanner':
+        """Liefert den (einmal pro Schema-Objekt gebauten) Planer für `schema`."""
+        entry = _planners.get(id(schema))
+        if entry is not None and entry[0] is schema:
+            return entry[1]
+        planner = cls(schema)
+        with _planners_lock:
+            if len(_planners) >= PLANNER_LIMIT:
+                _planners.pop(next(iter(_planners)))
+            _planners[id(schema)] = (schema, planner)
+        logger.debug(f"QueryPlanner für Schema '{schema.get('core', '-')}' gebaut")
+        return planner
+
+
+PLANNER_LIMIT = 16
+_planners: Dict[int, Tuple[Dict[str, Any], QueryPlanner]] = {}
+_planners_lock = threading.Lock()
@@ -0,0 +1,153 @@
+"""
+Persistenter Schema-Cache (Speicher + Festplatte), geschlüsselt nach Core-URL.
+
+Statt das vollständige Schema bei jedem Verbindungswechsel neu zu laden, wird ein
+günstiger Fingerabdruck des Schemas geprüft (Revalidierung):
+
+1. SolrCloud: `/schema/zkversion` (ändert sich bei jeder Schema-Änderung in ZooKeeper).
+   Nur wenn sich die Version geändert hat, wird das Schema neu abgerufen.
+2. Standalone: Es gibt kein günstiges Änderungssignal - Änderungen über die Schema-API
+   (managed-schema) werden ohne Core-Reload aktiv, die Startzeit des Cores bleibt gleich.
+   Das Schema wird mit einer einzigen Anfrage (`/schema`) geladen und per Hash mit dem
+   gecachten verglichen; unverändert wird der bestehende Eintrag weiterverwendet.
+
+Ist Solr nicht erreichbar oder zu langsam, wird der zuletzt bekannte Stand verwendet.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+DEFAULT_CACHE_DIR = Path.home() / ".solrhelper" / "schema_cache"
+REVALIDATE_AFTER = 30  # Sekunden, in denen ein Eintrag ohne Prüfung gilt
+
+
+def content_fingerprint(schema: Dict[str, Any]) -> str:
+    """Fingerabdruck aus dem Inhalt des Schemas (für Cores ohne ZooKeeper-Version)."""
+    digest = hashlib.sha1(json.dumps(schema, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"sha1:{digest[:16]}"
+
+
+class SchemaCache:
+    """Zweistufiger Schema-Cache mit Revalidierung über einen Schema-Fingerabdruck."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, revalidate_after: float = REVALIDATE_AFTER):
+        env_dir = os.environ.get("SOLRHELPER_SCHEMA_CACHE_DIR")
+        self.cache_dir = Path(cache_dir or env_dir or DEFAULT_CACHE_DIR)
+        self.revalidate_after = revalidate_after
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, core_url: str) -> Path:
+        digest = hashlib.sha1(core_url.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def _load(self, core_url: str) -> Optional[Dict[str, Any]]:
+        """Holt einen Eintrag aus dem Speicher oder, falls nicht vorhanden, von der Festplatte."""
+        entry = self._memory.get(core_url)
+        if entry is not None:
+            return entry
+        path = self._path(core_url)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Schema-Cache-Datei '{path}' unlesbar, wird ignoriert: {e}")
+            return None
+        if entry.get('core_url') != core_url:
+            return None
+        # Frisch von der Platte gelesen: muss vor Verwendung revalidiert werden
+        entry['checked_at'] = 0
+        self._memory[core_url] = entry
+        return entry
+
+    def _store(self, core_url: str, schema: Dict[str, Any], fingerprint: Optional[str]):
+        now = time.time()
+        entry = {
+            'core_url': core_url,
+            'fingerprint': fingerprint,
+            'fetched_at': now,
+            'checked_at': now,
+            'schema': schema,
+        }
+        with self._lock:
+            self._memory[core_url] = entry
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(core_url)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)  # Atomar, auch bei mehreren Prozessen
+        except OSError as e:
+            logger.warning(f"Konnte Schema-Cache nicht auf die Festplatte schreiben: {e}")
+
+    def get(self, client, force_refresh: bool = False, offline: bool = False) -> Dict[str, Any]:
+        """
+        Liefert das Schema des Cores von `client`, nach Möglichkeit aus dem Cache.
+
+        Args:
+            client (SolrClient): Client des Cores.
+            force_refresh (bool): Cache ignorieren und Schema immer neu abrufen.
+            offline (bool): Nur den Cache verwenden, Solr nicht kontaktieren.
+
+        Returns:
+            Dict[str, Any]: Das Schema im Format von SolrClient.fetch_schema().
+        """
+        core_url = client.core_url
+        entry = None if force_refresh else self._load(core_url)
+
+        if offline:
+            if entry is None:
+                raise LookupError(f"Kein gecachtes Schema für '{core_url}' vorhanden.")
+            logger.info(f"Verwende gecachtes Schema für '{core_url}' (ohne Revalidierung)")
+            return entry['schema']
+
+        now = time.time()
+        if entry is not None and now - entry['checked_at'] < self.revalidate_after:
+            logger.debug(f"Schema für '{core_url}' aus dem Speicher-Cache")
+            return entry['schema']
+
+        try:
+            fingerprint = client.get_schema_fingerprint()
+            if fingerprint is None:
+                schema = client.fetch_schema()
+                fingerprint = content_fingerprint(schema)
+            if entry is not None and fingerprint == entry.get('fingerprint'):
+                entry['checked_at'] = now
+                logger.debug(f"Schema für '{core_url}' unverändert ({fingerprint})")
+                return entry['schema']
+            if fingerprint.startswith('zk:'):
+                schema = client.fetch_schema()
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(f"Solr nicht erreichbar ({e}), verwende gecachtes Schema für '{core_url}'")
+            return entry['schema']
+
+        self._store(core_url, schema, fingerprint)
+        logger.info(f"Schema für '{core_url}' neu geladen und gecacht")
+        return schema
+
+    def invalidate(self, core_url: Optional[str] = None):
+        """Verwirft einen (oder alle) Einträge im Speicher und auf der Festplatte."""
+        with self._lock:
+            urls = [core_url] if core_url else list(self._memory)
+            for url in urls:
+                self._memory.pop(url, None)
+        for url in urls:
+            try:
+                self._path(url).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+# Prozessweiter Standard-Cache
+schema_cache = SchemaCache()
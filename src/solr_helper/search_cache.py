@@ -0,0 +1,146 @@
+"""
+In-Process-Cache für Suchergebnisse (LRU + TTL, begrenzt in Bytes).
+
+Die Live-Suche schickt beim Tippen viele fast gleiche Anfragen, und beim Blättern wird
+dieselbe Seite oft mehrfach geladen. `search_documents()` fragt daher zuerst diesen Cache.
+Der Schlüssel enthält Core-URL, normalisierte Query, Feld, Seitengröße, Position und
+Antwortprofil. Jeder Schreibzugriff auf einen Core (Update, Commit) verwirft alle
+Einträge dieses Cores; die TTL begrenzt das Alter bei Änderungen durch andere Clients.
+
+Ein Update ohne sofortigen Commit (`within:<ms>`, `none`, Gruppen-Commit, Bulk-Batches)
+wird erst später durchsuchbar. Bis dahin lieferte Solr noch den alten Stand - der Core
+wird deshalb so lange gesperrt (`pending_for`), und Ergebnisse werden nicht gespeichert.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from loguru import logger
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_TTL = 60.0
+
+
+def normalize_query(query: str) -> str:
+    """Vereinheitlicht Leerraum, damit 'Buch ' und 'Buch' denselben Eintrag treffen."""
+    return ' '.join(query.split())
+
+
+class SearchCache:
+    """LRU-Cache mit Ablaufzeit und Obergrenze für die geschätzte Größe in Bytes."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # Schlüssel -> (Ablaufzeit, Größe, Wert); Schlüssel[0] ist immer die Core-URL
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        # Zähler je Core, erhöht bei jeder Invalidierung (siehe put())
+        self._generations: Dict[str, int] = {}
+        # Core -> Zeitpunkt, bis zu dem ein Update noch nicht durchsuchbar sein kann
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def generation(self, core_url: str) -> int:
+        """Aktueller Invalidierungsstand eines Cores; vor der Solr-Anfrage abfragen."""
+        with self._lock:
+            return self._generations.get(core_url, 0)
+
+    def current(self, core_url: str, generation: int) -> bool:
+        """
+        Ob ein Ergebnis, das bei Stand `generation` angefragt wurde, noch gilt.
+
+        Für andere Caches, die von Suchergebnissen abgeleitet sind (z.B. cursorMarks).
+        """
+        with self._lock:
+            return self._current(core_url, generation)
+
+    def _current(self, core_url: str, generation: int) -> bool:
+        if self._generations.get(core_url, 0) != generation:
+            return False
+        # Wartet ein Update noch auf seinen Commit, ist das Ergebnis womöglich alt
+        return self._pending.get(core_url, 0) <= time.monotonic()
+
+    def put(self, key: Tuple[Hashable, ...], value: Any, size: int, generation: int):
+        """
+        Speichert `value` mit der geschätzten Größe `size` (z.B. Länge der Solr-Antwort).
+
+        Wurde der Core seit `generation` invalidiert, lief parallel ein Schreibzugriff und
+        das Ergebnis ist womöglich schon veraltet - es wird dann nicht gespeichert.
+        """
+        if self.max_bytes <= 0 or size > self.max_bytes // 4:
+            return  # Einzelne Riesenantworten würden den Cache leerfegen
+        with self._lock:
+            if not self._current(key[0], generation):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Tuple[Hashable, ...]):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(self, core_url: Optional[str] = None, pending_for: Optional[float] = None):
+        """
+        Verwirft alle Einträge eines Cores (oder alle, ohne `core_url`).
+
+        Args:
+            pending_for (float, optional): Sekunden, bis das auslösende Update durchsuchbar ist.
+                                           Bis dahin werden keine Ergebnisse des Cores gespeichert;
+                                           0 (z.B. nach einem Commit) hebt die Sperre auf.
+        """
+        with self._lock:
+            if core_url is not None and pending_for is not None:
+                if pending_for > 0:
+                    until = time.monotonic() + pending_for
+                    self._pending[core_url] = max(until, self._pending.get(core_url, 0))
+                else:
+                    self._pending.pop(core_url, None)
+            keys = [k for k in self._entries if core_url is None or k[0] == core_url]
+            for key in keys:
+                self._remove(key)
+            for url in ([core_url] if core_url else list(self._generations)):
+                self._generations[url] = self._generations.get(url, 0) + 1
+            self.invalidations += 1
+        if keys:
+            logger.debug(f"Such-Cache: {len(keys)} Einträge für {core_url or 'alle Cores'} verworfen")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+search_cache = SearchCache()
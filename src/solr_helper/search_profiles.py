@@ -0,0 +1,135 @@
+"""
+Antwortprofile für Suchanfragen: welche Felder und welches Highlighting eine Ansicht braucht.
+
+Die Vorschau unter der Suchmaske und die Ergebnisliste zeigen nur den Unique Key und
+Snippets des gesuchten Feldes. Statt aller gespeicherten Felder (z.B. große MARC-Blobs)
+werden dort nur diese Felder geladen (`fl`), und hervorgehoben wird nur im gesuchten Feld
+mit dem Unified Highlighter. Das vollständige Dokument lädt erst `/record` per Real-Time-Get.
+
+`ResponseStats` zählt die übertragenen Bytes je Profil, damit die Ersparnis messbar ist.
+"""
+import threading
+from typing import Any, Dict, Optional
+
+from .field_resolver import FieldResolver
+
+HIGHLIGHT_PRE = '<mark class="bg-yellow-200 px-1 rounded">'
+HIGHLIGHT_POST = '</mark>'
+
+
+class ResponseProfile:
+    """Feldliste und Highlighting-Parameter für eine Ansicht."""
+
+    def __init__(self, name: str, full_documents: bool, snippets: int, fragsize: int = 150,
+                 max_analyzed_chars: int = 100000):
+        self.name = name
+        self.full_documents = full_documents
+        self.snippets = snippets
+        self.fragsize = fragsize
+        self.max_analyzed_chars = max_analyzed_chars
+
+    def params(self, unique_key_field: str, field: Optional[str] = None,
+               schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Solr-Parameter (fl, hl.*) für eine Suche in `field`."""
+        params = {
+            'hl': 'true',
+            'hl.method': 'unified',
+            'hl.fl': field or '*',
+            # Unified Highlighter nutzt hl.tag.*, ältere Solr-Versionen (Original-Highlighter) hl.simple.*
+            'hl.tag.pre': HIGHLIGHT_PRE,
+            'hl.tag.post': HIGHLIGHT_POST,
+            'hl.simple.pre': HIGHLIGHT_PRE,
+            'hl.simple.post': HIGHLIGHT_POST,
+            # Text in den Snippets HTML-escapen; die Templates geben sie mit |safe aus
+            'hl.encoder': 'html',
+            'hl.fragsize': self.fragsize,
+            'hl.snippets': self.snippets,
+            'hl.maxAnalyzedChars': self.max_analyzed_chars,
+            'hl.requireFieldMatch': 'true' if field and not self.full_documents else 'false',
+        }
+        if not self.full_documents and field:
+            params['fl'] = f'{unique_key_field},{field}'
+        if field and schema:
+            offset_source = highlight_offset_source(field, schema)
+            if offset_source:
+                params['hl.offsetSource'] = offset_source
+        return params
+
+
+PROFILES = {
+    # Kompakte Vorschau unter der Suchmaske (/api/search)
+    'preview': ResponseProfile('preview', full_documents=False, snippets=2),
+    # Ergebnisliste (/search-results)
+    'results': ResponseProfile('results', full_documents=False, snippets=3),
+    # Alle gespeicherten Felder, Highlighting wie bisher
+    'full': ResponseProfile('full', full_documents=True, snippets=3, max_analyzed_chars=1000000),
+}
+
+
+def get_profile(name: Optional[str]) -> ResponseProfile:
+    """Liefert das Profil `name` (Standard: 'full')."""
+    try:
+        return PROFILES[name or 'full']
+    except KeyError:
+        raise ValueError(f"Unbekanntes Antwortprofil '{name}' (erlaubt: {', '.join(PROFILES)})")
+
+
+def highlight_offset_source(field: str, schema: Dict[str, Any]) -> Optional[str]:
+    """
+    Ermittelt, ob der Unified Highlighter gespeicherte Offsets nutzen kann.
+
+    Returns:
+        'POSTINGS' bei storeOffsetsWithPositions, 'TERM_VECTORS' bei Term-Vektoren mit
+        Positionen und Offsets, sonst None (Solr analysiert den Text neu).
+    """
+    definition = FieldResolver.for_schema(schema).resolve(field)
+    if not definition:
+        return None
+    field_type = next((t for t in schema.get('field_types', []) if t.get('name') == definition.get('type')), {})
+
+    def flag(name: str) -> bool:
+        value = definition.get(name, field_type.get(name, False))
+        return value is True or str(value).lower() == 'true'
+
+    if flag('storeOffsetsWithPositions'):
+        return 'POSTINGS'
+    if flag('termVectors') and flag('termPositions') and flag('termOffsets'):
+        return 'TERM_VECTORS'
+    return None
+
+
+class ResponseStats:
+    """Zählt Anfragen, Dokumente und Antwortgröße je Profil."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, profile: str, response_bytes: int, docs: int):
+        with self._lock:
+            entry = self._stats.setdefault(profile, {'requests': 0, 'bytes': 0, 'docs': 0})
+            entry['requests'] += 1
+            entry['bytes'] += response_bytes
+            entry['docs'] += docs
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Kopie der Zähler mit Bytes pro Dokument und - sobald auch 'full' gemessen wurde -
+        der prozentualen Ersparnis gegenüber vollständigen Dokumenten.
+        """
+        with self._lock:
+            stats = {name: dict(entry) for name, entry in self._stats.items()}
+        for entry in stats.values():
+            entry['bytes_per_doc'] = round(entry['bytes'] / entry['docs']) if entry['docs'] else None
+        full = stats.get('full', {}).get('bytes_per_doc')
+        for name, entry in stats.items():
+            if full and entry['bytes_per_doc'] is not None and name != 'full':
+                entry['saved_percent'] = round(100 * (1 - entry['bytes_per_doc'] / full), 1)
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+response_stats = ResponseStats()
@@ -0,0 +1,166 @@
+"""
+Produktionsbetrieb der Web-Oberfläche (optional: `pip install solr-helper[serve]`).
+
+`start-web` nutzt den Entwicklungsserver von Werkzeug. `serve` startet die App stattdessen
+unter einem WSGI-Server:
+
+- **waitress** (Standard): ein Prozess mit `threads` Worker-Threads, läuft überall.
+- **gunicorn** (Linux/macOS): `workers` Prozesse mit je `threads` Threads. Die App wird
+  einmal im Master-Prozess erzeugt (Schema bereits geladen) und an die Worker vererbt.
+
+Jeder Prozess braucht eigene Verbindungen und Hintergrund-Threads: `reset_after_fork()`
+verwirft die geerbten HTTP-Sessions, Thread-Pools und die Event-Loop des asynchronen
+Clients. Der Schema-Cache liegt auf der Festplatte und wird von allen Prozessen geteilt.
+
+Beim Beenden (SIGTERM/SIGINT) werden keine neuen Verbindungen mehr angenommen, laufende
+Anfragen bis `graceful_timeout` abgeschlossen und anstehende Gruppen-Commits ausgeführt.
+"""
+import signal
+import threading
+import time
+from typing import List
+
+from loguru import logger
+
+from . import transport
+from .async_client import reset_background_loop
+from .document_cache import reset_prefetch_pool
+from .field_stats import field_stats_cache
+from .solr_client import flush_all_commits
+
+SERVERS = ('auto', 'waitress', 'gunicorn')
+DEFAULT_THREADS = 8
+DEFAULT_GRACEFUL_TIMEOUT = 30  # Sekunden für laufende Anfragen beim Beenden
+
+
+def available_servers() -> List[str]:
+    """Die installierten WSGI-Server."""
+    found = []
+    for name in SERVERS[1:]:
+        try:
+            __import__(name)
+            found.append(name)
+        except ImportError:
+            pass
+    return found
+
+
+def choose_server(name: str, workers: int) -> str:
+    """
+    Löst `auto` auf: gunicorn bei mehreren Prozessen, sonst waitress (sofern installiert).
+
+    Raises:
+        RuntimeError: Wenn der gewünschte bzw. kein geeigneter Server installiert ist.
+    """
+    available = available_servers()
+    if name == 'auto':
+        preferred = ['gunicorn', 'waitress'] if workers > 1 else ['waitress', 'gunicorn']
+        name = next((server for server in preferred if server in available), None)
+        if name is None:
+            raise RuntimeError("Kein WSGI-Server installiert. Bitte 'pip install solr-helper[serve]' ausführen.")
+    elif name not in available:
+        raise RuntimeError(f"'{name}' ist nicht installiert. Bitte 'pip install {name}' ausführen.")
+    if name == 'waitress' and workers > 1:
+        raise RuntimeError("waitress unterstützt nur einen Prozess; für --workers > 1 gunicorn verwenden.")
+    return name
+
+
+def reset_after_fork():
+    """Gibt einem frisch geforkten Worker eigene Verbindungen und Hintergrund-Threads."""
+    transport.close_all()
+    reset_prefetch_pool()
+    field_stats_cache.reset()
+    reset_background_loop()
+
+
+def shutdown():
+    """Führt anstehende Gruppen-Commits aus und gibt Thread-Pools und Verbindungen frei."""
+    flush_all_commits()
+    reset_prefetch_pool()
+    field_stats_cache.reset()
+    reset_background_loop()
+    transport.close_all()
+    logger.info("SolrHelper beendet.")
+
+
+def serve(app, host: str, port: int, server: str = 'auto', workers: int = 1, threads: int = DEFAULT_THREADS,
+          graceful_timeout: int = DEFAULT_GRACEFUL_TIMEOUT):
+    """
+    Startet `app` unter waitress oder gunicorn und blockiert bis zum Beenden.
+
+    Args:
+        server (str): 'auto', 'waitress' oder 'gunicorn' (siehe `choose_server`).
+        workers (int): Anzahl Prozesse (nur gunicorn).
+        threads (int): Threads pro Prozess.
+        graceful_timeout (int): Sekunden, die laufende Anfragen beim Beenden noch bekommen.
+    """
+    server = choose_server(server, workers)
+    logger.info(f"Starte {server} auf http://{host}:{port} ({workers} Prozess(e) × {threads} Threads)")
+    if server == 'gunicorn':
+        _serve_gunicorn(app, host, port, workers, threads, graceful_timeout)
+    else:
+        _serve_waitress(app, host, port, threads, graceful_timeout)
+
+
+def _serve_gunicorn(app, host: str, port: int, workers: int, threads: int, graceful_timeout: int):
+    from gunicorn.app.base import BaseApplication
+
+    options = {
+        'bind': f'{host}:{port}',
+        'workers': workers,
+        'threads': threads,
+        'worker_class': 'gthread' if threads > 1 else 'sync',
+        'graceful_timeout': graceful_timeout,
+        'proc_name': 'solr-helper',
+        'post_fork': lambda arbiter, worker: reset_after_fork(),
+        'worker_exit': lambda arbiter, worker: shutdown(),
+    }
+
+    class SolrHelperApplication(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    # gunicorn behandelt SIGTERM (geordnet) und SIGINT selbst
+    SolrHelperApplication().run()
+
+
+def _serve_waitress(app, host: str, port: int, threads: int, graceful_timeout: int):
+    from waitress.server import create_server
+    from waitress import wasyncore
+
+    server = create_server(app, host=host, port=port, threads=threads, ident='solr-helper')
+    stopping = threading.Event()
+
+    # Der Handler setzt nur das Flag; geloggt wird erst in der Hauptschleife
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+
+    # waitress bietet kein geordnetes Beenden; daher die Hauptschleife selbst betreiben
+    loop_options = {'map': server._map, 'use_poll': server.adj.asyncore_use_poll}
+    while not stopping.is_set():
+        wasyncore.loop(timeout=server.adj.asyncore_loop_timeout, count=1, **loop_options)
+
+    # Listen-Socket schließen, bestehende Verbindungen weiter bedienen, bis alles beantwortet ist
+    logger.info("Beende: nehme keine neuen Verbindungen mehr an...")
+    wasyncore.dispatcher.close(server)
+    deadline = time.monotonic() + graceful_timeout
+    while time.monotonic() < deadline and not _waitress_idle(server):
+        wasyncore.loop(timeout=0.1, count=1, **loop_options)
+    if not _waitress_idle(server):
+        logger.warning(f"Laufende Anfragen nach {graceful_timeout} s abgebrochen.")
+    server.task_dispatcher.shutdown(cancel_pending=True, timeout=5)
+    wasyncore.close_all(server._map)
+    shutdown()
+
+
+def _waitress_idle(server) -> bool:
+    """Keine Anfrage in Bearbeitung oder Warteschlange und keine ungesendeten Antworten."""
+    dispatcher = server.task_dispatcher
+    if dispatcher.queue or dispatcher.active_count > 0:
+        return False
+    return not any(getattr(channel, 'requests', None) or getattr(channel, 'total_outbufs_len', 0)
+                   for channel in list(server._map.values()))
@@ -1,32 +1,77 @@
 # Importiert die notwendigen Bibliotheken
 import pysolr  # Python-Bibliothek für die Interaktion mit Solr
 from loguru import logger  # Für das Logging
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Tuple
+import copy
+import threading
 import requests  # Für direkte HTTP-Anfragen an die Solr-API
 
+from . import transport  # Gemeinsamer, gepoolter HTTP-Transport
+from .schema_cache import schema_cache  # Persistenter Schema-Cache
+from .solr_updates import SolrUpdateMixin, VersionConflictError  # Schreibzugriffe
+from .commit_policy import CommitPolicy  # Commit-Strategie pro Verbindung
+from .query_planner import QueryPlan, QueryPlanner  # Planung von Feldsuchen
+from .search_profiles import ResponseProfile, get_profile, response_stats  # Feldliste/Highlighting je Ansicht
+from .search_cache import normalize_query, search_cache  # Cache für Suchergebnisse
+from .document_cache import DocumentCache, prefetch  # Dokument-Cache pro Verbindung
+from .typeahead import FieldIndex  # Präfix-Index der Feldnamen
 
-class SolrClient:
+
+class SolrClient(SolrUpdateMixin):
     """Ein Client für die Kommunikation mit einem Solr-Server."""
 
-    def __init__(self, solr_url: str = "http://localhost:8983/solr", core: str = "testing"):
+    def __init__(self, solr_url: str = "http://localhost:8983/solr", core: str = "testing", timeout=None):
         """
         Initialisiert den Solr-Client mit pysolr.
 
+        Alle HTTP-Anfragen (pysolr und direkte API-Aufrufe) laufen über die prozessweit
+        geteilte Session aus `transport`, sodass Verbindungen wiederverwendet werden.
+
         Args:
             solr_url (str): Die Basis-URL des Solr-Servers (ohne Core, sollte mit /solr enden, z.B. http://localhost:8983/solr).
             core (str): Der Name des Solr-Cores, mit dem kommuniziert werden soll.
+            timeout (float | tuple, optional): Request-Timeout; Standard aus der Transport-Konfiguration.
         """
         # Sicherstellen, dass die Basis-URL auf /solr endet
         if not solr_url.rstrip('/').endswith('/solr'):
             logger.warning(f"solr_url '{solr_url}' endet nicht auf '/solr'. '/solr' wird automatisch ergänzt.")
             solr_url = solr_url.rstrip('/') + '/solr'
         # Konstruiert die vollständige URL zum Solr-Core
-        self.core_url = f"{solr_url.rstrip('/')}/{core}"
-        # Initialisiert die pysolr-Instanz
-        self.solr = pysolr.Solr(self.core_url, timeout=10)
+        self.solr_url = solr_url.rstrip('/')
+        self.core = core
+        self.core_url = f"{self.solr_url}/{core}"
+        # Geteilte Session und Timeout aus der Transportschicht
+        self.session = transport.get_session(self.core_url)
+        self.timeout = timeout if timeout is not None else transport.get_timeout()
+        # Initialisiert die pysolr-Instanz auf derselben Session
+        self.solr = pysolr.Solr(self.core_url, timeout=self.timeout, session=self.session)
         self._update_log_status = None  # Cache für den Status
+        self._realtime_get_supported = None  # None = noch nicht geprüft
+        self._terms_supported = None
+        self.document_cache = DocumentCache()
         logger.info(f"Solr-Client für Core-URL '{self.core_url}' initialisiert.")
 
+    def with_commit_policy(self, policy: CommitPolicy) -> 'SolrClient':
+        """
+        Variante dieses Clients mit eigener Commit-Strategie (siehe `get_client()`).
+
+        Session und Dokument-Cache werden geteilt, damit Schreibzugriffe über eine Variante
+        auch die gecachten Dokumente der anderen invalidieren.
+        """
+        client = copy.copy(self)
+        client._group_commit = None
+        client.set_commit_policy(policy)
+        return client
+
+    def _get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Führt einen GET auf einen Core-Endpunkt (z.B. 'schema') über die geteilte Session aus."""
+        request_params = {'wt': 'json'}
+        if params:
+            request_params.update(params)
+        return transport.request_json(self.session, 'GET', f"{self.core_url}/{path}",
+                                      timeout=self.timeout, params=request_params)
+
     def check_connection(self) -> bool:
         """
         Überprüft, ob eine Verbindung zum Solr-Core hergestellt werden kann.
@@ -53,7 +98,41 @@ class SolrClient:
             logger.error(f"Unbekannter Fehler bei der Verbindung zum Solr-Core: {e}")
             return False
             
-    def get_schema(self) -> Dict[str, Any]:
+    def get_schema(self, force_refresh: bool = False, offline: bool = False) -> Dict[str, Any]:
+        """
+        Liefert das Schema des Solr-Cores über den persistenten Schema-Cache.
+
+        Args:
+            force_refresh (bool): Cache umgehen und das Schema neu von Solr laden.
+            offline (bool): Nur den Cache verwenden, ohne Solr zu kontaktieren.
+
+        Returns:
+            Dict[str, Any]: Das Schema-JSON mit den wichtigsten Keys (siehe fetch_schema()).
+        """
+        return schema_cache.get(self, force_refresh=force_refresh, offline=offline)
+
+    def get_schema_fingerprint(self) -> Optional[str]:
+        """
+        Ermittelt einen günstigen Fingerabdruck des Schemas zur Revalidierung des Caches.
+
+        Nur SolrCloud hat mit `/schema/zkversion` ein echtes Änderungssignal. Standalone-Cores
+        liefern dort -1; Änderungen über die Schema-API (managed-schema) werden dort ohne
+        Core-Reload aktiv, daher vergleicht der Schema-Cache den Inhalt (siehe schema_cache.py).
+
+        Returns:
+            Optional[str]: 'zk:<version>' (SolrCloud) oder None.
+        """
+        quick_timeout = (self.timeout[0], 3) if isinstance(self.timeout, tuple) else min(self.timeout, 3)
+        try:
+            zk_version = transport.request_json(self.session, 'GET', f"{self.core_url}/schema/zkversion",
+                                                timeout=quick_timeout, params={'wt': 'json'}).get('zkversion', -1)
+            if zk_version is not None and zk_version >= 0:
+                return f"zk:{zk_version}"
+        except requests.exceptions.HTTPError:
+            pass  # Ältere Solr-Versionen kennen den Endpunkt nicht
+        return None
+
+    def fetch_schema(self) -> Dict[str, Any]:
         """
         Ruft das Schema des Solr-Cores ab und gibt die wichtigsten Strukturen (fields, fieldTypes, dynamicFields, copyFields, uniqueKey, core) im Original-Format zurück.
         Die Feldnamen werden nicht verändert, damit sie für spätere Verarbeitung und UI-Generierung direkt nutzbar sind.
@@ -62,10 +141,7 @@ class SolrClient:
             Dict[str, Any]: Das Schema-JSON mit den wichtigsten Keys.
         """
         try:
-            schema_url = f"{self.core_url}/schema"
-            response = requests.get(schema_url, params={'wt': 'json'})
-            response.raise_for_status()
-            schema_data = response.json().get('schema', {})
+            schema_data = self._get_json('schema').get('schema', {})
             result = {
                 'core': self.core_url.split('/')[-1],
                 'unique_key': schema_data.get('uniqueKey'),
@@ -92,134 +168,341 @@ class SolrClient:
         Returns:
             List[Dict[str, Any]]: Liste der indizierten Felder mit Name und Typ.
         """
-        indexed_fields = []
+        # Einmal pro Schema aufgebaut und sortiert (siehe typeahead.FieldIndex)
+        return list(FieldIndex.for_schema(schema).fields)
 
-        # Statische Felder durchgehen
-        for field in schema.get('fields', []):
-            # Prüfe ob das Feld indiziert ist (indexed=true oder nicht explizit auf false gesetzt)
-            if field.get('indexed', True):  # Default ist True wenn nicht angegeben
-                indexed_fields.append({
-                    'name': field['name'],
-                    'type': field.get('type', 'unknown'),
-                    'multiValued': field.get('multiValued', False)
-                })
+    def suggest_values(self, field: str, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """
+        Häufigste indizierte Werte von `field`, die mit `prefix` beginnen.
 
-        # Dynamische Felder durchgehen
-        for field in schema.get('dynamic_fields', []):
-            if field.get('indexed', True):
-                indexed_fields.append({
-                    'name': field['name'],
-                    'type': field.get('type', 'unknown'),
-                    'multiValued': field.get('multiValued', False),
-                    'dynamic': True
-                })
+        Nutzt die Terms-Komponente (/terms), die direkt das Term-Wörterbuch liest. Fehlt der
+        Handler, wird per facet.prefix gezählt. Für gecachte Vorschläge siehe
+        typeahead.value_suggestions.
 
-        # Nach Name sortieren
-        indexed_fields.sort(key=lambda x: x['name'])
+        Returns:
+            List[Tuple[str, int]]: (Wert, Anzahl Dokumente), absteigend nach Anzahl.
+        """
+        if self._terms_supported is not False:
+            try:
+                result = self._get_json('terms', {'terms.fl': field, 'terms.prefix': prefix,
+                                                  'terms.limit': limit, 'terms.sort': 'count'})
+                if self._terms_supported is None:
+                    logger.info(f"Terms-Komponente für {self.core_url} aktiviert.")
+                self._terms_supported = True
+                return _pairs(result.get('terms', {}).get(field, []))
+            except requests.exceptions.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status not in (400, 404) or self._terms_supported:
+                    raise
+                logger.info(f"Terms-Komponente ist für {self.core_url} nicht verfügbar (HTTP {status}), nutze Facetten.")
+                self._terms_supported = False
+        results = self.solr.search(q='*:*', rows=0, **{'facet': 'true', 'facet.field': field, 'facet.prefix': prefix,
+                                                        'facet.limit': limit, 'facet.mincount': 1})
+        return _pairs(results.facets.get('facet_fields', {}).get(field, []))
+
+    def _realtime_get(self, params: Dict[str, Any], batch: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Fragt den Real-Time-Get-Handler (/get) ab und merkt sich, ob der Core ihn unterstützt.
 
-        logger.debug(f"Gefunden {len(indexed_fields)} indizierte Felder")
-        return indexed_fields
+        Returns:
+            Optional[Dict[str, Any]]: Die JSON-Antwort oder None, wenn /get nicht verfügbar ist.
+        """
+        if self._realtime_get_supported is False:
+            return None
+        url = f"{self.core_url}/get"
+        try:
+            if batch:
+                # Viele IDs: als Formular-POST, um URL-Längenlimits zu vermeiden
+                result = transport.request_json(self.session, 'POST', url, timeout=self.timeout,
+                                                params={'wt': 'json'}, data=params)
+            else:
+                result = self._get_json('get', params)
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status in (400, 404) and self._realtime_get_supported is None:
+                logger.info(f"Real-Time-Get ist für {self.core_url} nicht verfügbar (HTTP {status}), nutze Suche.")
+                self._realtime_get_supported = False
+                return None
+            raise
+        if self._realtime_get_supported is None:
+            logger.info(f"Real-Time-Get für {self.core_url} aktiviert.")
+        self._realtime_get_supported = True
+        return result
 
-    def get_document_by_id(self, unique_key_field: str, doc_id: str) -> Optional[Dict[str, Any]]:
+    def get_document_by_id(self, unique_key_field: str, doc_id: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
         """
         Ruft ein einzelnes Dokument anhand seiner ID (Unique Key) aus Solr ab.
 
+        Bevorzugt den Real-Time-Get-Handler (/get), der ohne Query-Parser und Scoring auskommt
+        und auch noch nicht committete Änderungen sieht. Fehlt der Handler, wird gesucht.
+        Zuerst wird der Dokument-Cache der Verbindung gefragt (siehe document_cache.py).
+
         Args:
             unique_key_field (str): Der Name des Unique-Key-Feldes im Schema.
             doc_id (str): Die ID des zu suchenden Dokuments.
+            use_cache (bool): False erzwingt einen Abruf aus Solr (z.B. vor einem Full-Document-Update).
 
         Returns:
             Optional[Dict[str, Any]]: Das gefundene Dokument als Dictionary oder None, wenn nichts gefunden wurde.
         """
+        if use_cache:
+            doc = self.document_cache.get(doc_id)
+            if doc is not None:
+                return doc
         try:
-            query = f'{unique_key_field}:"{doc_id}"'
-            results = self.solr.search(q=query)
-            if results.docs:
-                return results.docs[0]
-            return None
+            result = self._realtime_get({'id': doc_id})
+            if result is not None:
+                doc = result.get('doc')
+            else:
+                results = self.solr.search(q=f'{unique_key_field}:"{doc_id}"')
+                doc = results.docs[0] if results.docs else None
+            if doc is not None:
+                self.document_cache.put(doc_id, doc)
+            return doc
         except Exception as e:
             logger.error(f"Fehler beim Abrufen des Dokuments mit ID {doc_id}: {e}")
             raise
 
+    def get_document_fields(self, unique_key_field: str, doc_id: str,
+                            fields: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """
+        Ruft nur die Felder `fields` eines Dokuments ab (plus Unique Key und `_version_`).
+
+        Für große Dokumente, von denen eine Ansicht nur einen Teil braucht (eine Feldgruppe,
+        die Werte eines Feldes): Real-Time-Get bzw. Suche mit `fl`. Das Teildokument wird
+        nicht gecacht; liegt das ganze Dokument im Cache, wird es von dort beantwortet.
 
+        Returns:
+            Optional[Dict[str, Any]]: Das Teildokument oder None, wenn es das Dokument nicht gibt.
+        """
+        names = list(dict.fromkeys([unique_key_field, '_version_', *fields]))
+        doc = self.document_cache.get(doc_id)
+        if doc is not None:
+            return {name: doc[name] for name in names if name in doc}
+        fl = ','.join(names)
+        result = self._realtime_get({'id': doc_id, 'fl': fl})
+        if result is not None:
+            return result.get('doc')
+        results = self.solr.search(q=f'{unique_key_field}:"{doc_id}"', fl=fl)
+        return results.docs[0] if results.docs else None
+
+    def get_field_names(self, unique_key_field: str, doc_id: str,
+                        version: Optional[int] = None) -> Optional[List[str]]:
+        """
+        Die Feldnamen eines Dokuments (Stand `version`, falls angegeben).
 
-    def search_documents(self, query: str, field: str = None, rows: int = 10, start: int = 0) -> Dict[str, Any]:
+        Kommen aus dem Dokument-Cache, der sie auch für zu große Dokumente kennt; nur wenn
+        sie dort fehlen, wird das Dokument einmal komplett gelesen.
+        """
+        names = self.document_cache.field_names(doc_id, version)
+        if names is None:
+            doc = self.get_document_by_id(unique_key_field, doc_id)
+            names = list(doc) if doc is not None else None
+        return names
+
+    def get_documents_by_ids(self, unique_key_field: str, ids: Iterable[str],
+                             batch_size: int = 200) -> Iterator[Dict[str, Any]]:
+        """
+        Ruft viele Dokumente anhand ihrer IDs ab und liefert sie gestreamt zurück.
+
+        Pro Anfrage werden bis zu `batch_size` IDs abgefragt (Real-Time-Get mit wiederholtem
+        `id`-Parameter, sonst `{!terms}`-Suche). Innerhalb eines Batches bleibt die Reihenfolge
+        der IDs erhalten, nicht gefundene IDs werden übersprungen.
+
+        Args:
+            unique_key_field (str): Der Name des Unique-Key-Feldes im Schema.
+            ids (Iterable[str]): Die IDs, beliebig viele (auch als Generator).
+            batch_size (int): Anzahl IDs pro Anfrage.
+
+        Yields:
+            Dict[str, Any]: Die gefundenen Dokumente.
+        """
+        for batch in _chunked(ids, batch_size):
+            result = self._realtime_get({'id': batch}, batch=True)
+            if result is not None:
+                # Bei genau einer ID antwortet /get im Einzelformat
+                docs = result['response']['docs'] if 'response' in result else [d for d in [result.get('doc')] if d]
+            else:
+                separator = '\u001f'
+                docs = self.solr.search(q=f'{{!terms f={unique_key_field} separator=$ids_sep v=$ids}}',
+                                        ids=separator.join(batch), ids_sep=separator, rows=len(batch)).docs
+            by_id = {str(doc.get(unique_key_field)): doc for doc in docs}
+            for doc_id in batch:
+                if doc_id in by_id:
+                    yield by_id[doc_id]
+
+    def prefetch_documents(self, unique_key_field: str, doc_ids: Iterable[str], replaces: Any = None):
+        """Lädt die Dokumente `doc_ids` im Hintergrund in den Dokument-Cache (z.B. die ersten Treffer)."""
+        return prefetch(self, unique_key_field, doc_ids, replaces=replaces)
+
+    def count_documents(self, query: str = '*:*') -> int:
+        """Gibt die Anzahl der Treffer für eine Solr-Query zurück (rows=0)."""
+        return self.solr.search(q=query, rows=0).hits
+
+    def iter_cursor(self, query: str, unique_key_field: str, fl: Optional[str] = None, rows: int = 500,
+                    cursor_mark: str = '*', **params) -> Iterator[Tuple[List[Dict[str, Any]], str]]:
+        """
+        Streamt alle Treffer einer Query seitenweise per cursorMark (Deep Paging).
+
+        Die Sortierung endet immer auf dem Unique Key, damit der Cursor stabil ist. Der
+        Speicherbedarf hängt nur von `rows` ab, nicht von der Treffermenge.
+
+        Args:
+            query (str): Solr-Query (q).
+            unique_key_field (str): Unique-Key-Feld für die stabile Sortierung.
+            fl (str, optional): Feldliste (Projektion), z.B. 'id' oder 'id,title'.
+            rows (int): Dokumente pro Seite.
+            cursor_mark (str): Startcursor ('*' oder ein gespeicherter nextCursorMark zum Fortsetzen).
+            **params: Weitere Solr-Parameter (z.B. fq).
+
+        Yields:
+            Tuple[List[Dict[str, Any]], str]: (Dokumente der Seite, nextCursorMark nach dieser Seite).
+        """
+        params.setdefault('sort', f'{unique_key_field} asc')
+        if fl:
+            params['fl'] = fl
+        while True:
+            results = self.solr.search(q=query, rows=rows, cursorMark=cursor_mark, **params)
+            next_cursor = results.nextCursorMark
+            if results.docs:
+                yield results.docs, next_cursor
+            if not results.docs or next_cursor == cursor_mark:
+                return
+            cursor_mark = next_cursor
+
+    @staticmethod
+    def plan_search(query: str, field: Optional[str] = None, schema: Optional[Dict[str, Any]] = None) -> QueryPlan:
+        """
+        Plant die Solr-Query für eine (feldspezifische) Textsuche.
+
+        Mit Schema wählt der `QueryPlanner` die günstigste Strategie (N-Gram-Feld, Präfix,
+        Phrase, ...); ohne Schema bleibt es bei der Substring-Suche `feld:*begriff*`.
+        """
+        if not query.strip():
+            return QueryPlan('all', field or '', '*:*')
+        if not (field and field.strip()):
+            # Kein Feld angegeben - das sollte durch die UI verhindert werden
+            logger.warning("Textsuche ohne Feldangabe - das sollte nicht passieren!")
+            raise ValueError("Für Textsuche muss ein Feld angegeben werden")
+        if schema is None:
+            return QueryPlanner.fallback(field, query)
+        return QueryPlanner.for_schema(schema).plan(field, query)
+
+    def search_documents(self, query: str, field: str = None, rows: int = 10, start: int = 0,
+                         cursor_mark: Optional[str] = None, unique_key_field: str = 'id',
+                         schema: Optional[Dict[str, Any]] = None, profile: str = 'full') -> Dict[str, Any]:
         """
         Führt eine Textsuche aus - entweder allgemein oder in einem spezifischen Feld.
 
+        Sortiert wird nach Relevanz mit dem Unique Key als Tiebreaker. Damit ist die Reihenfolge
+        stabil, und Paging per `start` und per cursorMark liefert dieselben Seiten.
+
+        Ergebnisse werden im `search_cache` zwischengespeichert; Schreibzugriffe auf den Core
+        verwerfen sie (siehe SolrUpdateMixin._send_update()).
+
         Args:
             query (str): Der Suchbegriff für die Textsuche.
             field (str, optional): Spezifisches Feld für die Suche. Wenn None, wird in allen Feldern gesucht.
             rows (int): Anzahl der zurückzugebenden Ergebnisse (Standard: 10).
-            start (int): Startposition für Paginierung (Standard: 0).
+            start (int): Startposition für Paginierung (Standard: 0). Wird bei `cursor_mark` nur zur Anzeige verwendet.
+            cursor_mark (str, optional): cursorMark der Seite ('*' für die erste); Deep Paging ohne `start`.
+            unique_key_field (str): Unique-Key-Feld für die stabile Sortierung.
+            schema (dict, optional): Schema für die Query-Planung (siehe plan_search()).
+            profile (str): Antwortprofil der Ansicht: 'preview', 'results' oder 'full' (siehe search_profiles.py).
 
         Returns:
-            Dict[str, Any]: Dictionary mit 'docs' (Liste der Dokumente), 'numFound' (Gesamtanzahl) und 'start' (Startposition).
+            Dict[str, Any]: Dictionary mit 'docs' (Liste der Dokumente), 'numFound' (Gesamtanzahl), 'start' (Startposition),
+                            'strategy' (gewählte Suchstrategie) und bei cursorMark-Paging 'nextCursorMark'.
         """
+        cache_key = self._search_cache_key(query, field, rows, start, cursor_mark, unique_key_field, profile)
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"Suchergebnis aus Cache: '{query}' (rows={rows}, start={start}, cursor={cursor_mark})")
+            return dict(cached)  # Aufrufer ergänzen das Ergebnis (z.B. 'page')
+        generation = search_cache.generation(self.core_url)
         try:
-            # Query aufbauen
-            if not query.strip():
-                search_query = "*:*"
-            elif field and field.strip():
-                # Feldspezifische Substring-Suche
-                # Escape special characters in query for Solr
-                escaped_query = query.replace('"', '\\"').replace('*', '\\*').replace('?', '\\?')
-                # Verwende Wildcards für Substring-Suche: *Begriff*
-                search_query = f'{field}:*{escaped_query}*'
-            else:
-                # Kein Feld angegeben - das sollte durch die UI verhindert werden
-                logger.warning("Textsuche ohne Feldangabe - das sollte nicht passieren!")
-                raise ValueError("Für Textsuche muss ein Feld angegeben werden")
-
-            logger.info(f"Führe Suche aus: '{search_query}' (rows={rows}, start={start})")
-
-            # Highlighting-Parameter für Solr
-            highlighting_params = {
-                'hl': 'true',                    # Highlighting aktivieren
-                'hl.fl': '*',                    # Alle Felder highlighten
-                'hl.simple.pre': '<mark class="bg-yellow-200 px-1 rounded">',  # HTML-Tag für Hervorhebung (Start)
-                'hl.simple.post': '</mark>',     # HTML-Tag für Hervorhebung (Ende)
-                'hl.fragsize': 150,              # Snippet-Länge
-                'hl.snippets': 3,                # Max. Anzahl Snippets pro Feld
-                'hl.maxAnalyzedChars': 1000000,  # Max. Zeichen für Analyse
-                'hl.requireFieldMatch': 'false'  # Highlighting auch in anderen Feldern
-            }
-
-            # Wenn spezifisches Feld angegeben, nur dieses highlighten
-            if field and field.strip():
-                highlighting_params['hl.fl'] = field
-
-            results = self.solr.search(q=search_query, rows=rows, start=start, **highlighting_params)
-
-            return {
-                'docs': results.docs,
-                'numFound': results.hits,
-                'start': start,
-                'rows': rows,
-                'query': search_query,
-                'highlighting': getattr(results, 'highlighting', {})
-            }
+            plan, response_profile, params = self._prepare_search(query, field, rows, start, cursor_mark,
+                                                                  unique_key_field, schema, profile)
+            results, response_bytes = self._search_measured(response_profile.name, **params)
+            result = self._search_result(plan, response_profile, results, rows, start, cursor_mark, unique_key_field)
+            search_cache.put(cache_key, result, response_bytes, generation)
+            return dict(result)
         except Exception as e:
             logger.error(f"Fehler bei der Suche mit Query '{query}' in Feld '{field}': {e}")
             raise
 
+    def _search_cache_key(self, query, field, rows, start, cursor_mark, unique_key_field, profile) -> Tuple:
+        return (self.core_url, normalize_query(query), field or None, rows,
+                None if cursor_mark else start, cursor_mark, unique_key_field, profile)
+
+    def _prepare_search(self, query: str, field: Optional[str], rows: int, start: int, cursor_mark: Optional[str],
+                        unique_key_field: str, schema: Optional[Dict[str, Any]],
+                        profile: str) -> Tuple[QueryPlan, ResponseProfile, Dict[str, Any]]:
+        """Plant die Suche und baut die Solr-Parameter (auch für AsyncSolrClient)."""
+        plan = self.plan_search(query, field, schema)
+        logger.info(f"Führe Suche aus: '{plan.query}' [{plan.strategy}] (rows={rows}, start={start}, cursor={cursor_mark})")
+
+        # Feldliste und Highlighting passend zur Ansicht
+        response_profile = get_profile(profile)
+        params = response_profile.params(unique_key_field, field if field and field.strip() else None, schema)
+        if plan.search_field != plan.field:
+            # Treffer kommen aus einem Hilfsfeld; hervorgehoben wird im gewählten Feld
+            params['hl.q'] = QueryPlanner.fallback(field, query.strip('*')).query
+        params.update(q=plan.query, rows=rows, sort=self._search_sort(unique_key_field))
+        if cursor_mark:
+            params['cursorMark'] = cursor_mark
+        else:
+            params['start'] = start
+        return plan, response_profile, params
+
+    def _search_result(self, plan: QueryPlan, response_profile: ResponseProfile, results: pysolr.Results,
+                       rows: int, start: int, cursor_mark: Optional[str], unique_key_field: str) -> Dict[str, Any]:
+        """Baut das Ergebnis-Dictionary von search_documents() und füllt den Dokument-Cache."""
+        if response_profile.full_documents:
+            self.document_cache.put_many(results.docs, unique_key_field)
+        return {
+            'docs': results.docs,
+            'numFound': results.hits,
+            'start': start,
+            'rows': rows,
+            'query': plan.query,
+            'highlighting': getattr(results, 'highlighting', {}),
+            'strategy': plan.label,
+            'profile': response_profile.name,
+            'nextCursorMark': results.nextCursorMark if cursor_mark else None
+        }
+
+    def advance_cursor(self, query: str, field: Optional[str], cursor_mark: str, skip: int,
+                       unique_key_field: str = 'id', schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Springt von `cursor_mark` um `skip` Treffer weiter und gibt den neuen cursorMark zurück.
+
+        Es wird nur der Unique Key geladen (fl), ohne Highlighting - deutlich günstiger als
+        die übersprungenen Seiten einzeln abzurufen.
+        """
+        results = self.solr.search(q=self.plan_search(query, field, schema).query, rows=skip, fl=unique_key_field,
+                                   sort=self._search_sort(unique_key_field), cursorMark=cursor_mark)
+        return results.nextCursorMark
+
+    def _search_measured(self, profile: str, **params) -> Tuple[pysolr.Results, int]:
+        """Wie `solr.search()`, zählt aber die Antwortgröße je Antwortprofil mit und gibt sie zurück."""
+        response = self.solr._select(params)
+        results = pysolr.Results(self.solr.decoder.decode(response))
+        response_bytes = len(response.encode('utf-8'))
+        response_stats.record(profile, response_bytes, len(results.docs))
+        return results, response_bytes
+
+    @staticmethod
+    def _search_sort(unique_key_field: str) -> str:
+        return f'score desc,{unique_key_field} asc'
+
     def check_update_log_status(self) -> bool:
         """Prüft, ob der <updateLog/> in der solrconfig.xml für den Core aktiviert ist."""
         if self._update_log_status is not None:
             return self._update_log_status
 
         try:
-            config_url = f"{self.core_url}/config"
-            response = requests.get(config_url, params={'wt': 'json'})
-            response.raise_for_status()
-            config = response.json()
-            # Ältere Solr-Versionen geben einen flachen Schlüssel zurück, z.B. 'updateHandlerupdateLog'.
-            # Wir prüfen beide Varianten: die moderne, verschachtelte und die alte, flache.
-            update_handler_config = config.get('config', {}).get('updateHandler', {})
-            has_nested_update_log = 'updateLog' in update_handler_config
-            has_flat_update_log = 'updateHandlerupdateLog' in config.get('config', {})
-
-            has_update_log = has_nested_update_log or has_flat_update_log
+            has_update_log = update_log_enabled(self._get_json('config'))
             logger.info(f"UpdateLog-Status für {self.core_url} ist: {'Aktiviert' if has_update_log else 'Deaktiviert'}")
             self._update_log_status = has_update_log
             return has_update_log
@@ -228,54 +511,87 @@ class SolrClient:
             self._update_log_status = False
             return False
 
-    def _update_atomic(self, unique_key_field: str, doc_id: str, field_name: str, field_value: Any):
-        """Führt ein atomares Update für ein einzelnes Feld durch."""
-        doc_update = {
-            unique_key_field: doc_id,
-            field_name: {'set': field_value}
-        }
-        self.solr.add([doc_update], commit=True)
-        logger.info("Atomares Update durchgeführt.")
-
-    def _update_full_document(self, unique_key_field: str, doc_id: str, field_name: str, field_value: Any, copy_fields: list = None):
-        """Führt ein Update durch, indem das gesamte Dokument neu indiziert wird."""
-        if copy_fields is None:
-            copy_fields = []
-        doc = self.get_document_by_id(unique_key_field, doc_id)
-        if not doc:
-            raise ValueError(f"Dokument mit ID '{doc_id}' nicht gefunden.")
-        doc[field_name] = field_value
-        if '_version_' in doc:
-            del doc['_version_']
-        dest_fields = {cf['dest'] for cf in copy_fields}
-        for df in dest_fields:
-            if df in doc:
-                del doc[df]
-        self.solr.add([doc], commit=True)
-        logger.info("Full-Document-Update durchgeführt.")
-
-    def update_document_field(self, use_atomic_update: bool, unique_key_field: str, doc_id: str, field_name: str, field_value: Any, copy_fields: list = None):
-        """Aktualisiert ein Feld in einem Solr-Dokument basierend auf der gewählten Strategie."""
-        try:
-            if use_atomic_update:
-                self._update_atomic(unique_key_field, doc_id, field_name, field_value)
-            else:
-                self._update_full_document(unique_key_field, doc_id, field_name, field_value, copy_fields)
-            logger.success(f"Feld '{field_name}' für Dokument '{doc_id}' erfolgreich aktualisiert.")
-        except Exception as e:
-            logger.error(f"Fehler beim Aktualisieren des Feldes '{field_name}' für Dokument '{doc_id}': {e}")
-            raise
-
-    def update_document(self, doc: Dict[str, Any]):
-        """
-        Aktualisiert ein komplettes Dokument in Solr.
 
-        Args:
-            doc (Dict[str, Any]): Das zu aktualisierende Dokument
-        """
-        try:
-            self.solr.add([doc], commit=True)
-            logger.info(f"Dokument erfolgreich aktualisiert")
-        except Exception as e:
-            logger.error(f"Fehler beim Aktualisieren des Dokuments: {e}")
-            raise
+def update_log_enabled(config: Dict[str, Any]) -> bool:
+    """Wertet die Antwort der Config-API (/config) auf einen aktivierten <updateLog/> aus."""
+    # Ältere Solr-Versionen geben einen flachen Schlüssel zurück, z.B. 'updateHandlerupdateLog'.
+    # Wir prüfen beide Varianten: die moderne, verschachtelte und die alte, flache.
+    update_handler_config = config.get('config', {}).get('updateHandler', {})
+    has_nested_update_log = 'updateLog' in update_handler_config
+    has_flat_update_log = 'updateHandlerupdateLog' in config.get('config', {})
+    return has_nested_update_log or has_flat_update_log
+
+
+def _pairs(values) -> List[Tuple[str, int]]:
+    """Wandelt Solrs Named-List (flach ['a', 3, 'b', 1] oder {'a': 3}) in (Wert, Anzahl)-Paare um."""
+    if isinstance(values, dict):
+        return list(values.items())
+    return [(str(values[i]), values[i + 1]) for i in range(0, len(values) - 1, 2)]
+
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Teilt ein (evtl. unendliches) Iterable in Listen der Länge `size`."""
+    batch = []
+    for item in items:
+        batch.append(str(item))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# (URL, Core, Commit-Strategie) -> Client; LRU, damit z.B. föderierte Ziele den Pool nicht endlos füllen
+_clients: "OrderedDict[Tuple[str, str, str], SolrClient]" = OrderedDict()
+_clients_lock = threading.Lock()
+MAX_CLIENTS = 64
+
+
+def get_client(solr_url: str, core: str, commit_policy: Optional[CommitPolicy] = None) -> SolrClient:
+    """
+    Liefert einen wiederverwendbaren SolrClient für Server und Core.
+
+    Clients sind zustandsarm (Session kommt aus `transport`), daher wird pro Core-URL
+    nur eine Instanz erzeugt. Gecachte Informationen wie der UpdateLog-Status bleiben
+    so über Verbindungswechsel hinweg erhalten.
+
+    Die Commit-Strategie ist Teil des Schlüssels: Wählen zwei Sessions für denselben Core
+    verschiedene Strategien, erhält jede eine eigene Variante (`with_commit_policy()`),
+    statt die Strategie der anderen zu überschreiben. Ohne Angabe gilt `hard`. Der Pool
+    hält höchstens `MAX_CLIENTS` Clients; verdrängte führen ihren Gruppen-Commit noch aus.
+
+    Args:
+        commit_policy (CommitPolicy, optional): Commit-Strategie der Verbindung.
+    """
+    policy = str(commit_policy or CommitPolicy())
+    base_key = (solr_url.rstrip('/'), core, str(CommitPolicy()))
+    key = base_key[:2] + (policy,)
+    evicted = []
+    with _clients_lock:
+        client = _pooled(base_key, lambda: SolrClient(solr_url, core), evicted)
+        if key != base_key:
+            base = client
+            client = _pooled(key, lambda: base.with_commit_policy(commit_policy), evicted)
+    for old in evicted:
+        old.flush_commits()
+    return client
+
+
+def _pooled(key: Tuple[str, str, str], create, evicted: List[SolrClient]) -> SolrClient:
+    """Holt bzw. erzeugt einen Client im LRU-Pool; Aufruf unter `_clients_lock`."""
+    client = _clients.get(key)
+    if client is not None:
+        _clients.move_to_end(key)
+        return client
+    client = _clients[key] = create()
+    while len(_clients) > MAX_CLIENTS:
+        evicted.append(_clients.popitem(last=False)[1])
+    return client
+
+
+def flush_all_commits():
+    """Führt die anstehenden Gruppen-Commits aller Clients aus (beim Herunterfahren)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    for client in clients:
+        client.flush_commits()
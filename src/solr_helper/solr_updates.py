@@ -0,0 +1,274 @@
+"""
+Schreibzugriffe auf Solr: atomare Updates, Full-Document-Updates und optimistische Sperren.
+
+Wird als Mixin von `SolrClient` verwendet und setzt dessen Attribute `core_url`,
+`session`, `timeout`, `document_cache` und `get_document_by_id()` voraus. Wann committet wird, bestimmt
+die `CommitPolicy` der Verbindung (siehe commit_policy.py).
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+import pysolr
+import requests
+from loguru import logger
+
+from .commit_policy import CommitPolicy, GroupCommitScheduler
+from .search_cache import search_cache
+
+COMMIT_MARGIN = 1.0  # Sekunden für das Öffnen des neuen Searchers nach commitWithin
+
+
+class VersionConflictError(Exception):
+    """Das Dokument wurde seit dem Lesen von jemand anderem geändert (_version_ passt nicht)."""
+
+    def __init__(self, doc_id: str, message: Optional[str] = None):
+        self.doc_id = doc_id
+        super().__init__(message or f"Das Dokument '{doc_id}' wurde zwischenzeitlich geändert. "
+                                    "Bitte neu laden und die Änderung erneut vornehmen.")
+
+
+def strip_copy_field_targets(doc: Dict[str, Any], copy_fields: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Entfernt `_version_` und alle copyField-Ziele aus einem Dokument vor der Neu-Indizierung.
+
+    Solr füllt copyField-Ziele selbst; würden sie mitgeschickt, entstehen doppelte Werte
+    (z.B. "DocValuesField appears more than once").
+    """
+    doc.pop('_version_', None)
+    for dest in {cf['dest'] for cf in copy_fields or []}:
+        doc.pop(dest, None)
+    return doc
+
+
+class SolrUpdateMixin:
+    """Update-Methoden für SolrClient."""
+
+    commit_policy = CommitPolicy()
+    _group_commit: Optional[GroupCommitScheduler] = None
+
+    def set_commit_policy(self, policy: CommitPolicy):
+        """Setzt die Commit-Strategie dieser Verbindung (z.B. CommitPolicy.parse('within:2000'))."""
+        if self._group_commit is not None:
+            self._group_commit.flush()
+            self._group_commit = None
+        self.commit_policy = policy
+        if policy.mode == 'group':
+            self._group_commit = GroupCommitScheduler(lambda: self.commit(soft=True), policy.interval_ms)
+        logger.info(f"Commit-Strategie für {self.core_url}: {policy}")
+
+    def flush_commits(self):
+        """Führt einen anstehenden Gruppen-Commit sofort aus (z.B. beim Herunterfahren)."""
+        if self._group_commit is not None:
+            self._group_commit.flush()
+
+    def commit(self, soft: bool = False):
+        """Führt einen expliziten (harten oder weichen) Commit aus."""
+        self._send_update([], commit_params={'softCommit' if soft else 'commit': 'true'})
+
+    def write_batch(self, docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Schreibt Dokumente bzw. atomare Updates ohne Commit (Import, Kopie, Massenänderungen).
+
+        Der Aufrufer committet am Ende einmal selbst (`commit()`).
+
+        Raises:
+            VersionConflictError: Wenn Solr ein Dokument wegen `_version_` ablehnt (HTTP 409).
+            pysolr.SolrError: Bei allen anderen Solr-Fehlern.
+        """
+        return self._send_update(docs, commit_params={})
+
+    def _send_update(self, docs: List[Dict[str, Any]], commit_params: Optional[Dict[str, str]] = None,
+                     **params) -> Dict[str, Any]:
+        """
+        Schickt Dokumente als JSON an den Update-Handler und gibt die Solr-Antwort zurück.
+
+        Mit `versions=true` meldet Solr die neuen `_version_`-Werte zurück ('adds': [id, version, ...]).
+
+        Args:
+            commit_params (dict, optional): Commit-Parameter; Standard aus der Commit-Strategie.
+                                            Ein leeres Dict unterdrückt den Commit (z.B. für Bulk-Jobs).
+
+        Raises:
+            VersionConflictError: Wenn Solr mit HTTP 409 (Versionskonflikt) antwortet.
+            pysolr.SolrError: Bei allen anderen Solr-Fehlern.
+        """
+        request_params = self._update_params(commit_params, params)
+        try:
+            response = self.session.post(f"{self.core_url}/update", params=request_params,
+                                         data=json.dumps(docs), timeout=self.timeout,
+                                         headers={'Content-Type': 'application/json'})
+        except requests.exceptions.RequestException as e:
+            self.document_cache.clear()
+            raise pysolr.SolrError(f"Update an {self.core_url} fehlgeschlagen: {e}")
+        finally:
+            # Auch ein fehlgeschlagener Batch kann teilweise geschrieben worden sein
+            search_cache.invalidate(self.core_url, pending_for=self._visible_after(request_params, commit_params))
+        return self._handle_update_response(response, docs, use_policy=commit_params is None)
+
+    def _update_params(self, commit_params: Optional[Dict[str, str]], params: Dict[str, Any]) -> Dict[str, Any]:
+        request_params = {'wt': 'json', 'versions': 'true'}
+        request_params.update(self.commit_policy.update_params() if commit_params is None else commit_params)
+        request_params.update(params)
+        return request_params
+
+    def _visible_after(self, request_params: Dict[str, Any], commit_params: Optional[Dict[str, str]]) -> float:
+        """Sekunden, bis ein Update mit diesen Parametern durchsuchbar ist (0 = mit der Antwort)."""
+        if request_params.get('commit') == 'true' or request_params.get('softCommit') == 'true':
+            return 0
+        if 'commitWithin' in request_params:
+            return int(request_params['commitWithin']) / 1000 + COMMIT_MARGIN
+        if commit_params is None and self._group_commit is not None:
+            return self.commit_policy.interval_ms / 1000 + COMMIT_MARGIN
+        # Ohne Commit (Policy `none`, Bulk-Batches bis zum abschließenden commit()): Zeitpunkt unbekannt
+        return search_cache.ttl
+
+    def _handle_update_response(self, response, docs: List[Dict[str, Any]], use_policy: bool) -> Dict[str, Any]:
+        """Wertet die Antwort des Update-Handlers aus (requests- oder httpx-Response)."""
+        if response.status_code == 409:
+            raise VersionConflictError('', _solr_error_message(response))
+        if response.status_code != 200:
+            self.document_cache.clear()
+            raise pysolr.SolrError(f"Solr responded with an error (HTTP {response.status_code}): {_solr_error_message(response)}")
+        if use_policy and docs and self._group_commit is not None:
+            self._group_commit.request()
+        result = response.json()
+        if result.get('adds'):
+            self.document_cache.written(result['adds'])
+        elif docs:
+            self.document_cache.clear()  # Ohne Versionen ist unklar, welche Dokumente betroffen sind
+        return result
+
+    def _update_atomic(self, unique_key_field: str, doc_id: str, field_name: str, field_value: Any,
+                       expected_version: Optional[int] = None) -> Optional[int]:
+        """Führt ein atomares Update für ein einzelnes Feld durch und gibt die neue Version zurück."""
+        doc_update = atomic_update_doc(unique_key_field, doc_id, field_name, field_value, expected_version)
+        try:
+            result = self._send_update([doc_update])
+        except VersionConflictError:
+            raise VersionConflictError(doc_id)
+        logger.info("Atomares Update durchgeführt.")
+        return new_version_of(result, doc_id)
+
+    def _update_full_document(self, unique_key_field: str, doc_id: str, field_name: str, field_value: Any,
+                              copy_fields: list = None, doc: Optional[Dict[str, Any]] = None,
+                              expected_version: Optional[int] = None) -> Optional[int]:
+        """
+        Führt ein Update durch, indem das gesamte Dokument neu indiziert wird.
+
+        Ohne <updateLog/> prüft Solr keine Versionen, daher wird `expected_version` hier
+        clientseitig gegen das gelesene Dokument geprüft.
+        """
+        if doc is None:
+            doc = self.get_document_by_id(unique_key_field, doc_id, use_cache=False)
+        new_doc = full_update_doc(doc, doc_id, field_name, field_value, copy_fields, expected_version)
+        result = self._send_update([new_doc])
+        logger.info("Full-Document-Update durchgeführt.")
+        return new_version_of(result, doc_id)
+
+    def update_document_field(self, use_atomic_update: bool, unique_key_field: str, doc_id: str, field_name: str,
+                              field_value: Any, copy_fields: list = None, doc: Optional[Dict[str, Any]] = None,
+                              expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Aktualisiert ein Feld in einem Solr-Dokument basierend auf der gewählten Strategie.
+
+        Args:
+            doc (dict, optional): Bereits gelesenes Dokument; spart einen weiteren Abruf.
+            expected_version (int, optional): `_version_` beim Lesen; bei Abweichung wird
+                                              VersionConflictError geworfen statt zu überschreiben.
+
+        Returns:
+            Optional[Dict[str, Any]]: Das lokal zusammengeführte, aktualisierte Dokument
+                                      (None, wenn kein Dokument übergeben wurde und atomar aktualisiert wurde).
+        """
+        try:
+            if use_atomic_update:
+                new_version = self._update_atomic(unique_key_field, doc_id, field_name, field_value, expected_version)
+            else:
+                if doc is None:
+                    doc = self.get_document_by_id(unique_key_field, doc_id, use_cache=False)
+                new_version = self._update_full_document(unique_key_field, doc_id, field_name, field_value,
+                                                         copy_fields, doc, expected_version)
+            logger.success(f"Feld '{field_name}' für Dokument '{doc_id}' erfolgreich aktualisiert.")
+        except VersionConflictError:
+            logger.warning(f"Versionskonflikt beim Aktualisieren von '{field_name}' in Dokument '{doc_id}'")
+            self.document_cache.invalidate(doc_id)  # Gecachter Stand ist überholt
+            raise
+        except Exception as e:
+            logger.error(f"Fehler beim Aktualisieren des Feldes '{field_name}' für Dokument '{doc_id}': {e}")
+            raise
+
+        return merged_document(doc, field_name, field_value, new_version)
+
+    def update_document(self, doc: Dict[str, Any]):
+        """
+        Aktualisiert ein komplettes Dokument in Solr.
+
+        Args:
+            doc (Dict[str, Any]): Das zu aktualisierende Dokument
+        """
+        try:
+            self._send_update([doc])
+            logger.info(f"Dokument erfolgreich aktualisiert")
+        except Exception as e:
+            logger.error(f"Fehler beim Aktualisieren des Dokuments: {e}")
+            raise
+
+
+def atomic_update_doc(unique_key_field: str, doc_id: str, field_name: str, field_value: Any,
+                      expected_version: Optional[int] = None) -> Dict[str, Any]:
+    """Baut das Update-Dokument für ein atomares `set` auf ein Feld."""
+    doc_update = {
+        unique_key_field: doc_id,
+        field_name: {'set': field_value}
+    }
+    if expected_version:
+        # Optimistische Sperre: Solr lehnt das Update ab, wenn sich die Version geändert hat
+        doc_update['_version_'] = expected_version
+    return doc_update
+
+
+def full_update_doc(doc: Optional[Dict[str, Any]], doc_id: str, field_name: str, field_value: Any,
+                    copy_fields: Optional[list] = None, expected_version: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Baut das neu zu indizierende Dokument für ein Full-Document-Update.
+
+    Raises:
+        ValueError: Wenn das Dokument nicht existiert.
+        VersionConflictError: Wenn `expected_version` nicht zum gelesenen Dokument passt.
+    """
+    if not doc:
+        raise ValueError(f"Dokument mit ID '{doc_id}' nicht gefunden.")
+    if expected_version and doc.get('_version_') not in (None, expected_version):
+        raise VersionConflictError(doc_id)
+    new_doc = strip_copy_field_targets(dict(doc), copy_fields)
+    new_doc[field_name] = field_value
+    return new_doc
+
+
+def merged_document(doc: Optional[Dict[str, Any]], field_name: str, field_value: Any,
+                    new_version: Optional[int]) -> Optional[Dict[str, Any]]:
+    """Führt den neuen Feldwert lokal in das gelesene Dokument ein (ohne weiteren Abruf)."""
+    if doc is None:
+        return None
+    updated_doc = dict(doc)
+    updated_doc[field_name] = field_value
+    if new_version is not None:
+        updated_doc['_version_'] = new_version
+    return updated_doc
+
+
+def new_version_of(result: Dict[str, Any], doc_id: str) -> Optional[int]:
+    """Liest die neue _version_ eines Dokuments aus einer Update-Antwort mit versions=true."""
+    adds = result.get('adds') or []
+    for i in range(0, len(adds) - 1, 2):
+        if str(adds[i]) == str(doc_id):
+            return adds[i + 1]
+    return None
+
+
+def _solr_error_message(response: requests.Response) -> str:
+    """Extrahiert die Fehlermeldung aus einer Solr-Fehlerantwort."""
+    try:
+        return response.json().get('error', {}).get('msg') or response.text
+    except ValueError:
+        return response.text[:500]
@@ -0,0 +1,141 @@
+"""
+Gemeinsame HTTP-Transportschicht für alle Solr-Aufrufe.
+
+Pro Prozess wird genau eine `requests.Session` je Solr-Basis-URL (Schema + Host + Port)
+gehalten. Alle `SolrClient`-Instanzen für denselben Server teilen sich damit den
+Keep-Alive-Verbindungspool - egal ob Schema-, Config-, Such- oder Update-Anfragen.
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from loguru import logger
+
+from . import metrics
+
+# Standardwerte, können über configure() (CLI/ENV/config.toml) überschrieben werden
+DEFAULT_POOL_CONNECTIONS = 10   # Anzahl gecachter Host-Pools pro Session
+DEFAULT_POOL_MAXSIZE = 20       # Max. offene Verbindungen pro Host
+DEFAULT_MAX_RETRIES = 2         # Wiederholungen bei Verbindungsfehlern
+DEFAULT_CONNECT_TIMEOUT = 5.0   # Sekunden bis zum Verbindungsaufbau
+DEFAULT_READ_TIMEOUT = 10.0     # Sekunden bis zur Antwort
+
+_settings = {
+    'pool_connections': DEFAULT_POOL_CONNECTIONS,
+    'pool_maxsize': DEFAULT_POOL_MAXSIZE,
+    'max_retries': DEFAULT_MAX_RETRIES,
+    'connect_timeout': DEFAULT_CONNECT_TIMEOUT,
+    'read_timeout': DEFAULT_READ_TIMEOUT,
+}
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def configure(**settings):
+    """
+    Setzt Poolgrößen und Timeouts für alle künftig erzeugten Sessions.
+
+    Bereits bestehende Sessions werden geschlossen, damit die neuen Werte greifen.
+
+    Args:
+        **settings: pool_connections, pool_maxsize, max_retries, connect_timeout, read_timeout.
+                    Werte mit None werden ignoriert.
+    """
+    unknown = set(settings) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unbekannte Transport-Einstellungen: {', '.join(sorted(unknown))}")
+    with _lock:
+        for key, value in settings.items():
+            if value is not None:
+                _settings[key] = value
+    close_all()
+    logger.debug(f"Transport konfiguriert: {_settings}")
+
+
+def get_timeout() -> Tuple[float, float]:
+    """Gibt das (connect, read)-Timeout-Tupel für requests zurück."""
+    return (_settings['connect_timeout'], _settings['read_timeout'])
+
+
+def base_url_key(url: str) -> str:
+    """Normalisiert eine Solr-URL auf ihren Schlüssel (Schema://Host:Port)."""
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+class TimedSession(requests.Session):
+    """Session, die jede Anfrage in `metrics` erfasst, sofern die Messung eingeschaltet ist."""
+
+    def request(self, method, url, *args, **kwargs):
+        if not metrics.enabled:
+            return super().request(method, url, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            metrics.observe(url, time.perf_counter() - started, None, failed=True)
+            raise
+        # stream=False: der Body ist hier bereits gelesen
+        metrics.observe(url, time.perf_counter() - started, response.content, failed=response.status_code >= 400)
+        return response
+
+
+def _create_session() -> requests.Session:
+    session = TimedSession()
+    session.stream = False
+    adapter = HTTPAdapter(
+        pool_connections=_settings['pool_connections'],
+        pool_maxsize=_settings['pool_maxsize'],
+        max_retries=_settings['max_retries'],
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Liefert die gemeinsame Session für den Solr-Server hinter `url`.
+
+    Args:
+        url (str): Beliebige URL des Solr-Servers (Basis- oder Core-URL).
+
+    Returns:
+        requests.Session: Die prozessweit geteilte Session mit Keep-Alive-Pool.
+    """
+    key = base_url_key(url)
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _create_session()
+            _sessions[key] = session
+            logger.debug(f"Neue HTTP-Session für '{key}' angelegt (Pool: {_settings['pool_maxsize']})")
+        return session
+
+
+def close_all():
+    """Schließt alle Sessions (z.B. nach einem Fork oder bei Konfigurationsänderung)."""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def request_json(session: requests.Session, method: str, url: str,
+                 timeout: Optional[Union[float, Tuple[float, float]]] = None, **kwargs) -> dict:
+    """
+    Führt eine Anfrage über die gegebene Session aus und gibt das JSON-Ergebnis zurück.
+
+    Raises:
+        requests.exceptions.RequestException: Bei Netzwerk- oder HTTP-Fehlern.
+    """
+    response = session.request(method, url, timeout=timeout or get_timeout(), **kwargs)
+    response.raise_for_status()
+    return response.json()
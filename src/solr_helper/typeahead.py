@@ -0,0 +1,179 @@
+"""
+Vorschläge für Feldnamen und Feldwerte (Typeahead).
+
+`FieldIndex` ist ein einmal pro Schema gebauter Präfix-Index über alle indizierten
+Felder und dynamischen Feldmuster. Gesucht wird per Binärsuche in einer sortierten
+Schlüsselliste; jeder Feldname ist unter seinem vollen Namen und unter jedem Namensteil
+nach `_`, `.` oder `-` eingetragen (`tit` findet `title`, `txt` findet `*_txt` und
+`author_txt`). Ein eingegebener Name, der auf ein dynamisches Muster passt, wird als
+konkretes Feld vorgeschlagen.
+
+`ValueSuggestions` cacht Wertvorschläge (Terms-Komponente bzw. facet.prefix) pro Feld
+in einem LRU. Ist ein Ergebnis für einen kürzeren Präfix vollständig, werden längere
+Präfixe lokal daraus gefiltert, ohne Solr zu fragen.
+"""
+import bisect
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .field_resolver import FieldResolver
+
+SUGGEST_LIMIT = 20
+_SEGMENT_BOUNDARY = re.compile(r'[_.\-]')
+
+
+class FieldIndex:
+    """Präfix-Index über die indizierten Felder eines Schemas."""
+
+    def __init__(self, schema: Dict[str, Any]):
+        self._resolver = FieldResolver.for_schema(schema)
+        fields = []
+        for field in self._resolver.sorted_static_fields:
+            if field.get('indexed', True):
+                fields.append({'name': field['name'], 'type': field.get('type', 'unknown'),
+                               'multiValued': field.get('multiValued', False)})
+        for field in self._resolver.dynamic_fields:
+            if field.get('indexed', True):
+                fields.append({'name': field['name'], 'type': field.get('type', 'unknown'),
+                               'multiValued': field.get('multiValued', False), 'dynamic': True})
+        fields.sort(key=lambda f: f['name'])
+        self.fields: List[Dict[str, Any]] = fields
+
+        # (Schlüssel, Position des Schlüssels im Namen, Feldindex); Position 0 = voller Name
+        entries = []
+        for index, field in enumerate(fields):
+            name = field['name'].lower()
+            entries.append((name, 0, index))
+            for match in _SEGMENT_BOUNDARY.finditer(name):
+                rest = name[match.end():].lstrip('*')
+                if rest:
+                    entries.append((rest, match.end(), index))
+        entries.sort()
+        self._keys = [entry[0] for entry in entries]
+        self._entries = entries
+
+    def suggest(self, term: str, limit: int = SUGGEST_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Felder, deren Name oder ein Namensteil mit `term` beginnt.
+
+        Treffer am Namensanfang stehen vor Treffern in Namensteilen. Passt `term` auf ein
+        dynamisches Muster, steht der konkrete Name an erster Stelle.
+        """
+        term = term.strip()
+        if not term:
+            return self.fields[:limit]
+        lowered = term.lower()
+        suggestions: List[Dict[str, Any]] = []
+        seen = set()
+        if '*' not in term and not self._resolver.is_static(term):
+            pattern = self._resolver.match_dynamic(term)
+            if pattern is not None and pattern.get('indexed', True):
+                suggestions.append({'name': term, 'type': pattern.get('type', 'unknown'),
+                                    'multiValued': pattern.get('multiValued', False),
+                                    'dynamic': True, 'pattern': pattern['name']})
+        start = bisect.bisect_left(self._keys, lowered)
+        matches: List[Tuple[int, str, int]] = []
+        for key, position, index in self._entries[start:]:
+            if not key.startswith(lowered):
+                break
+            matches.append((0 if position == 0 else 1, self.fields[index]['name'], index))
+        for _, _, index in sorted(matches):
+            if index not in seen:
+                seen.add(index)
+                suggestions.append(self.fields[index])
+                if len(suggestions) >= limit:
+                    break
+        return suggestions
+
+    @classmethod
+    def for_schema(cls, schema: Dict[str, Any]) -> 'FieldIndex':
+        """Liefert den (einmal pro Schema-Objekt gebauten) Index für `schema`."""
+        entry = _indexes.get(id(schema))
+        if entry is not None and entry[0] is schema:
+            return entry[1]
+        index = cls(schema)
+        with _indexes_lock:
+            if len(_indexes) >= INDEX_LIMIT:
+                _indexes.pop(next(iter(_indexes)))
+            _indexes[id(schema)] = (schema, index)
+        logger.debug(f"Feld-Index gebaut: {len(index.fields)} Felder, {len(index._keys)} Schlüssel")
+        return index
+
+
+INDEX_LIMIT = 16
+_indexes: Dict[int, Tuple[Dict[str, Any], FieldIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+MAX_FIELDS = 200            # Felder mit gecachten Vorschlägen
+MAX_PREFIXES_PER_FIELD = 500
+VALUE_TTL = 300.0           # Sekunden; neue Werte im Index erscheinen spätestens danach
+
+
+class ValueSuggestions:
+    """LRU-Cache für Wertvorschläge, pro (Core, Feld) mit eigenem Präfix-LRU."""
+
+    def __init__(self, max_fields: int = MAX_FIELDS, max_prefixes: int = MAX_PREFIXES_PER_FIELD,
+                 ttl: float = VALUE_TTL):
+        self.max_fields = max_fields
+        self.max_prefixes = max_prefixes
+        self.ttl = ttl
+        # (core_url, Feld) -> Präfix -> (Ablaufzeit, Limit, [(Wert, Anzahl), ...])
+        self._fields: "OrderedDict[Tuple[str, str], OrderedDict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key: Tuple[str, str], prefix: str, limit: int) -> Optional[List[Tuple[str, int]]]:
+        prefixes = self._fields.get(key)
+        if prefixes is None:
+            return None
+        self._fields.move_to_end(key)
+        now = time.monotonic()
+        entry = prefixes.get(prefix)
+        if entry is not None and entry[0] > now and entry[1] >= limit:
+            prefixes.move_to_end(prefix)
+            return entry[2][:limit]
+        # Vollständiges Ergebnis (weniger Werte als angefragt) eines kürzeren Präfixes?
+        for length in range(len(prefix) - 1, -1, -1):
+            shorter = prefixes.get(prefix[:length])
+            if shorter is not None and shorter[0] > now and len(shorter[2]) < shorter[1]:
+                return [pair for pair in shorter[2] if pair[0].startswith(prefix)][:limit]
+        return None
+
+    def get(self, client, field: str, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Wertvorschläge für `prefix` in `field`; fragt Solr nur bei einem Cache-Fehlschlag."""
+        key = (client.core_url, field)
+        with self._lock:
+            cached = self._lookup(key, prefix, limit)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+        values = client.suggest_values(field, prefix, limit)
+        with self._lock:
+            prefixes = self._fields.setdefault(key, OrderedDict())
+            self._fields.move_to_end(key)
+            prefixes[prefix] = (time.monotonic() + self.ttl, limit, values)
+            prefixes.move_to_end(prefix)
+            while len(prefixes) > self.max_prefixes:
+                prefixes.popitem(last=False)
+            while len(self._fields) > self.max_fields:
+                self._fields.popitem(last=False)
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._fields.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'fields': len(self._fields), 'hits': self.hits, 'misses': self.misses}
+
+
+value_suggestions = ValueSuggestions()
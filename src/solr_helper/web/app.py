@@ -5,11 +5,18 @@ import sys
 from flask import Flask
 from loguru import logger
 
-from ..solr_client import SolrClient
+from ..config import load_secret_key
 from .routes.connection import connection_bp
 from .routes.search import search_bp
 from .routes.record import record_bp
 from .routes.api import api_bp
+from .routes.bulk import bulk_bp
+from .routes.federated import federated_bp
+from .routes.field_stats import field_stats_bp
+from .routes.metrics import metrics_bp
+from .utils.connection_registry import connection_key, connection_registry
+from .utils.streaming import precompile_templates
+from .utils.timing import register_timing
 
 
 def create_app_for_connection_management(debug=False):
@@ -22,30 +29,36 @@ def create_app_for_connection_management(debug=False):
     log_format = "{time:YYYY-MM-DD HH:mm:ss} | {level:<8} | {name}:{function}:{line} - {message}" if debug else "{time:YYYY-MM-DD HH:mm:ss} | {level:<8} | {message}"
     logger.add(sys.stderr, level=log_level, format=log_format)
 
-    # App-State für aktuelle Verbindung
-    app.config['CURRENT_CONNECTION'] = None
-    app.config['CURRENT_SCHEMA'] = None
-    app.config['CURRENT_CLIENT'] = None
+    # Die Verbindung wählt jede Session selbst (siehe utils/auth.py)
+    app.secret_key = load_secret_key()
+    app.config['DEFAULT_CONNECTION'] = None
 
     # Register blueprints
     app.register_blueprint(connection_bp)
     app.register_blueprint(search_bp)
     app.register_blueprint(record_bp)
     app.register_blueprint(api_bp)
+    app.register_blueprint(bulk_bp)
+    app.register_blueprint(federated_bp)
+    app.register_blueprint(field_stats_bp)
+    app.register_blueprint(metrics_bp)
+    register_timing(app)
+    precompile_templates(app)
 
     logger.info("Flask-App für Connection Management erstellt")
     return app
 
 
-def create_app(solr_url: str, core: str, schema: dict, debug=False):
+def create_app(solr_url: str, core: str, schema: dict, debug=False, commit_policy: str = None):
     """
     Erstellt eine Flask-App mit fester Solr-Verbindung.
 
     Args:
         solr_url (str): Solr-Server URL
         core (str): Solr-Core Name
-        schema (dict): Solr-Schema
+        schema (dict): Solr-Schema (bereits abgerufen; das Register liest es aus dem Schema-Cache)
         debug (bool): Debug-Modus aktivieren
+        commit_policy (str): Commit-Strategie der festen Verbindung (z.B. 'group:500')
 
     Returns:
         Flask: Konfigurierte Flask-App
@@ -59,36 +72,31 @@ def create_app(solr_url: str, core: str, schema: dict, debug=False):
     logger.add(sys.stderr, level=log_level, format=log_format)
 
     # Konfiguration im App-Kontext speichern
+    app.secret_key = load_secret_key()
     app.config['SOLR_URL'] = solr_url
     app.config['CORE'] = core
-    app.config['SCHEMA'] = schema
 
-    # Erstelle Client und setze als "aktuelle Verbindung"
+    # Feste Verbindung im Register anlegen; sie gilt für alle Sessions ohne eigene Auswahl
     try:
-        client = SolrClient(solr_url, core)
-        client.check_connection()
-        
-        app.config['CURRENT_CONNECTION'] = {
-            'url': solr_url,
-            'core': core,
-            'name': f"{core} @ {solr_url}"
-        }
-        app.config['CURRENT_CLIENT'] = client
-        app.config['CURRENT_SCHEMA'] = schema
-        
+        connection_registry.pin(solr_url, core, commit_policy=commit_policy)
+        app.config['DEFAULT_CONNECTION'] = connection_key(solr_url, core, commit_policy)
         logger.info(f"Flask-App mit fester Verbindung erstellt: {solr_url}/solr/{core}")
         
     except Exception as e:
         logger.error(f"Fehler beim Erstellen der App mit fester Verbindung: {e}")
         # Fallback: App ohne Verbindung erstellen
-        app.config['CURRENT_CONNECTION'] = None
-        app.config['CURRENT_CLIENT'] = None
-        app.config['CURRENT_SCHEMA'] = None
+        app.config['DEFAULT_CONNECTION'] = None
 
     # Register blueprints
     app.register_blueprint(connection_bp)
     app.register_blueprint(search_bp)
     app.register_blueprint(record_bp)
     app.register_blueprint(api_bp)
+    app.register_blueprint(bulk_bp)
+    app.register_blueprint(federated_bp)
+    app.register_blueprint(field_stats_bp)
+    app.register_blueprint(metrics_bp)
+    register_timing(app)
+    precompile_templates(app)
 
     return app
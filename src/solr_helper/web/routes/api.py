@@ -1,10 +1,18 @@
 """
 HTMX API routes for SolrHelper web interface.
 """
-from flask import Blueprint, request
+from flask import Blueprint, request, jsonify, render_template
+from markupsafe import escape
 from loguru import logger
 
 from ..utils.auth import require_connection, get_current_client, get_current_schema
+from ..utils.connection_registry import connection_registry
+from ..utils.streaming import cached_fragment, stream_page
+from ...search_profiles import response_stats
+from ...search_cache import search_cache, normalize_query
+from ...document_cache import PREFETCH_DOCUMENTS
+from ...query_planner import QueryPlanner
+from ...typeahead import FieldIndex, SUGGEST_LIMIT, value_suggestions
 
 # Create blueprint
 api_bp = Blueprint('api', __name__, url_prefix='/api')
@@ -18,14 +26,14 @@ def api_search():
     schema = get_current_schema()
     
     if not client or not schema:
-        return '<div class="alert alert-warning">Keine Verbindung aktiv. <a href="/connections" class="link">Verbindung auswählen</a></div>'
+        return render_template('_search_preview.html', message='Keine Verbindung aktiv.', level='warning')
         
     search_type = request.form.get('search_type', 'id')
     search_query = request.form.get('search_query', '').strip()
     search_field = request.form.get('search_field', '').strip()
     
     if not search_query:
-        return '<div class="alert alert-info">Bitte gib einen Suchbegriff ein.</div>'
+        return render_template('_search_preview.html', message='Bitte gib einen Suchbegriff ein.', connected=True)
     
     unique_key_field = schema.get('unique_key', 'id')
     
@@ -33,82 +41,81 @@ def api_search():
         # ID-Suche: Direkt zum Dokument
         try:
             doc = client.get_document_by_id(unique_key_field, search_query)
-            if doc:
-                return f'''
-                <div class="alert alert-success">
-                    <span>Dokument gefunden!</span>
-                    <a href="/record/{search_query}" class="btn btn-sm btn-primary ml-2">Dokument öffnen</a>
-                </div>
-                '''
-            else:
-                return f'<div class="alert alert-warning">Kein Dokument mit {unique_key_field} "{search_query}" gefunden.</div>'
         except Exception as e:
-            return f'<div class="alert alert-error">Fehler bei der Suche: {str(e)}</div>'
-    else:
-        # Textsuche: Kompakte Ergebnisliste anzeigen (mit Substring-Matching)
-        if not search_field or not search_field.strip():
-            return '<div class="alert alert-warning">Für Textsuche muss ein Feld ausgewählt werden.</div>'
-            
-        try:
-            results = client.search_documents(search_query, field=search_field, rows=5, start=0)
-            
-            if results['numFound'] == 0:
-                field_info = f' in Feld "{search_field}"' if search_field else ''
-                return f'<div class="alert alert-info">Keine Ergebnisse für "{search_query}"{field_info} gefunden.</div>'
-            
-            # Generiere kompakte HTML für Suchergebnisse
-            html = f'''
-            <div class="card bg-base-100 shadow-xl">
-                <div class="card-body">
-                    <h3 class="card-title">Suchergebnisse</h3>
-                    <div class="alert alert-info mb-4">
-                        <span><strong>{results["numFound"]}</strong> Ergebnisse für "{search_query}"{f' in Feld "{search_field}"' if search_field else ''}</span>
-                    </div>
-                    <div class="space-y-2">
-            '''
-            
-            highlighting = results.get('highlighting', {})
-            
-            for doc in results['docs'][:5]:  # Nur erste 5 anzeigen
-                doc_id = doc.get(unique_key_field, 'N/A')
-                
-                # Highlighting-Snippets für dieses Dokument
-                doc_highlights = highlighting.get(doc_id, {})
-                highlight_snippets = []
-                
-                for field_name, snippets in doc_highlights.items():
-                    if snippets:  # Nur wenn Snippets vorhanden
-                        for snippet in snippets[:2]:  # Max 2 Snippets pro Feld
-                            highlight_snippets.append(f'<span class="badge badge-outline badge-xs mr-1">{field_name}</span>{snippet}')
-                
-                html += f'''
-                <div class="p-3 bg-base-200 rounded">
-                    <div class="flex justify-between items-start">
-                        <div class="flex-1">
-                            <div class="font-mono text-sm font-semibold mb-2">{doc_id}</div>
-                            {'<div class="text-sm space-y-1">' + '<br>'.join(highlight_snippets) + '</div>' if highlight_snippets else '<div class="text-xs text-gray-500">Keine Textvorschau verfügbar</div>'}
-                        </div>
-                        <a href="/record/{doc_id}" class="btn btn-primary btn-sm ml-3">Bearbeiten</a>
-                    </div>
-                </div>
-                '''
-            
-            html += '</div>'
-            
-            if results['numFound'] > 5:
-                html += f'''
-                <div class="card-actions justify-center mt-4">
-                    <a href="/search-results?query={search_query}{'&field=' + search_field if search_field else ''}" 
-                       class="btn btn-outline">Alle {results["numFound"]} Ergebnisse anzeigen</a>
-                </div>
-                '''
-            
-            html += '''
-                </div>
-            </div>
-            '''
-            
-            return html
-            
-        except Exception as e:
-            return f'<div class="alert alert-error">Fehler bei der Textsuche: {str(e)}</div>'
+            return render_template('_search_preview.html', message=f'Fehler bei der Suche: {e}', level='error')
+        if doc:
+            return render_template('_search_preview.html', found_id=search_query)
+        return render_template('_search_preview.html', level='warning', connected=True,
+                               message=f'Kein Dokument mit {unique_key_field} "{search_query}" gefunden.')
+
+    # Textsuche: Kompakte Ergebnisliste anzeigen (mit Substring-Matching)
+    if not search_field:
+        return render_template('_search_preview.html', level='warning', connected=True,
+                               message='Für Textsuche muss ein Feld ausgewählt werden.')
+
+    # Das fertige Fragment wird wie Suchergebnisse gecacht (verworfen bei Schreibzugriffen auf den Core)
+    cache_key = (client.core_url, 'fragment', 'preview', normalize_query(search_query), search_field)
+    cached = cached_fragment(cache_key)
+    if cached is not None:
+        return cached
+    generation = search_cache.generation(client.core_url)
+    try:
+        results = client.search_documents(search_query, field=search_field, rows=5, start=0,
+                                          unique_key_field=unique_key_field, schema=schema,
+                                          profile='preview')
+    except Exception as e:
+        return render_template('_search_preview.html', message=f'Fehler bei der Textsuche: {e}', level='error')
+
+    if results['numFound'] == 0:
+        return render_template('_search_preview.html', connected=True,
+                               message=f'Keine Ergebnisse für "{search_query}" in Feld "{search_field}" gefunden.')
+    # "Bearbeiten" in der Vorschau soll nicht kalt laden; ein neuer Tastendruck ersetzt den wartenden Auftrag
+    client.prefetch_documents(unique_key_field,
+                              [doc.get(unique_key_field) for doc in results['docs'][:PREFETCH_DOCUMENTS]],
+                              replaces=(client.core_url, 'preview'))
+    return stream_page('_search_preview.html', cache_key=cache_key, generation=generation, results=results,
+                       query=search_query, field=search_field, unique_key_field=unique_key_field)
+
+
+@api_bp.route('/fields/suggest')
+@require_connection
+def api_fields_suggest():
+    """Feldnamen-Vorschläge (JSON) aus dem Präfix-Index des aktuellen Schemas."""
+    schema = get_current_schema()
+    index = FieldIndex.for_schema(schema)
+    limit = min(max(request.args.get('limit', SUGGEST_LIMIT, type=int), 1), 200)
+    return jsonify({'fields': index.suggest(request.args.get('q', ''), limit), 'total': len(index.fields)})
+
+
+@api_bp.route('/values/suggest')
+@require_connection
+def api_values_suggest():
+    """
+    Wertvorschläge für das gewählte Suchfeld als <option>-Liste (für eine <datalist>).
+
+    Die Vorschläge kommen aus value_suggestions; Solr wird nur bei einem Cache-Fehlschlag gefragt.
+    """
+    field = request.args.get('search_field', '').strip()
+    prefix = request.args.get('search_query', '')
+    if request.args.get('search_type', 'text') != 'text' or not field or not prefix.strip() or '*' in prefix:
+        return ''
+    client = get_current_client()
+    schema = get_current_schema()
+    prefix = QueryPlanner.for_schema(schema).normalize(prefix.lstrip(), field)
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    try:
+        values = value_suggestions.get(client, field, prefix, limit)
+    except Exception as e:
+        # Vorschläge sind optional; ein Fehler darf die Eingabe nicht stören
+        logger.warning(f"Wertvorschläge für '{field}' fehlgeschlagen: {e}")
+        return ''
+    return ''.join(f'<option value="{escape(value)}">{count}</option>' for value, count in values)
+
+
+@api_bp.route('/stats')
+def api_stats():
+    """Laufzeit-Statistiken als JSON (Bytes je Antwortprofil, Trefferquoten der Caches)."""
+    client = get_current_client()
+    return jsonify({'response_profiles': response_stats.snapshot(), 'search_cache': search_cache.stats(),
+                    'value_suggestions': value_suggestions.stats(), 'connections': connection_registry.stats(),
+                    'document_cache': client.document_cache.stats() if client else None})
@@ -0,0 +1,122 @@
+"""
+Bulk update routes for SolrHelper web interface.
+
+Jobs run in a thread of the worker that started them. Status and cancel requests may land
+on any worker (gunicorn), so they go through the job's status and cancel files instead of
+this process's `_jobs`.
+"""
+import threading
+
+from flask import Blueprint, render_template, request
+from loguru import logger
+
+from ..utils.auth import require_connection, get_current_client, get_current_schema, get_current_connection
+from ...bulk_update import BulkUpdateJob, BULK_OPERATIONS, list_job_status, load_job_status, request_cancel
+
+# Create blueprint
+bulk_bp = Blueprint('bulk', __name__)
+
+# Laufende und abgeschlossene Jobs dieses Prozesses (job_id -> BulkUpdateJob)
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _find_job(job_id):
+    """The job from this process, else its published status from whichever worker runs it."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    return job if job is not None else load_job_status(job_id)
+
+
+def _parse_value(operation, raw_value):
+    """Wandelt die Formulareingabe in den Wert für die Operation um (eine Zeile pro Wert)."""
+    values = [v.strip() for v in raw_value.splitlines() if v.strip()]
+    if operation == 'inc':
+        if len(values) != 1:
+            raise ValueError("'inc' erwartet genau einen numerischen Wert.")
+        return float(values[0]) if '.' in values[0] else int(values[0])
+    if not values:
+        return None
+    return values if len(values) > 1 else values[0]
+
+
+@bulk_bp.route('/bulk')
+@require_connection
+def bulk_form():
+    """Zeigt das Formular für Massenänderungen."""
+    schema = get_current_schema()
+    client = get_current_client()
+    jobs = list_job_status(client.core_url) if client else []
+    return render_template('bulk_update.html',
+                           operations=BULK_OPERATIONS,
+                           indexed_fields=client.get_indexed_fields(schema) if client else [],
+                           jobs=jobs,
+                           current_connection=get_current_connection())
+
+
+@bulk_bp.route('/bulk/preview', methods=['POST'])
+@require_connection
+def bulk_preview():
+    """Zählt die Treffer der Query, bevor ein Job gestartet wird."""
+    client = get_current_client()
+    query = request.form.get('query', '').strip() or '*:*'
+    try:
+        count = client.count_documents(query)
+        return f'<span class="badge badge-info">{count} Treffer</span>'
+    except Exception as e:
+        logger.error(f"Fehler bei der Trefferzählung für '{query}': {e}")
+        return '<span class="badge badge-error">Ungültige Query</span>', 400
+
+
+@bulk_bp.route('/bulk', methods=['POST'])
+@require_connection
+def bulk_start():
+    """Startet einen Bulk-Job im Hintergrund und gibt das Fortschritts-Fragment zurück."""
+    client = get_current_client()
+    schema = get_current_schema()
+    operation = request.form.get('operation', 'set')
+    field_name = request.form.get('field_name', '').strip()
+    if not field_name:
+        return render_template('_bulk_progress.html', job=None, error="Bitte ein Feld angeben."), 400
+    try:
+        value = _parse_value(operation, request.form.get('value', ''))
+        job = BulkUpdateJob(client, schema, request.form.get('query', '').strip(), field_name, operation, value,
+                            batch_size=int(request.form.get('batch_size') or 500))
+    except ValueError as e:
+        return render_template('_bulk_progress.html', job=None, error=str(e)), 400
+
+    with _jobs_lock:
+        running = _jobs.get(job.job_id) or load_job_status(job.job_id)
+        if running and running.status == 'läuft':
+            # Läuft bereits (evtl. in einem anderen Worker): nur den Fortschritt anzeigen
+            return render_template('_bulk_progress.html', job=running)
+        _jobs[job.job_id] = job
+    job.publish()  # Sofort für alle Worker sichtbar, nicht erst nach der Trefferzählung
+    threading.Thread(target=job.run, kwargs={'restart': bool(request.form.get('restart'))},
+                     name=f"bulk-{job.job_id}", daemon=True).start()
+    logger.info(f"Bulk-Job {job.job_id} über die Web-UI gestartet")
+    return render_template('_bulk_progress.html', job=job)
+
+
+@bulk_bp.route('/bulk/<job_id>')
+@require_connection
+def bulk_status(job_id):
+    """Fortschritts-Fragment eines Jobs (wird per HTMX gepollt)."""
+    job = _find_job(job_id)
+    if not job:
+        return render_template('_bulk_progress.html', job=None, error="Unbekannter Job."), 404
+    return render_template('_bulk_progress.html', job=job)
+
+
+@bulk_bp.route('/bulk/<job_id>/cancel', methods=['POST'])
+@require_connection
+def bulk_cancel(job_id):
+    """Bricht einen laufenden Job ab; er kann später fortgesetzt werden."""
+    job = _find_job(job_id)
+    if not job:
+        return render_template('_bulk_progress.html', job=None, error="Unbekannter Job."), 404
+    if isinstance(job, BulkUpdateJob):
+        job.cancel()
+    else:
+        request_cancel(job_id)  # Der ausführende Worker prüft die Abbruchdatei vor jeder Seite
+    return render_template('_bulk_progress.html', job=job)
@@ -1,10 +1,11 @@
 """
 Connection management routes for SolrHelper web interface.
 """
-from flask import Blueprint, render_template, request, redirect, url_for, jsonify, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, jsonify
 from loguru import logger
 
-from ...solr_client import SolrClient
+from ...solr_client import get_client
+from ..utils.auth import switch_connection
 
 # Create blueprint
 connection_bp = Blueprint('connection', __name__)
@@ -34,7 +35,7 @@ def test_connection():
             return jsonify({'success': False, 'error': 'URL und Core sind erforderlich'})
         
         # Teste die Verbindung
-        client = SolrClient(url, core)
+        client = get_client(url, core)
         client.check_connection()
         
         logger.info(f"Verbindungstest erfolgreich: {url}/solr/{core}")
@@ -53,27 +54,13 @@ def switch_connection_api():
         url = data.get('url')
         core = data.get('core')
         name = data.get('name', f"{core} @ {url}")
+        commit_policy = data.get('commit_policy')
         
         if not url or not core:
             return jsonify({'success': False, 'error': 'URL und Core sind erforderlich'})
         
-        # Erstelle neuen Client und teste Verbindung
-        client = SolrClient(url, core)
-        client.check_connection()
-        
-        # Lade Schema
-        schema = client.get_schema()
-        indexed_fields = client.get_indexed_fields(schema)
-        
-        # Aktualisiere App-Konfiguration
-        current_app.config['CURRENT_CONNECTION'] = {
-            'url': url,
-            'core': core,
-            'name': name
-        }
-        current_app.config['CURRENT_CLIENT'] = client
-        current_app.config['CURRENT_SCHEMA'] = schema
-        current_app.config['INDEXED_FIELDS'] = indexed_fields
+        # Nur die Session dieses Nutzers wechselt; Client und Schema kommen aus dem gemeinsamen Register
+        switch_connection(url, core, name, commit_policy)
         
         logger.success(f"Erfolgreich zu Verbindung '{name}' gewechselt")
         return jsonify({
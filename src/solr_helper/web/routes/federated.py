@@ -0,0 +1,67 @@
+"""
+Federated search routes: one field search across several saved connections.
+"""
+import json
+
+from flask import Blueprint, Response, request, stream_template
+from loguru import logger
+
+from ..utils.auth import get_current_client, get_current_schema, get_current_connection
+from ...federated import DEFAULT_TIMEOUT, FederatedTarget, federated_search
+
+# Create blueprint
+federated_bp = Blueprint('federated', __name__)
+
+MIN_TIMEOUT = 0.5
+MAX_TIMEOUT = 60.0
+
+
+def _parse_targets(raw):
+    """Liest die ausgewählten Verbindungen (JSON-Liste aus dem Formular)."""
+    data = json.loads(raw)
+    if not isinstance(data, list):
+        raise ValueError("Ungültige Zielliste")
+    return [FederatedTarget.from_dict(item) for item in data]
+
+
+@federated_bp.route('/federated')
+def federated():
+    """
+    Formular und - bei gesetzten Parametern - gestreamte Ergebnisse der föderierten Suche.
+
+    Die Seite wird per Template-Streaming ausgeliefert: jeder Core erscheint, sobald er
+    geantwortet hat, ohne auf die langsamsten zu warten.
+    """
+    query = request.args.get('query', '').strip()
+    field = request.args.get('field', '').strip()
+    timeout = min(max(request.args.get('timeout', DEFAULT_TIMEOUT, type=float), MIN_TIMEOUT), MAX_TIMEOUT)
+    targets, error = [], None
+    if request.args.get('targets'):
+        try:
+            targets = _parse_targets(request.args['targets'])
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ungültige Ziele für die föderierte Suche: {e}")
+            error = f"Ungültige Auswahl der Verbindungen: {e}"
+
+    results = None
+    if query and field and targets:
+        results = federated_search(targets, query, field, timeout=timeout)
+    elif request.args.get('targets') is not None and not error:
+        error = "Bitte Suchbegriff, Feld und mindestens eine Verbindung angeben."
+
+    client = get_current_client()
+    schema = get_current_schema()
+    response = Response(stream_template('federated_search.html',
+                                        query=query,
+                                        field=field,
+                                        timeout=timeout,
+                                        results=results,
+                                        target_count=len(targets),
+                                        selected_ids=[t.connection_id for t in targets if t.connection_id],
+                                        indexed_fields=client.get_indexed_fields(schema) if client and schema else [],
+                                        error=error,
+                                        current_connection=get_current_connection()),
+                        mimetype='text/html')
+    # Reverse-Proxies (nginx) sollen die Teilantworten nicht puffern
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,77 @@
+"""
+Field statistics routes: value distribution, cardinality, missing values and ranges of a field.
+"""
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from flask import Blueprint, render_template, request, redirect, url_for
+from loguru import logger
+
+from ..utils.auth import require_connection, get_current_client, get_current_schema, get_current_connection
+from ...field_stats import field_kind, field_stats_cache, sections_for, SECTIONS
+from ...transport import get_timeout
+
+# Create blueprint
+field_stats_bp = Blueprint('field_stats', __name__)
+
+
+@field_stats_bp.route('/field/stats')
+@require_connection
+def choose_field():
+    """Leitet die Feldauswahl (GET-Formular) auf die Statistikseite des Feldes um."""
+    field_name = request.args.get('field', '').strip()
+    if not field_name:
+        return redirect(url_for('search.index'))
+    return redirect(url_for('field_stats.field_stats', field_name=field_name))
+
+
+@field_stats_bp.route('/field/<field_name>/stats')
+@require_connection
+def field_stats(field_name):
+    """
+    Statistikseite eines Feldes.
+
+    Die Seite selbst enthält nur die Schema-Angaben; alle Abschnitte werden hier parallel
+    angestoßen und per HTMX einzeln nachgeladen, sobald sie fertig sind.
+    """
+    client = get_current_client()
+    schema = get_current_schema()
+    info = field_kind(schema, field_name)
+    error = None
+    sections = ()
+    if info is None:
+        error = f"Feld '{field_name}' ist im Schema nicht bekannt."
+    else:
+        sections = sections_for(info)
+        if not sections:
+            error = f"Feld '{field_name}' ist weder indiziert noch hat es DocValues; Solr kann es nicht auswerten."
+        if request.args.get('refresh'):
+            field_stats_cache.invalidate(client, field_name)
+        for section in sections:
+            field_stats_cache.get(client, info, section)
+    return render_template('field_stats.html',
+                           field_name=field_name,
+                           info=info,
+                           sections=sections,
+                           error=error,
+                           indexed_fields=client.get_indexed_fields(schema),
+                           current_connection=get_current_connection())
+
+
+@field_stats_bp.route('/field/<field_name>/stats/<section>')
+@require_connection
+def field_stats_section(field_name, section):
+    """HTML-Fragment eines Abschnitts (`values`, `stats`, `ranges`)."""
+    client = get_current_client()
+    info = field_kind(get_current_schema(), field_name)
+    if info is None or section not in SECTIONS:
+        return '<div class="alert alert-error">Unbekanntes Feld oder unbekannter Abschnitt.</div>', 404
+    try:
+        # Abschnitte hängen ggf. voneinander ab (ranges nach stats): zwei Lese-Timeouts
+        result = field_stats_cache.get(client, info, section).result(timeout=2 * get_timeout()[1])
+    except FutureTimeoutError:
+        return render_template('_field_stats_section.html', section=section, info=info,
+                               error="Solr hat nicht rechtzeitig geantwortet.")
+    except Exception as e:
+        logger.error(f"Fehler bei der Feldstatistik '{section}' für '{field_name}': {e}")
+        return render_template('_field_stats_section.html', section=section, info=info, error=str(e))
+    return render_template('_field_stats_section.html', section=section, info=info, result=result)
@@ -0,0 +1,17 @@
+"""
+Prometheus-style metrics endpoint for SolrHelper.
+"""
+from flask import Blueprint, Response, abort
+
+from ... import metrics
+
+# Create blueprint
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics')
+def prometheus_metrics():
+    """Histogramme der Solr-Aufrufe und Web-Anfragen im Prometheus-Textformat."""
+    if not metrics.enabled:
+        abort(404)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -5,16 +5,31 @@ from flask import Blueprint, render_template, request, redirect, url_for
 from loguru import logger
 
 from ..utils.auth import require_connection, get_current_client, get_current_schema, get_current_connection
-from ..utils.helpers import get_field_definition, create_display_fields, process_field_value
+from ..utils.helpers import (get_field_resolver, create_display_fields, process_field_value, record_field_names,
+                             FIELD_GROUP_SIZE, VALUE_PAGE_SIZE, VALUE_TRUNCATE_CHARS)
+from ...solr_updates import VersionConflictError
 
 # Create blueprint
 record_bp = Blueprint('record', __name__)
 
 
+@record_bp.context_processor
+def record_limits():
+    """Grenzen für Feldgruppen und Werte, auch für die per HTMX nachgeladenen Zeilen."""
+    return {'field_group_size': FIELD_GROUP_SIZE, 'value_page_size': VALUE_PAGE_SIZE,
+            'value_truncate_chars': VALUE_TRUNCATE_CHARS}
+
+
 @record_bp.route('/record/<path:doc_id>')
 @require_connection
 def show_record(doc_id):
-    """Zeigt die Details eines Solr-Dokuments an."""
+    """
+    Zeigt die Details eines Solr-Dokuments an.
+
+    Gerendert wird nur ein Gerüst mit der ersten Feldgruppe; weitere Gruppen, lange
+    Wertelisten und das rohe JSON lädt die Seite per HTMX nach. Schemafelder ohne Wert
+    erscheinen nur mit `?empty=1`.
+    """
     schema = get_current_schema()
     client = get_current_client()
     connection = get_current_connection()
@@ -23,47 +38,138 @@ def show_record(doc_id):
         return redirect(url_for('connection.connections'))
 
     unique_key_field = schema.get('unique_key', 'id')
+    # Einmal pro Schema gebauter Feld-Index (statische + dynamische Felder)
+    resolver = get_field_resolver(schema)
+    include_empty = request.args.get('empty', type=int) == 1
 
     try:
         doc = client.get_document_by_id(unique_key_field, doc_id)
         
-        # Erstelle eine Map von Feldnamen zu Felddefinitionen aus dem Schema
-        schema_fields_map = {f['name']: f for f in schema.get('fields', [])}
-        
         if not doc:
-            sorted_schema_fields = sorted(schema_fields_map.values(), key=lambda x: x['name'])
             return render_template('record.html', 
                                  error=f"Kein Dokument mit {unique_key_field} '{doc_id}' gefunden.", 
                                  unique_key_field=unique_key_field, 
                                  doc={unique_key_field: doc_id}, 
                                  schema=schema, 
-                                 schema_fields=sorted_schema_fields,
                                  current_connection=connection)
 
-        # Erstelle Display-Felder (kombiniert Dokument- und Schema-Felder)
-        display_fields = create_display_fields(doc, schema)
-        sorted_schema_fields = sorted(schema_fields_map.values(), key=lambda x: x['name'])
+        field_count = len(record_field_names(doc, resolver, include_empty))
+        empty_count = sum(1 for name in resolver.static_names if name not in doc)
+        # Erste Feldgruppe direkt, der Rest folgt beim Scrollen
+        display_fields = create_display_fields(doc, schema, resolver, include_empty, 0, FIELD_GROUP_SIZE)
         
         return render_template('record.html', 
                              doc=doc, 
+                             doc_id=doc_id,
+                             doc_version=doc.get('_version_'),
                              unique_key_field=unique_key_field, 
                              schema=schema, 
                              display_fields=display_fields, 
-                             schema_fields=sorted_schema_fields,
+                             offset=0,
+                             field_count=field_count,
+                             empty_count=empty_count,
+                             include_empty=include_empty,
                              current_connection=connection)
     except Exception as e:
         logger.error(f"Fehler beim Abrufen des Dokuments {doc_id}: {e}")
-        schema_fields_map = {f['name']: f for f in schema.get('fields', [])}
-        sorted_schema_fields = sorted(schema_fields_map.values(), key=lambda x: x['name'])
         return render_template('record.html', 
                              error=str(e), 
                              unique_key_field=unique_key_field, 
                              doc={unique_key_field: doc_id}, 
                              schema=schema, 
-                             schema_fields=sorted_schema_fields,
                              current_connection=connection)
 
 
+# Die nachgeladenen Teile haben eigene Pfade mit der ID als Query-Parameter: unter
+# /record/<path:doc_id>/... wäre eine ID wie "a/json" nicht von diesen Routen zu unterscheiden.
+
+@record_bp.route('/record-part/fields')
+@require_connection
+def field_group():
+    """
+    Liefert die Tabellenzeilen einer Feldgruppe ab `offset` (HTMX, beim Scrollen).
+
+    Gelesen werden nur die Felder dieser Gruppe; die Feldnamen des Dokuments (Stand `v`)
+    kennt der Dokument-Cache auch dann, wenn das Dokument selbst zu groß für ihn ist.
+    """
+    schema = get_current_schema()
+    client = get_current_client()
+    unique_key_field = schema.get('unique_key', 'id')
+    resolver = get_field_resolver(schema)
+    doc_id = request.args.get('id', '')
+    doc_version = request.args.get('v', type=int)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    include_empty = request.args.get('empty', type=int) == 1
+
+    field_names = client.get_field_names(unique_key_field, doc_id, doc_version)
+    doc = None
+    if field_names is not None:
+        names = record_field_names(field_names, resolver, include_empty)
+        doc = client.get_document_fields(unique_key_field, doc_id, names[offset:offset + FIELD_GROUP_SIZE])
+    if not doc:
+        return render_template('_record_fields.html', error=f"Dokument '{doc_id}' nicht mehr vorhanden.")
+
+    display_fields = create_display_fields(doc, schema, resolver, include_empty, offset, FIELD_GROUP_SIZE,
+                                           names=names)
+    return render_template('_record_fields.html',
+                         doc=doc,
+                         doc_id=doc_id,
+                         doc_version=doc_version,
+                         unique_key_field=unique_key_field,
+                         display_fields=display_fields,
+                         offset=offset,
+                         field_count=len(names),
+                         include_empty=include_empty)
+
+
+@record_bp.route('/record-part/values')
+@require_connection
+def field_values():
+    """Liefert die nächste Seite der Werte eines mehrwertigen Feldes ab `offset` (HTMX)."""
+    doc_id = request.args.get('id', '')
+    field_name = request.args.get('field', '')
+    values = _field_value_list(doc_id, field_name)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    return render_template('_record_values.html',
+                         doc_id=doc_id,
+                         field_name=field_name,
+                         values=values[offset:offset + VALUE_PAGE_SIZE],
+                         offset=offset,
+                         remaining=max(len(values) - offset - VALUE_PAGE_SIZE, 0))
+
+
+@record_bp.route('/record-part/value')
+@require_connection
+def field_value():
+    """Liefert einen gekürzt angezeigten Wert vollständig (`index` bei mehrwertigen Feldern)."""
+    values = _field_value_list(request.args.get('id', ''), request.args.get('field', ''))
+    index = request.args.get('index', 0, type=int)
+    if not 0 <= index < len(values):
+        return '', 404
+    return render_template('_record_value.html', full_value=values[index])
+
+
+@record_bp.route('/record-part/json')
+@require_connection
+def record_json():
+    """Rohes JSON des Dokuments, erst auf Anforderung geladen."""
+    schema = get_current_schema()
+    doc = get_current_client().get_document_by_id(schema.get('unique_key', 'id'), request.args.get('id', ''))
+    return render_template('_record_json.html', doc=doc or {})
+
+
+def _field_value_list(doc_id, field_name):
+    """Die Werte eines Feldes als Liste (einwertige Felder als Liste mit einem Eintrag), nur dieses Feld wird gelesen."""
+    if not field_name:
+        return []
+    schema = get_current_schema()
+    doc = get_current_client().get_document_fields(schema.get('unique_key', 'id'), doc_id, [field_name]) or {}
+    value = doc.get(field_name)
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
 @record_bp.route('/record/<doc_id>/edit-form/<field_name>')
 @require_connection
 def edit_form(doc_id, field_name):
@@ -76,7 +182,7 @@ def edit_form(doc_id, field_name):
         
     unique_key_field = schema.get('unique_key', 'id')
     doc = client.get_document_by_id(unique_key_field, doc_id)
-    field_definition = get_field_definition(field_name, schema, doc)
+    field_definition = get_field_resolver(schema).get_field_definition(field_name, doc)
     doc_value = doc.get(field_name)
 
     use_atomic_update = client.check_update_log_status()
@@ -89,7 +195,8 @@ def edit_form(doc_id, field_name):
                          doc_id=doc_id, 
                          field=field_definition, 
                          warning=warning, 
-                         doc_value=doc_value)
+                         doc_value=doc_value,
+                         doc_version=doc.get('_version_'))
 
 
 @record_bp.route('/record/<doc_id>/add-field', methods=['POST'])
@@ -110,13 +217,13 @@ def add_field(doc_id):
         return redirect(url_for('record.show_record', doc_id=doc_id))
 
     try:
-        # Hole das aktuelle Dokument
-        doc = client.get_document_by_id(unique_key_field, doc_id)
+        # Verwende die intelligente update_document_field Methode
+        use_atomic_update = client.check_update_log_status()
+        # Ohne atomare Updates wird das ganze Dokument neu geschrieben: nicht aus dem Cache lesen
+        doc = client.get_document_by_id(unique_key_field, doc_id, use_cache=use_atomic_update)
         if not doc:
             return redirect(url_for('record.show_record', doc_id=doc_id))
 
-        # Verwende die intelligente update_document_field Methode
-        use_atomic_update = client.check_update_log_status()
         copy_fields = schema.get('copy_fields', [])
 
         client.update_document_field(
@@ -125,7 +232,8 @@ def add_field(doc_id):
             doc_id=doc_id,
             field_name=field_name,
             field_value=field_value,
-            copy_fields=copy_fields
+            copy_fields=copy_fields,
+            doc=doc
         )
 
         logger.info(f"Feld '{field_name}' zu Dokument {doc_id} hinzugefügt")
@@ -143,6 +251,8 @@ def update_field(doc_id):
     field_name = request.form.get('field_name')
     field_value = request.form.get('field_value')
     is_multi_valued = request.form.get('is_multi_valued') == 'true'
+    # _version_ beim Öffnen des Formulars, für die optimistische Sperre
+    expected_version = request.form.get('expected_version', type=int)
 
     client = get_current_client()
     schema = get_current_schema()
@@ -152,35 +262,46 @@ def update_field(doc_id):
 
     unique_key_field = schema.get('unique_key', 'id')
 
-    # Hole das Originaldokument für Fallback
-    original_doc = client.get_document_by_id(unique_key_field, doc_id)
-    field_definition = get_field_definition(field_name, schema, original_doc)
+    # Dokument genau einmal lesen: für Felddefinition, Merge und Fallback. Atomare Updates
+    # prüft Solr per _version_, daher reicht dort der gecachte Stand; Full-Document-Updates
+    # schreiben das gelesene Dokument zurück und brauchen den aktuellen.
+    use_atomic_update = client.check_update_log_status()
+    original_doc = client.get_document_by_id(unique_key_field, doc_id, use_cache=use_atomic_update)
+    field_definition = get_field_resolver(schema).get_field_definition(field_name, original_doc)
 
     try:
         final_value = process_field_value(field_value, is_multi_valued)
 
-        use_atomic_update = client.check_update_log_status()
         copy_fields = schema.get('copy_fields', [])
 
-        client.update_document_field(
+        updated_doc = client.update_document_field(
             use_atomic_update=use_atomic_update,
             unique_key_field=unique_key_field,
             doc_id=doc_id,
             field_name=field_name,
             field_value=final_value,
-            copy_fields=copy_fields
+            copy_fields=copy_fields,
+            doc=original_doc,
+            expected_version=expected_version or (original_doc or {}).get('_version_')
         )
 
-        # Bei Erfolg: Dokument neu laden und die aktualisierte Zeile rendern
-        updated_doc = client.get_document_by_id(unique_key_field, doc_id)
+        # Bei Erfolg: lokal zusammengeführtes Dokument rendern (kein weiterer Abruf)
         return render_template('_record_row.html',
                              doc=updated_doc,
                              field=field_definition,
                              unique_key_field=unique_key_field)
 
+    except VersionConflictError as e:
+        # Jemand anderes hat das Dokument geändert: aktuellen Stand mit Hinweis zeigen
+        original_doc = client.get_document_by_id(unique_key_field, doc_id, use_cache=False) or original_doc
+        return render_template('_record_row.html',
+                             doc=original_doc,
+                             field=field_definition,
+                             unique_key_field=unique_key_field,
+                             error=str(e)), 409
     except Exception as e:
         logger.error(f"Fehler beim Aktualisieren des Feldes: {e}")
-        # Bei Fehler: Original-Dokument laden und Zeile mit Fehlermeldung rendern
+        # Bei Fehler: Original-Dokument und Zeile mit Fehlermeldung rendern
         return render_template('_record_row.html',
                              doc=original_doc,
                              field=field_definition,
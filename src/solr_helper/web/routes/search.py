@@ -1,14 +1,79 @@
 """
 Search routes for SolrHelper web interface.
 """
+import math
+
 from flask import Blueprint, render_template, request, redirect, url_for
 from loguru import logger
 
 from ..utils.auth import require_connection, get_current_client, get_current_schema, get_current_connection
+from ..utils.cursor_cache import search_cursors
+from ..utils.streaming import stream_page
+from ...document_cache import PREFETCH_DOCUMENTS
+from ...search_cache import search_cache
 
 # Create blueprint
 search_bp = Blueprint('search', __name__)
 
+RESULTS_PER_PAGE = 20
+SHALLOW_OFFSET = 1000  # Bis zu diesem Offset darf ohne bekannten Cursor per start gesprungen werden
+MAX_CURSOR_SKIP = 10000  # Max. übersprungene Treffer pro Cursor-Sprung
+MAX_CURSOR_HOPS = 20  # Max. Cursor-Sprünge pro Anfrage (200.000 Treffer bei 20 pro Seite)
+
+
+def fetch_results_page(client, query, field, page, rows, unique_key_field, schema=None):
+    """
+    Lädt eine Ergebnisseite, bevorzugt per gespeichertem cursorMark.
+
+    Ohne bekannten Cursor wird bei flachen Offsets `start` verwendet. Bei tiefen Offsets wird
+    `page` zuerst auf die letzte Seite begrenzt und dann vom nächsten bekannten Cursor aus in
+    Sprüngen (nur Unique Key) weitergeblättert, höchstens `MAX_CURSOR_HOPS` pro Anfrage. Reicht
+    das nicht, wird die erreichte Seite geliefert. `results['page']` ist die tatsächliche Seite.
+
+    Die Cursor gelten nur bis zum nächsten Schreibzugriff auf den Core: Der Schlüssel enthält
+    die Generation des Such-Caches, und solange ein Update auf seinen Commit wartet, werden
+    keine neuen gespeichert.
+    """
+    generation = search_cache.generation(client.core_url)
+    key = (client.core_url, generation, query, field, rows)
+
+    def remember(page_number, cursor_mark):
+        if search_cache.current(client.core_url, generation):
+            search_cursors.put(key, page_number, cursor_mark)
+
+    cursor = search_cursors.get(key, page)
+    if cursor is None and (page - 1) * rows > SHALLOW_OFFSET:
+        num_found = client.count_documents(client.plan_search(query, field, schema).query)
+        last_page = max(1, math.ceil(num_found / rows))
+        page = min(page, last_page)
+        cursor = search_cursors.get(key, page)
+    if cursor is None and (page - 1) * rows > SHALLOW_OFFSET:
+        known_page, cursor = search_cursors.nearest(key, page)
+        for _ in range(MAX_CURSOR_HOPS):
+            if known_page >= page:
+                break
+            step = min(page - known_page, max(1, MAX_CURSOR_SKIP // rows))
+            next_cursor = client.advance_cursor(query, field, cursor, step * rows, unique_key_field, schema)
+            if next_cursor == cursor:
+                # Keine weiteren Treffer (z.B. inzwischen gelöscht)
+                break
+            cursor = next_cursor
+            known_page += step
+            remember(known_page, cursor)
+        if known_page < page:
+            logger.info(f"Seite {page} nicht erreicht, liefere Seite {known_page}")
+            page = known_page
+    offset = (page - 1) * rows
+    if cursor is None:
+        results = client.search_documents(query, field=field, rows=rows, start=offset,
+                                          unique_key_field=unique_key_field, schema=schema, profile='results')
+    else:
+        results = client.search_documents(query, field=field, rows=rows, start=offset, cursor_mark=cursor,
+                                          unique_key_field=unique_key_field, schema=schema, profile='results')
+        remember(page + 1, results['nextCursorMark'])
+    results['page'] = page
+    return results
+
 
 @search_bp.route('/')
 def index():
@@ -21,12 +86,10 @@ def index():
             return "Fehler: Schema nicht geladen.", 500
 
         unique_key_field = schema.get('unique_key', 'id')
-        client = get_current_client()
-        indexed_fields = client.get_indexed_fields(schema) if client else []
 
+        # Die Feldliste lädt die Seite bei Bedarf über /api/fields/suggest nach
         return render_template('index.html',
                              unique_key_field=unique_key_field,
-                             indexed_fields=indexed_fields,
                              current_connection=connection)
 
     # Keine Verbindung -> Connection Management
@@ -61,8 +124,10 @@ def search_results():
     """Zeigt Suchergebnisse für Textsuchen an."""
     query = request.args.get('query', '').strip()
     field = request.args.get('field', '').strip()
-    start = int(request.args.get('start', 0))
-    rows = 20  # Anzahl Ergebnisse pro Seite
+    rows = RESULTS_PER_PAGE
+    # 'start' wird für alte Links weiterhin akzeptiert
+    page = request.args.get('page', type=int) or request.args.get('start', 0, type=int) // rows + 1
+    page = max(page, 1)
     
     if not query:
         return redirect(url_for('search.index'))
@@ -75,24 +140,23 @@ def search_results():
         return redirect(url_for('connection.connections'))
     
     unique_key_field = schema.get('unique_key', 'id')
-    
-    try:
-        results = client.search_documents(query, field=field if field else None, rows=rows, start=start)
-        
-        return render_template('search_results.html',
-                             query=query,
-                             field=field,
-                             results=results,
-                             unique_key_field=unique_key_field,
-                             schema=schema,
-                             current_connection=connection)
-    except Exception as e:
-        logger.error(f"Fehler bei der Suche mit Query '{query}' in Feld '{field}': {e}")
-        return render_template('search_results.html',
-                             query=query,
-                             field=field,
-                             results={'docs': [], 'numFound': 0, 'start': 0, 'rows': rows},
-                             unique_key_field=unique_key_field,
-                             schema=schema,
-                             current_connection=connection,
-                             error=str(e))
+
+    def load_results():
+        """Wird vom Template aufgerufen, nachdem der Seitenkopf bereits gesendet wurde."""
+        try:
+            results = fetch_results_page(client, query, field or None, page, rows, unique_key_field, schema)
+            # Die ersten Treffer werden meist geöffnet: schon jetzt im Hintergrund laden
+            client.prefetch_documents(unique_key_field,
+                                      [doc.get(unique_key_field) for doc in results['docs'][:PREFETCH_DOCUMENTS]])
+            return results, None
+        except Exception as e:
+            logger.error(f"Fehler bei der Suche mit Query '{query}' in Feld '{field}': {e}")
+            return {'docs': [], 'numFound': 0, 'start': 0, 'rows': rows, 'page': 1}, str(e)
+
+    return stream_page('search_results.html',
+                       query=query,
+                       field=field,
+                       load_results=load_results,
+                       unique_key_field=unique_key_field,
+                       schema=schema,
+                       current_connection=connection)
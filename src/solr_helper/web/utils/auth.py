@@ -1,8 +1,19 @@
 """
 Authentication and authorization utilities for SolrHelper web interface.
+
+The active connection belongs to the browser session: the session cookie stores which
+connection was chosen, the shared `connection_registry` holds client and schema.
 """
+import secrets
 from functools import wraps
-from flask import current_app, redirect, url_for
+from typing import Optional
+
+from flask import current_app, g, redirect, session, url_for
+from loguru import logger
+
+from .connection_registry import Connection, connection_key, connection_registry
+
+SESSION_CONNECTION = 'connection'
 
 
 def require_connection(f):
@@ -12,27 +23,91 @@ def require_connection(f):
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_app.config.get('CURRENT_CONNECTION'):
+        if _current() is None:
             return redirect(url_for('connection.connections'))
         return f(*args, **kwargs)
     return decorated_function
 
 
+def session_id() -> str:
+    """Zufällige Kennung der Browser-Session (Halter im Verbindungsregister)."""
+    sid = session.get('sid')
+    if sid is None:
+        sid = session['sid'] = secrets.token_hex(16)
+    return sid
+
+
+def _current() -> Optional[Connection]:
+    """
+    Verbindung dieser Anfrage: die der Session, sonst die feste Verbindung der App.
+
+    Wird beim ersten Zugriff festgehalten, damit eine Anfrage durchgehend Client und Schema
+    derselben Verbindung sieht, auch wenn parallel jemand wechselt.
+    """
+    if 'solr_connection' in g:
+        return g.solr_connection
+    connection = None
+    chosen = session.get(SESSION_CONNECTION)
+    if chosen:
+        key = connection_key(chosen['url'], chosen['core'], chosen.get('commit_policy'))
+        connection = connection_registry.get(session_id(), key)
+        if connection is None:
+            # Anderer Worker-Prozess, Neustart oder abgelaufener Eintrag: aus der Session wiederherstellen
+            try:
+                connection = connection_registry.acquire(session_id(), chosen['url'], chosen['core'],
+                                                         chosen.get('name'), chosen.get('commit_policy'))
+            except Exception as e:
+                logger.warning(f"Verbindung '{chosen.get('name')}' der Session nicht verfügbar: {e}")
+        if connection is not None and chosen.get('name'):
+            # Den Namen vergibt jeder Nutzer selbst
+            connection = connection._replace(info=dict(connection.info, name=chosen['name']))
+    else:
+        default = current_app.config.get('DEFAULT_CONNECTION')
+        if default:
+            connection = connection_registry.get(None, default)
+    g.solr_connection = connection
+    return connection
+
+
+def switch_connection(url: str, core: str, name: Optional[str] = None,
+                      commit_policy: Optional[str] = None) -> Connection:
+    """
+    Setzt die Verbindung der aktuellen Session; die bisherige wird freigegeben.
+
+    Raises:
+        Exception: Wenn die Verbindung nicht hergestellt oder das Schema nicht geladen werden kann.
+    """
+    sid = session_id()
+    connection = connection_registry.acquire(sid, url, core, name, commit_policy)
+    previous = session.get(SESSION_CONNECTION)
+    if previous:
+        previous_key = connection_key(previous['url'], previous['core'], previous.get('commit_policy'))
+        if previous_key != connection_key(url, core, commit_policy):
+            connection_registry.release(sid, previous_key)
+    session[SESSION_CONNECTION] = {'url': url, 'core': core, 'name': name or connection.info['name'],
+                                   'commit_policy': commit_policy}
+    g.pop('solr_connection', None)
+    return connection
+
+
 def get_current_client():
     """Returns the current Solr client or None if not connected."""
-    return current_app.config.get('CURRENT_CLIENT')
+    connection = _current()
+    return connection.client if connection else None
 
 
 def get_current_schema():
     """Returns the current Solr schema or None if not connected."""
-    return current_app.config.get('CURRENT_SCHEMA')
+    connection = _current()
+    return connection.schema if connection else None
 
 
 def get_current_connection():
     """Returns the current connection info or None if not connected."""
-    return current_app.config.get('CURRENT_CONNECTION')
+    connection = _current()
+    return connection.info if connection else None
 
 
 def is_connected():
     """Returns True if a Solr connection is active."""
-    return bool(current_app.config.get('CURRENT_CONNECTION'))
+    return _current() is not None
@@ -0,0 +1,162 @@
+"""
+Thread-safe registry of active Solr connections, shared between browser sessions.
+"""
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from loguru import logger
+
+from ...commit_policy import CommitPolicy
+from ...schema_cache import REVALIDATE_AFTER
+from ...solr_client import SolrClient, get_client
+
+HOLDER_IDLE_TIMEOUT = 12 * 3600  # Sessions unused for this long no longer count as holders
+
+
+class Connection(NamedTuple):
+    """Snapshot of a connection: what a request works with from start to finish."""
+    info: Dict[str, Any]
+    client: SolrClient
+    schema: Dict[str, Any]
+
+
+def connection_key(url: str, core: str, commit_policy: Optional[str] = None) -> str:
+    """Registry key; sessions with different commit policies get separate entries and clients."""
+    return f"{url.rstrip('/')}|{core}|{CommitPolicy.parse(commit_policy)}"
+
+
+class _Entry:
+    def __init__(self, key: str):
+        self.key = key
+        self.connection: Optional[Connection] = None
+        self.loaded_at = 0.0
+        self.holders: Dict[str, float] = {}  # session id -> last use
+        self.pinned = False
+        self.ready = threading.Event()  # set once the first load finished (successfully or not)
+
+
+class ConnectionRegistry:
+    """
+    Hands out pooled clients and schemas per connection (server URL + core + commit policy).
+
+    Sessions hold an entry by reference: the first session to use a connection loads its
+    schema, later sessions share client and schema. A switch to an entry older than the
+    schema cache's revalidation interval reloads it for all holders. The commit policy is
+    part of the key, so one session's choice never changes the policy of another. When the
+    last holder switches away, the entry is dropped (the client itself stays in the
+    `get_client()` pool).
+    Each `Connection` is immutable; a reload replaces it as a whole, so a request never
+    sees a client from one connection together with the schema of another.
+    """
+
+    def __init__(self, idle_timeout: float = HOLDER_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, holder: str, url: str, core: str, name: Optional[str] = None,
+                commit_policy: Optional[str] = None, reload: bool = False) -> Connection:
+        """
+        Registers `holder` (a session id) for the connection and returns it.
+
+        The schema is loaded outside the lock; concurrent sessions asking for the same new
+        connection wait for that single load instead of starting their own.
+
+        Raises:
+            Exception: Whatever `check_connection()`/`get_schema()` raise; the holder is not registered then.
+        """
+        key = connection_key(url, core, commit_policy)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.connection is not None:
+                reload = reload or time.monotonic() - entry.loaded_at > REVALIDATE_AFTER
+            loader = entry is None or (reload and entry.ready.is_set())
+            if entry is None:
+                entry = self._entries[key] = _Entry(key)
+            elif loader:
+                entry.ready = threading.Event()
+            ready = entry.ready
+
+        if loader:
+            try:
+                entry.connection = self._load(url, core, name, commit_policy)
+                entry.loaded_at = time.monotonic()
+            except Exception:
+                with self._lock:
+                    if not entry.holders and not entry.pinned and self._entries.get(key) is entry:
+                        del self._entries[key]
+                raise
+            finally:
+                ready.set()
+        else:
+            ready.wait()
+            if entry.connection is None:
+                # Loading by another session failed: try it ourselves
+                return self.acquire(holder, url, core, name, commit_policy, reload=True)
+
+        with self._lock:
+            entry.holders[holder] = time.monotonic()
+            self._entries.setdefault(key, entry)
+            self._expire_holders()
+        return entry.connection
+
+    def _load(self, url: str, core: str, name: Optional[str], commit_policy: Optional[str]) -> Connection:
+        client = get_client(url, core, CommitPolicy.parse(commit_policy) if commit_policy else None)
+        client.check_connection()
+        schema = client.get_schema()
+        info = {'url': url, 'core': core, 'name': name or f"{core} @ {url}",
+                'commit_policy': str(client.commit_policy)}
+        logger.info(f"Verbindung '{info['name']}' im Register angelegt")
+        return Connection(info, client, schema)
+
+    def pin(self, url: str, core: str, name: Optional[str] = None, commit_policy: Optional[str] = None) -> Connection:
+        """Registers a connection that is never released (the fixed connection of `create_app`)."""
+        connection = self.acquire('__app__', url, core, name, commit_policy)
+        with self._lock:
+            entry = self._entries[connection_key(url, core, commit_policy)]
+            entry.pinned = True
+            entry.holders.pop('__app__', None)
+        return connection
+
+    def get(self, holder: Optional[str], key: str) -> Optional[Connection]:
+        """The connection `key` if it is loaded; marks `holder` (if given) as using it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.connection is None:
+                return None
+            if holder is not None:
+                entry.holders[holder] = time.monotonic()
+            return entry.connection
+
+    def release(self, holder: str, key: str):
+        """`holder` no longer uses `key`; the entry is dropped with its last holder."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.holders.pop(holder, None)
+            if not entry.holders and not entry.pinned and entry.ready.is_set():
+                del self._entries[key]
+                logger.debug(f"Verbindung '{key}' aus dem Register entfernt")
+
+    def _expire_holders(self):
+        """Forgets sessions that were not used for `idle_timeout` (closed browsers never release)."""
+        limit = time.monotonic() - self.idle_timeout
+        for key, entry in list(self._entries.items()):
+            for holder in [h for h, last_used in entry.holders.items() if last_used < limit]:
+                del entry.holders[holder]
+            if not entry.holders and not entry.pinned and entry.ready.is_set():
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'connections': len(self._entries),
+                    'holders': {key: len(entry.holders) for key, entry in self._entries.items()}}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+connection_registry = ConnectionRegistry()
@@ -0,0 +1,62 @@
+"""
+Server-side cache of cursorMarks for paged search results.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+MAX_SEARCHES = 500  # Remembered searches (connection, search cache generation, query, field, page size)
+MAX_PAGES_PER_SEARCH = 1000
+
+
+class CursorCache:
+    """
+    Remembers the cursorMark at which each result page starts, per search.
+
+    Page 1 always starts at '*'. Every page fetched with a cursor stores the cursor of the
+    following page, so "next", "previous" and revisits jump straight to the right place.
+    """
+
+    def __init__(self, max_searches: int = MAX_SEARCHES):
+        self.max_searches = max_searches
+        self._searches: "OrderedDict[Tuple, Dict[int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pages(self, key: Tuple) -> Dict[int, str]:
+        pages = self._searches.get(key)
+        if pages is None:
+            pages = self._searches[key] = {1: '*'}
+            if len(self._searches) > self.max_searches:
+                self._searches.popitem(last=False)
+        else:
+            self._searches.move_to_end(key)
+        return pages
+
+    def get(self, key: Tuple, page: int) -> Optional[str]:
+        """Returns the cursorMark for `page`, or None if unknown."""
+        with self._lock:
+            return self._pages(key).get(page)
+
+    def nearest(self, key: Tuple, page: int) -> Tuple[int, str]:
+        """Returns the closest known (page, cursorMark) at or before `page`."""
+        with self._lock:
+            pages = self._pages(key)
+            known = max(p for p in pages if p <= page)
+            return known, pages[known]
+
+    def put(self, key: Tuple, page: int, cursor_mark: Optional[str]):
+        """Stores the cursorMark at which `page` starts."""
+        if not cursor_mark:
+            return
+        with self._lock:
+            pages = self._pages(key)
+            if len(pages) >= MAX_PAGES_PER_SEARCH and page not in pages:
+                return
+            pages[page] = cursor_mark
+
+    def clear(self):
+        with self._lock:
+            self._searches.clear()
+
+
+search_cursors = CursorCache()
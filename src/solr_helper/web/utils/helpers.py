@@ -1,11 +1,29 @@
 """
 Helper functions for SolrHelper web interface.
 """
-import fnmatch
 from loguru import logger
 
+from ...field_resolver import FieldResolver
 
-def get_field_definition(field_name, schema, doc=None):
+FIELD_GROUP_SIZE = 100  # Fields per group on the record page; further groups load while scrolling
+VALUE_PAGE_SIZE = 50  # Values of a multi-valued field shown at once
+VALUE_TRUNCATE_CHARS = 1000  # Longer values are cut off until the full value is requested
+
+
+def get_field_resolver(schema):
+    """
+    Returns the precomputed FieldResolver for a schema (built once per schema).
+    
+    Args:
+        schema (dict): Solr schema
+        
+    Returns:
+        FieldResolver: Resolver with static and dynamic field indexes
+    """
+    return FieldResolver.for_schema(schema)
+
+
+def get_field_definition(field_name, schema, doc=None, resolver=None):
     """
     Gets the field definition for a given field name.
     Checks schema fields, dynamic fields, and creates fallback definitions.
@@ -14,61 +32,60 @@ def get_field_definition(field_name, schema, doc=None):
         field_name (str): Name of the field
         schema (dict): Solr schema
         doc (dict, optional): Document to infer field properties from
+        resolver (FieldResolver, optional): Prebuilt resolver for the schema
         
     Returns:
         dict: Field definition with name, type, multiValued, stored properties
     """
-    # Check explicit schema fields
-    schema_fields_map = {f['name']: f for f in schema.get('fields', [])}
-    field_definition = schema_fields_map.get(field_name)
-    
-    if not field_definition:
-        # Check dynamic fields
-        for df_pattern in schema.get('dynamic_fields', []):
-            if fnmatch.fnmatch(field_name, df_pattern['name']):
-                field_definition = df_pattern.copy()
-                field_definition['name'] = field_name
-                logger.debug(f"Dynamisches Feld erkannt: {field_name} -> {df_pattern['name']}")
-                break
-    
-    # Fallback for fields that only exist in the document
-    if not field_definition:
-        field_definition = {
-            'name': field_name,
-            'type': 'unbekannt (nur im Dokument)',
-            'multiValued': isinstance(doc.get(field_name) if doc else None, list),
-            'stored': True
-        }
-        logger.debug(f"Unbekanntes Feld im Dokument: {field_name}")
-    
-    return field_definition
+    resolver = resolver or get_field_resolver(schema)
+    return resolver.get_field_definition(field_name, doc)
+
+
+def record_field_names(doc, resolver, include_empty=False):
+    """
+    Returns the sorted field names shown for a document.
+
+    Args:
+        doc (dict or list): Solr document, or just its field names
+        resolver (FieldResolver): Prebuilt resolver for the schema
+        include_empty (bool): Also list static schema fields the document does not have
+
+    Returns:
+        list: Sorted field names
+    """
+    names = set(doc)
+    if include_empty:
+        names.update(resolver.static_names)
+    return sorted(names)
 
 
-def create_display_fields(doc, schema):
+def create_display_fields(doc, schema, resolver=None, include_empty=True, offset=0, limit=None, names=None):
     """
     Creates a list of display fields combining document fields and schema fields.
     
     Args:
         doc (dict): Solr document
         schema (dict): Solr schema
+        resolver (FieldResolver, optional): Prebuilt resolver for the schema
+        include_empty (bool): Include schema fields without a value in the document
+        offset (int): Index of the first field (in sorted order)
+        limit (int, optional): Maximum number of fields (a field group), None for all
+        names (list, optional): Sorted names of all shown fields, when `doc` only holds this group
         
     Returns:
         list: List of field display objects with definition, value, and has_value
     """
-    # Create map of schema fields
-    schema_fields_map = {f['name']: f for f in schema.get('fields', [])}
+    resolver = resolver or get_field_resolver(schema)
     
-    # Combine document fields and schema fields
-    doc_field_names = set(doc.keys())
-    all_field_names = sorted(list(doc_field_names.union(schema_fields_map.keys())))
+    if names is None:
+        names = record_field_names(doc, resolver, include_empty)
+    end = len(names) if limit is None else offset + limit
     
-    logger.debug(f"Dokument-Felder: {sorted(doc_field_names)}")
-    logger.debug(f"Schema-Felder: {sorted(schema_fields_map.keys())}")
-    logger.debug(f"Alle Felder: {all_field_names}")
+    logger.debug(f"Dokument-Felder: {len(doc)}, angezeigt: {len(names)}, Gruppe ab {offset}")
     
     display_fields = []
-    for name in all_field_names:
-        field_def = get_field_definition(name, schema, doc)
+    for name in names[offset:end]:
+        field_def = resolver.get_field_definition(name, doc)
         
         display_fields.append({
             'definition': field_def,
@@ -76,7 +93,6 @@ def create_display_fields(doc, schema):
             'has_value': name in doc
         })
     
-    logger.debug(f"Display-Felder erstellt: {len(display_fields)} Felder")
     return display_fields
 
 
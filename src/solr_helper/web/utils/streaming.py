@@ -0,0 +1,60 @@
+"""
+Streamed template rendering for search pages and fragments.
+"""
+from typing import Hashable, Iterator, Optional, Tuple
+
+from flask import current_app, stream_template
+from markupsafe import Markup
+
+from ...search_cache import search_cache
+
+STREAM_CHUNK_BYTES = 8192  # Jinja liefert sehr kleine Stücke; gesendet wird in Blöcken dieser Größe
+STREAM_FLUSH = Markup('<!-- stream:flush -->')
+
+
+def stream_page(template_name: str, cache_key: Optional[Tuple[Hashable, ...]] = None,
+                generation: Optional[int] = None, **context):
+    """
+    Rendert ein Template als gestreamte Antwort (Flask `stream_template`).
+
+    `{{ stream_flush }}` im Template sendet das bisher Gerenderte sofort, z.B. den Seitenkopf
+    vor einer Solr-Abfrage, die das Template selbst anstößt. Mit `cache_key` (erstes Element:
+    Core-URL) wird das vollständige HTML anschließend im Such-Cache abgelegt und wie die
+    Suchergebnisse bei Schreibzugriffen auf den Core verworfen; `generation` ist der Stand
+    von `search_cache.generation()` vor der Solr-Abfrage.
+    """
+    chunks = stream_template(template_name, stream_flush=STREAM_FLUSH, **context)
+    return current_app.response_class(_coalesce(chunks, cache_key, generation), mimetype='text/html')
+
+
+def cached_fragment(cache_key: Tuple[Hashable, ...]) -> Optional[str]:
+    """Das von `stream_page` gespeicherte HTML für `cache_key`, falls noch gültig."""
+    return search_cache.get(cache_key)
+
+
+def _coalesce(chunks: Iterator[str], cache_key, generation) -> Iterator[str]:
+    buffer, size, rendered = [], 0, []
+    for chunk in chunks:
+        if chunk == STREAM_FLUSH:
+            if buffer:
+                yield ''.join(buffer)
+                buffer, size = [], 0
+            continue
+        buffer.append(chunk)
+        size += len(chunk)
+        if cache_key is not None:
+            rendered.append(chunk)
+        if size >= STREAM_CHUNK_BYTES:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+    if cache_key is not None:
+        html = ''.join(rendered)
+        search_cache.put(cache_key, html, len(html), generation)
+
+
+def precompile_templates(app):
+    """Kompiliert alle Templates beim Start, statt bei der ersten Anfrage (bleiben im Jinja-Cache)."""
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
@@ -0,0 +1,61 @@
+"""
+Server-Timing headers and request metrics for the SolrHelper web interface.
+
+Only active when `solr_helper.metrics` is enabled; otherwise no hooks are registered.
+"""
+import time
+
+from flask import g, request, before_render_template, template_rendered
+
+from ... import metrics
+
+
+def register_timing(app):
+    """
+    Registriert die Zeitmessung für Web-Anfragen an der App.
+
+    Jede Antwort erhält einen `Server-Timing`-Header mit der Zeit in Solr (`solr`), beim
+    Rendern der Templates (`render`), im übrigen Code (`app`) und insgesamt (`total`).
+    Bei gestreamten Antworten enthält der Header nur die Zeit bis zum ersten Byte.
+    """
+    if not metrics.enabled:
+        return
+
+    @app.before_request
+    def start_timing():
+        g.request_started = time.perf_counter()
+        g.request_timing = metrics.RequestTiming()
+        g.request_timing_token = metrics.current_timing.set(g.request_timing)
+
+    @app.after_request
+    def add_server_timing(response):
+        timing = g.get('request_timing')
+        if timing is None:
+            return response
+        total = time.perf_counter() - g.pop('request_started')
+        rest = max(0.0, total - timing.solr_seconds - timing.render_seconds)
+        response.headers.add('Server-Timing',
+                             f'solr;dur={timing.solr_seconds * 1000:.1f};desc="{timing.solr_calls} Solr-Anfragen", '
+                             f'render;dur={timing.render_seconds * 1000:.1f}, '
+                             f'app;dur={rest * 1000:.1f}, total;dur={total * 1000:.1f}')
+        metrics.http_request_seconds.observe(total, request.endpoint or 'unbekannt')
+        return response
+
+    @app.teardown_request
+    def stop_timing(exc):
+        token = g.pop('request_timing_token', None)
+        if token is not None:
+            metrics.current_timing.reset(token)
+
+    def render_started(sender, template, context, **extra):
+        g.render_started = time.perf_counter()
+
+    def render_finished(sender, template, context, **extra):
+        started = g.pop('render_started', None)
+        timing = g.get('request_timing')
+        if started is not None and timing is not None:
+            timing.render_seconds += time.perf_counter() - started
+
+    # weak=False: die lokalen Funktionen würden sonst sofort wieder entfernt
+    before_render_template.connect(render_started, app, weak=False)
+    template_rendered.connect(render_finished, app, weak=False)
@@ -0,0 +1,33 @@
+"""
+Gemeinsame Fixtures: Flask-App mit fester Verbindung auf den Fake-Solr aus benchmarks/.
+"""
+import pytest
+
+from benchmarks.fake_solr import FakeSolrServer
+from solr_helper import solr_client
+from solr_helper.web.app import create_app
+
+
+@pytest.fixture
+def web_client(tmp_path, monkeypatch):
+    """
+    Startet einen Fake-Solr mit den übergebenen Cores und liefert einen Test-Client der App.
+
+    Die App ist fest mit dem ersten Core verbunden; `client.server` ist der Fake-Solr.
+    Client-Pool, Schema-Cache und Schlüssel gelten nur für den Test.
+    """
+    monkeypatch.setenv('SOLRHELPER_SCHEMA_CACHE_DIR', str(tmp_path / 'schema_cache'))
+    monkeypatch.setenv('SOLRHELPER_SECRET_KEY', 'test')
+    monkeypatch.setattr(solr_client, '_clients', type(solr_client._clients)())
+    servers = []
+
+    def start(cores, **app_options):
+        server = FakeSolrServer(cores).start()
+        servers.append(server)
+        client = create_app(server.url, next(iter(cores)), {}, **app_options).test_client()
+        client.server = server
+        return client
+
+    yield start
+    for server in servers:
+        server.stop()
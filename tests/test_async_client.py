@@ -0,0 +1,78 @@
+"""
+Tests für AsyncSolrClient gegen den Fake-Solr: geteilter Zustand mit SolrClient,
+gleichzeitige Anfragen und die Hintergrund-Loop für Code ohne Event-Loop.
+"""
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip('httpx')
+
+from benchmarks.fake_solr import FakeSolrServer
+from benchmarks.synthetic_core import SyntheticCore
+from solr_helper import async_client, solr_client
+from solr_helper.async_client import AsyncSolrClient, get_async_client, reset_background_loop, submit
+from solr_helper.solr_client import get_client
+from solr_helper.solr_updates import VersionConflictError
+
+LATENCY = 0.2
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(solr_client, '_clients', type(solr_client._clients)())
+    with FakeSolrServer({'a': SyntheticCore('a', 50), 'b': SyntheticCore('b', 50, seed=7)}) as server:
+        yield server
+    reset_background_loop()
+
+
+def test_document_cache_is_shared_with_the_sync_client(server):
+    async def read():
+        async with AsyncSolrClient(server.url, 'a') as client:
+            return await client.get_document_by_id('id', 'doc0000003')
+
+    assert asyncio.run(read())['id'] == 'doc0000003'
+    requests_before = server.requests
+    assert get_client(server.url, 'a').get_document_by_id('id', 'doc0000003')['id'] == 'doc0000003'
+    assert server.requests == requests_before
+
+
+def test_searches_on_several_cores_run_concurrently(server):
+    server.latency = LATENCY
+
+    async def fan_out():
+        async with AsyncSolrClient(server.url, 'a') as a, AsyncSolrClient(server.url, 'b') as b:
+            return await asyncio.gather(*(client.search_documents(f'q{i}', field='title', profile='results')
+                                          for i in range(3) for client in (a, b)))
+
+    started = time.monotonic()
+    results = asyncio.run(fan_out())
+    assert len(results) == 6
+    assert time.monotonic() - started < 3 * LATENCY  # Seriell wären es 6 * LATENCY
+
+
+def test_stale_version_raises_a_conflict(server):
+    core = server.cores['a']
+    stale = core.docs[core.positions['doc0000001']]['_version_']
+    core.update([{'id': 'doc0000001', 'author_s': {'set': 'Jemand anderes'}}], versions=False)
+
+    async def save():
+        async with AsyncSolrClient(server.url, 'a') as client:
+            await client.update_document_field(True, 'id', 'doc0000001', 'author_s', 'Ich',
+                                               expected_version=stale)
+
+    with pytest.raises(VersionConflictError):
+        asyncio.run(save())
+    assert core.docs[core.positions['doc0000001']]['author_s'] == 'Jemand anderes'
+
+
+def test_background_loop_pools_clients_until_reset(server):
+    client = get_async_client(server.url, 'a')
+    assert get_async_client(server.url + '/', 'a') is client
+    doc = submit(client.get_document_by_id('id', 'doc0000002', use_cache=False)).result(timeout=5)
+    assert doc['id'] == 'doc0000002'
+
+    reset_background_loop()
+    assert not async_client._clients
+    assert get_async_client(server.url, 'a') is not client
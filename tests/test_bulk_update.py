@@ -0,0 +1,187 @@
+"""
+Tests für Fortsetzungspunkte von BatchWriter und BulkUpdateJob (ohne Solr).
+"""
+import threading
+
+import pytest
+
+from solr_helper import bulk_update
+from solr_helper.batch_writer import BatchWriter
+from solr_helper.bulk_update import BulkUpdateJob
+from solr_helper.solr_updates import VersionConflictError
+
+
+class FakeCore:
+    """Minimaler Client: Dokumente mit `n`, atomare `inc`-Updates wie Solr (sequenziell, Abbruch bei 409)."""
+
+    core_url = 'http://fake/solr/c'
+
+    def __init__(self, count=100, fail_on=None, lose_response_on=None):
+        self.docs = {f'd{i:03d}': {'id': f'd{i:03d}', 'n': 0, '_version_': 1000 + i} for i in range(count)}
+        self.fail_on = set(fail_on or ())
+        # Batches mit diesen IDs werden geschrieben, die Antwort geht aber verloren (Read-Timeout)
+        self.lose_response_on = set(lose_response_on or ())
+        self.version = 5000
+        self.commits = 0
+        self.lock = threading.Lock()
+
+    def check_update_log_status(self):
+        return True
+
+    def count_documents(self, query='*:*'):
+        return len(self.docs)
+
+    def iter_cursor(self, query, unique_key_field, fl=None, rows=10, cursor_mark='*'):
+        with self.lock:
+            versions = {doc_id: doc['_version_'] for doc_id, doc in self.docs.items()}
+        ids = sorted(versions)
+        start = 0 if cursor_mark == '*' else int(cursor_mark)
+        while start < len(ids):
+            page = ids[start:start + rows]
+            start += len(page)
+            yield [{'id': doc_id, '_version_': versions[doc_id]} for doc_id in page], str(start)
+
+    def write_batch(self, docs):
+        if any(doc['id'] in self.fail_on for doc in docs):
+            raise RuntimeError('Solr nicht erreichbar')
+        with self.lock:
+            for doc in docs:
+                current = self.docs.get(doc['id'])
+                expected = doc.get('_version_')
+                actual = current['_version_'] if current else -1
+                if (expected == 1 and current is None) or (expected and expected > 1 and expected != actual):
+                    raise VersionConflictError('', f"version conflict for {doc['id']} expected={expected} actual={actual}")
+                current['n'] += doc['n']['inc']
+                self.version += 1
+                current['_version_'] = self.version
+            lost = self.lose_response_on & {doc['id'] for doc in docs}
+            self.lose_response_on -= lost
+        if lost:
+            raise RuntimeError('Read timed out')
+        return {}
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(bulk_update, 'BatchWriter', lambda send_fn, workers, retries=3:
+                        BatchWriter(send_fn, workers=workers, retries=retries, retry_backoff=0))
+
+
+def _job(core, tmp_path):
+    return BulkUpdateJob(core, {'unique_key': 'id'}, '*:*', 'n', 'inc', 1, batch_size=10, workers=4,
+                         state_dir=tmp_path)
+
+
+def test_checkpoint_stops_before_failed_batch():
+    def send(batch):
+        if batch == ['b']:
+            raise RuntimeError('Solr nicht erreichbar')
+
+    writer = BatchWriter(send, workers=1, retries=0)
+    for batch in (['a'], ['b'], ['c']):
+        writer.submit(batch, tag=batch[0])
+    assert writer.close() == ['a']
+    assert writer.written_after_failure == ['c']
+    assert [tag for tag, _ in writer.failed_batches] == ['b']
+
+
+def test_failed_batch_stops_job_and_resume_applies_each_update_once(tmp_path):
+    core = FakeCore(fail_on={'d045'})
+    job = _job(core, tmp_path).run()
+    assert job.status == 'fehlgeschlagen'
+    assert job.state_file.exists()
+    assert all(doc['n'] == 0 for doc_id, doc in core.docs.items() if 'd040' <= doc_id < 'd050')
+
+    core.fail_on.clear()
+    job = _job(core, tmp_path).run()
+    assert job.status == 'fertig'
+    assert job.processed == 100
+    assert all(doc['n'] == 1 for doc in core.docs.values())
+    assert not job.state_file.exists()
+
+
+def test_deleted_documents_are_skipped_not_recreated(tmp_path):
+    core = FakeCore()
+    job = _job(core, tmp_path)
+    send = job._send_batch
+
+    def delete_then_send(ids):
+        with core.lock:
+            core.docs.pop('d013', None)
+            core.docs.pop('d017', None)
+        send(ids)
+
+    job._send_batch = delete_then_send
+    job.run()
+    assert job.status == 'fertig'
+    assert (job.skipped, job.failed) == (2, 0)
+    assert 'd013' not in core.docs and 'd017' not in core.docs
+    assert core.docs['d014']['n'] == core.docs['d018']['n'] == 1
+
+
+def test_retried_inc_batch_is_not_applied_twice(tmp_path):
+    """Solr hat den Batch geschrieben, die Antwort ging verloren: die Wiederholung scheitert an _version_."""
+    core = FakeCore(lose_response_on={'d023'})
+    job = _job(core, tmp_path).run()
+    assert job.status == 'fertig'
+    assert all(doc['n'] == 1 for doc in core.docs.values())
+    assert (job.skipped, job.conflicts) == (0, 10)
+
+
+def test_resume_resends_failed_batch_with_original_versions(tmp_path, monkeypatch):
+    """Geschrieben, aber als fehlgeschlagen gemeldet: das Fortsetzen wendet `inc` nicht erneut an."""
+    core = FakeCore(lose_response_on={'d045'})
+    with monkeypatch.context() as patch:
+        # Ohne Wiederholungen bleibt der Batch nach dem Antwortverlust fehlgeschlagen
+        patch.setattr(bulk_update, 'BatchWriter', lambda send_fn, workers, retries=3:
+                      BatchWriter(send_fn, workers=workers, retries=0))
+        job = _job(core, tmp_path).run()
+    assert job.status == 'fehlgeschlagen'
+    assert core.docs['d045']['n'] == 1
+
+    job = _job(core, tmp_path).run()
+    assert job.status == 'fertig'
+    assert job.processed == 100
+    assert all(doc['n'] == 1 for doc in core.docs.values())
+    assert job.conflicts == 10
+
+
+def test_cancelled_job_commits_written_batches(tmp_path):
+    core = FakeCore()
+    job = _job(core, tmp_path)
+    job.run(progress=lambda j: j.cancel() if j.processed >= 30 else None)
+    assert job.status == 'abgebrochen'
+    assert core.commits == 1
+    assert 30 <= job.processed < 100
+    assert sum(doc['n'] for doc in core.docs.values()) == job.processed
+
+
+def test_status_and_cancel_work_across_processes(tmp_path):
+    """Ein anderer Worker sieht den Stand über die Statusdatei und bricht über die Abbruchdatei ab."""
+    core = FakeCore()
+    job = _job(core, tmp_path)
+
+    def cancel_from_other_worker(j):
+        status = bulk_update.load_job_status(j.job_id, tmp_path)
+        if status is not None and status.running and status.processed >= 30:
+            bulk_update.request_cancel(j.job_id, tmp_path)
+
+    job.run(progress=cancel_from_other_worker)
+    assert job.status == 'abgebrochen'
+    status = bulk_update.load_job_status(job.job_id, tmp_path)
+    assert (status.status, status.processed, status.total) == ('abgebrochen', job.processed, 100)
+    assert [s.job_id for s in bulk_update.list_job_status(core.core_url, tmp_path)] == [job.job_id]
+    assert not job.cancel_file.exists()
+
+
+def test_status_of_a_job_whose_process_died_is_not_running(tmp_path, monkeypatch):
+    job = _job(FakeCore(), tmp_path)
+    job.status = 'läuft'
+    job.publish()
+    assert bulk_update.load_job_status(job.job_id, tmp_path).running
+    monkeypatch.setattr(bulk_update, '_process_alive', lambda pid: False)
+    assert bulk_update.load_job_status(job.job_id, tmp_path).status == 'abgebrochen'
+    assert bulk_update.load_job_status('../../etc/passwd', tmp_path) is None
@@ -0,0 +1,38 @@
+"""
+Tests für den Client-Pool von get_client() (ohne Solr).
+"""
+import pytest
+
+from solr_helper import solr_client
+from solr_helper.commit_policy import CommitPolicy
+from solr_helper.solr_client import get_client
+
+URL = 'http://solr.example/solr'
+
+
+@pytest.fixture(autouse=True)
+def empty_pool(monkeypatch):
+    monkeypatch.setattr(solr_client, '_clients', type(solr_client._clients)())
+
+
+def test_commit_policy_is_per_variant_not_per_core():
+    group = get_client(URL, 'books', CommitPolicy.parse('group:500'))
+    hard = get_client(URL, 'books')
+    assert str(group.commit_policy) == 'group:500'
+    assert str(hard.commit_policy) == 'hard'
+    assert get_client(URL, 'books', CommitPolicy.parse('group:500')) is group
+    assert get_client(URL + '/', 'books', CommitPolicy.parse('hard')) is hard
+    # Schreibzugriffe über eine Variante invalidieren die Dokumente der anderen
+    assert group.document_cache is hard.document_cache
+
+
+def test_pool_is_bounded_and_flushes_evicted_clients(monkeypatch):
+    monkeypatch.setattr(solr_client, 'MAX_CLIENTS', 3)
+    flushed = []
+    first = get_client(URL, 'core0')
+    monkeypatch.setattr(first, 'flush_commits', lambda: flushed.append(first.core))
+    for i in range(1, 4):
+        get_client(URL, f'core{i}')
+    assert len(solr_client._clients) == 3
+    assert flushed == ['core0']
+    assert get_client(URL, 'core0') is not first
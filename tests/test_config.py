@@ -0,0 +1,50 @@
+"""
+Tests für den Schlüssel der Session-Cookies (load_secret_key).
+"""
+import stat
+import threading
+
+import pytest
+
+from solr_helper import config
+from solr_helper.config import load_secret_key
+
+
+@pytest.fixture
+def key_file(tmp_path, monkeypatch):
+    monkeypatch.delenv('SOLRHELPER_SECRET_KEY', raising=False)
+    monkeypatch.setattr(config, 'load_config_file', lambda: {})
+    path = tmp_path / 'solrhelper' / 'secret_key'
+    monkeypatch.setenv('SOLRHELPER_SECRET_KEY_FILE', str(path))
+    return path
+
+
+def test_key_is_created_once_and_only_readable_by_the_user(key_file):
+    key = load_secret_key()
+    assert len(key) == 64
+    assert load_secret_key() == key
+    assert stat.S_IMODE(key_file.stat().st_mode) == 0o600
+    assert [p.name for p in key_file.parent.iterdir()] == ['secret_key']  # Keine temporären Dateien
+
+
+def test_parallel_workers_share_one_complete_key(key_file):
+    keys = []
+    start = threading.Barrier(8)
+
+    def worker():
+        start.wait()
+        keys.append(load_secret_key())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(keys)) == 1 and len(keys[0]) == 64
+
+
+def test_empty_key_file_is_rejected(key_file):
+    key_file.parent.mkdir(parents=True)
+    key_file.write_text('\n')
+    with pytest.raises(ValueError, match='leer'):
+        load_secret_key()
@@ -0,0 +1,57 @@
+"""
+Tests für das Blättern per cursorMark in fetch_results_page() (ohne Solr).
+"""
+import pytest
+
+from solr_helper.search_cache import SearchCache
+from solr_helper.web.routes import search
+from solr_helper.web.utils.cursor_cache import CursorCache
+
+CORE = 'http://solr.example/solr/books'
+
+
+class FakeClient:
+    core_url = CORE
+
+    def __init__(self):
+        self.cursors = []  # cursor_mark jeder Suche (None = Paging per start)
+
+    def search_documents(self, query, field=None, rows=20, start=0, cursor_mark=None, **kwargs):
+        self.cursors.append(cursor_mark)
+        page = start // rows + 1
+        return {'docs': [], 'numFound': 1000, 'start': start, 'rows': rows, 'nextCursorMark': f'nach-{page}'}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = SearchCache(max_bytes=1000, ttl=60)
+    monkeypatch.setattr(search, 'search_cache', cache)
+    monkeypatch.setattr(search, 'search_cursors', CursorCache())
+    return cache
+
+
+def _page(client, page):
+    return search.fetch_results_page(client, 'buch', 'title', page, 20, 'id')
+
+
+def test_next_page_uses_the_remembered_cursor(cache):
+    client = FakeClient()
+    _page(client, 1)
+    _page(client, 2)
+    assert client.cursors == ['*', 'nach-1']
+
+
+def test_cursors_are_dropped_after_a_write(cache):
+    client = FakeClient()
+    _page(client, 1)
+    cache.invalidate(CORE)  # Update auf dem Core: die Seitengrenzen haben sich verschoben
+    _page(client, 2)
+    assert client.cursors == ['*', None]
+
+
+def test_no_cursors_are_stored_while_a_write_awaits_its_commit(cache):
+    client = FakeClient()
+    cache.invalidate(CORE, pending_for=60)
+    _page(client, 1)
+    _page(client, 2)
+    assert client.cursors == ['*', None]
@@ -0,0 +1,98 @@
+"""
+Tests für den Dokument-Cache: Versions-Untergrenzen, Größenbegrenzung und Vorladen (ohne Solr).
+"""
+import threading
+
+import pytest
+
+from solr_helper import document_cache
+from solr_helper.document_cache import DocumentCache, prefetch
+
+
+@pytest.fixture
+def cache():
+    return DocumentCache(max_bytes=4000, ttl=60)
+
+
+def _doc(doc_id, version, text='x'):
+    return {'id': doc_id, '_version_': version, 'text': text}
+
+
+def test_older_versions_are_rejected_after_a_write(cache):
+    cache.put('1', _doc('1', 10, 'alt'))
+    cache.written(['1', 20])  # Update-Antwort mit versions=true
+    assert cache.get('1') is None
+
+    cache.put('1', _doc('1', 10, 'alt'))  # z.B. ein Vorladen, das noch unterwegs war
+    assert cache.get('1') is None
+    cache.put('1', _doc('1', 20, 'neu'))
+    assert cache.get('1')['text'] == 'neu'
+
+
+def test_cached_entry_is_not_replaced_by_an_older_state(cache):
+    cache.put('1', _doc('1', 20, 'neu'))
+    cache.put('1', _doc('1', 10, 'alt'))
+    assert cache.get('1')['text'] == 'neu'
+
+
+def test_version_floors_are_bounded(cache, monkeypatch):
+    monkeypatch.setattr(document_cache, 'MAX_VERSION_FLOORS', 2)
+    for i in range(3):
+        cache.invalidate(str(i), 100)
+    cache.put('0', _doc('0', 1))  # Älteste Untergrenze ist vergessen
+    cache.put('2', _doc('2', 1))
+    assert '0' in cache and '2' not in cache
+
+
+def test_byte_limit_evicts_oldest_and_skips_huge_documents(cache):
+    for i in range(6):
+        cache.put(str(i), _doc(str(i), 1, 'x' * 900))
+    assert '0' not in cache and '5' in cache
+    assert cache.stats()['bytes'] <= cache.max_bytes
+
+    cache.put('riesig', _doc('riesig', 1, 'x' * 1100))  # > max_bytes / 4
+    assert 'riesig' not in cache
+
+
+def test_field_names_of_huge_documents_are_kept(cache):
+    cache.put('riesig', _doc('riesig', 7, 'x' * 1100))
+    assert 'riesig' not in cache
+    assert cache.field_names('riesig', 7) == ['id', '_version_', 'text']
+    assert cache.field_names('riesig', 8) is None  # Anderer Stand
+    cache.written(['riesig', 8])
+    assert cache.field_names('riesig') is None
+
+
+class FakeClient:
+    core_url = 'http://solr.example/solr/books'
+
+    def __init__(self):
+        self.document_cache = DocumentCache(max_bytes=100000, ttl=60)
+        self.requests = []
+
+    def get_documents_by_ids(self, unique_key_field, doc_ids, batch_size):
+        self.requests.append(list(doc_ids))
+        return [_doc(doc_id, 1) for doc_id in doc_ids]
+
+
+def test_prefetch_loads_only_missing_documents():
+    client = FakeClient()
+    client.document_cache.put('1', _doc('1', 1))
+    prefetch(client, 'id', ['1', '2', None]).result(timeout=5)
+    assert client.requests == [['2']]
+    assert '2' in client.document_cache
+    assert prefetch(client, 'id', ['1', '2']) is None
+
+
+def test_newer_preview_prefetch_replaces_a_waiting_one(monkeypatch):
+    monkeypatch.setattr(document_cache, '_prefetch_pool', document_cache.ThreadPoolExecutor(max_workers=1))
+    release = threading.Event()
+    document_cache._prefetch_pool.submit(release.wait)  # Belegt den einzigen Worker
+    client = FakeClient()
+    key = (client.core_url, 'preview')
+    first = prefetch(client, 'id', ['b'], replaces=key)
+    last = prefetch(client, 'id', ['bu'], replaces=key)
+    release.set()
+    last.result(timeout=5)
+    assert first.cancelled()
+    assert client.requests == [['bu']]
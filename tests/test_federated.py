@@ -0,0 +1,69 @@
+"""
+Tests für die föderierte Suche gegen zwei Fake-Solr-Server (schnell und langsam).
+"""
+import time
+
+import pytest
+
+from benchmarks.fake_solr import FakeSolrServer
+from benchmarks.synthetic_core import SyntheticCore
+from solr_helper import federated, solr_client
+from solr_helper.async_client import httpx_available, reset_background_loop
+from solr_helper.federated import FederatedTarget, federated_search
+
+SLOW = 1.0
+
+
+@pytest.fixture(params=['async', 'threads'])
+def servers(request, tmp_path, monkeypatch):
+    if request.param == 'async' and not httpx_available():
+        pytest.skip('httpx nicht installiert')
+    if request.param == 'threads':
+        monkeypatch.setattr(federated, 'httpx_available', lambda: False)
+    monkeypatch.setenv('SOLRHELPER_SCHEMA_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(solr_client, '_clients', type(solr_client._clients)())
+    with FakeSolrServer({'schnell': SyntheticCore('schnell', 30)}) as fast, \
+            FakeSolrServer({'langsam': SyntheticCore('langsam', 30)}) as slow:
+        yield fast, slow
+    reset_background_loop()
+
+
+def _search(targets, field='title', timeout=0.3):
+    started = time.monotonic()
+    results = list(federated_search(targets, 'wort', field, timeout=timeout))
+    return results, time.monotonic() - started
+
+
+def test_slow_core_is_reported_as_timeout_without_delaying_the_others(servers):
+    fast, slow = servers
+    list(federated_search([FederatedTarget(slow.url, 'langsam')], 'vorab', 'title'))  # Schema vorab laden
+    slow.latency = SLOW
+
+    results, elapsed = _search([FederatedTarget(slow.url, 'langsam', 'Langsam'),
+                                FederatedTarget(fast.url, 'schnell', 'Schnell')])
+    assert [(r.target.name, r.status) for r in results] == [('Schnell', 'ok'), ('Langsam', 'timeout')]
+    assert elapsed < SLOW
+
+
+def test_target_timeout_overrides_the_default(servers):
+    fast, slow = servers
+    list(federated_search([FederatedTarget(slow.url, 'langsam')], 'vorab', 'title'))  # Schema vorab laden
+    slow.latency = 0.5
+
+    results, _ = _search([FederatedTarget(slow.url, 'langsam', timeout=2.0)], timeout=0.1)
+    assert [r.status for r in results] == ['ok']
+
+
+def test_unknown_field_and_unknown_core_are_reported_per_target(servers):
+    fast, _ = servers
+    results, _ = _search([FederatedTarget(fast.url, 'schnell', 'Feld fehlt'),
+                          FederatedTarget(fast.url, 'gibtsnicht', 'Core fehlt')], field='unbekannt', timeout=5)
+    statuses = {r.target.name: r.status for r in results}
+    assert statuses == {'Feld fehlt': 'no_field', 'Core fehlt': 'error'}
+
+
+def test_targets_need_url_and_core():
+    with pytest.raises(ValueError):
+        FederatedTarget.from_dict({'url': 'http://solr.example/solr'})
+    target = FederatedTarget.from_dict({'url': 'http://solr.example/solr', 'core': 'books', 'id': 3})
+    assert (target.name, target.connection_id) == ('books @ http://solr.example/solr', '3')
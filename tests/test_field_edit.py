@@ -0,0 +1,59 @@
+"""
+Tests für das Bearbeiten eines Feldes: ein Lese- und ein Schreibzugriff, optimistische
+Sperre über `_version_` (Fake-Solr aus benchmarks/).
+"""
+import pytest
+
+from benchmarks.synthetic_core import SyntheticCore
+from solr_helper.solr_updates import VersionConflictError, full_update_doc
+
+DOC_ID = 'doc0000001'
+
+
+@pytest.fixture
+def core():
+    return SyntheticCore('a', 5)
+
+
+@pytest.fixture
+def client(core, web_client):
+    client = web_client({'a': core})
+    client.get(f'/record/{DOC_ID}/edit-form/author_s')  # Liest Dokument und UpdateLog-Status
+    return client
+
+
+def _version(core):
+    return core.docs[core.positions[DOC_ID]]['_version_']
+
+
+def _save(client, value, expected_version):
+    return client.post(f'/record/{DOC_ID}/update-field', data={
+        'field_name': 'author_s', 'field_value': value, 'is_multi_valued': 'false',
+        'expected_version': expected_version})
+
+
+def test_save_is_a_single_request_with_the_read_version(client, core):
+    requests_before = client.server.requests
+    response = _save(client, 'Neue Autorin', _version(core))
+    assert response.status_code == 200
+    assert 'Neue Autorin' in response.text
+    assert client.server.requests - requests_before == 1  # Nur das Update, kein erneutes Lesen
+    assert core.docs[core.positions[DOC_ID]]['author_s'] == 'Neue Autorin'
+
+
+def test_concurrent_change_is_not_overwritten(client, core):
+    read_version = _version(core)
+    core.update([{'id': DOC_ID, 'author_s': {'set': 'Andere Person'}}], versions=False)
+
+    response = _save(client, 'Meine Änderung', read_version)
+    assert response.status_code == 409
+    assert 'zwischenzeitlich geändert' in response.text
+    assert 'Andere Person' in response.text  # Die Zeile zeigt den aktuellen Stand
+    assert core.docs[core.positions[DOC_ID]]['author_s'] == 'Andere Person'
+
+
+def test_full_document_update_checks_the_version_itself():
+    doc = {'id': DOC_ID, '_version_': 7, 'author_s': 'alt'}
+    assert full_update_doc(doc, DOC_ID, 'author_s', 'neu', expected_version=7)['author_s'] == 'neu'
+    with pytest.raises(VersionConflictError):
+        full_update_doc(doc, DOC_ID, 'author_s', 'neu', expected_version=6)
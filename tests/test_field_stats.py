@@ -0,0 +1,105 @@
+"""
+Tests für die Feldstatistik: Einordnung der Felder, Histogramm-Bereiche und Cache (ohne Solr).
+"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from solr_helper.field_stats import FieldStatsCache, field_kind, range_params, sections_for
+
+SCHEMA = {
+    'fields': [{'name': 'year', 'type': 'pint'}, {'name': 'price', 'type': 'pdouble'},
+               {'name': 'created', 'type': 'pdate'}, {'name': 'title', 'type': 'text'},
+               {'name': 'author', 'type': 'string'}, {'name': 'hidden', 'type': 'string', 'indexed': False}],
+    'dynamic_fields': [{'name': '*_b', 'type': 'boolean'}],
+    'field_types': [{'name': 'pint', 'class': 'solr.IntPointField'},
+                    {'name': 'pdouble', 'class': 'solr.DoublePointField'},
+                    {'name': 'pdate', 'class': 'solr.DatePointField'},
+                    {'name': 'text', 'class': 'solr.TextField'},
+                    {'name': 'string', 'class': 'solr.StrField'},
+                    {'name': 'boolean', 'class': 'solr.BoolField'}],
+}
+
+
+def test_field_kind_and_sections_follow_the_field_type():
+    kinds = {name: field_kind(SCHEMA, name)['kind'] for name in ('year', 'price', 'created', 'title', 'author', 'neu_b')}
+    assert kinds == {'year': 'numeric', 'price': 'numeric', 'created': 'date', 'title': 'text',
+                     'author': 'string', 'neu_b': 'boolean'}
+    assert field_kind(SCHEMA, 'neu_b')['dynamic'] is True
+    assert field_kind(SCHEMA, 'unbekannt') is None
+    assert sections_for(field_kind(SCHEMA, 'year')) == ('values', 'stats', 'ranges')
+    assert sections_for(field_kind(SCHEMA, 'title')) == ('values',)
+    assert sections_for(field_kind(SCHEMA, 'hidden')) == ()
+
+
+def test_integer_ranges_use_whole_number_gaps():
+    params = range_params(field_kind(SCHEMA, 'year'), 1801, 2024)
+    assert params == {'start': 1801, 'end': 2025, 'gap': 23}
+
+
+def test_float_ranges_cover_the_maximum():
+    params = range_params(field_kind(SCHEMA, 'price'), 0.5, 10.5)
+    assert params['start'] == 0.5 and params['gap'] == 1.0
+    assert params['end'] > 10.5
+
+
+@pytest.mark.parametrize('minimum, maximum, gap, rounding', [
+    ('2024-01-01T00:00:00Z', '2024-01-01T20:00:00Z', '+1HOUR', 'HOUR'),
+    ('2024-01-01T00:00:00Z', '2024-01-21T00:00:00Z', '+1DAY', 'DAY'),
+    ('2024-01-01T00:00:00Z', '2024-07-01T00:00:00Z', '+1MONTH', 'MONTH'),
+    ('2004-01-01T00:00:00Z', '2024-01-01T00:00:00Z', '+1YEAR', 'YEAR'),
+    ('1500-01-01T00:00:00Z', '2024-01-01T00:00:00Z', '+10YEARS', 'YEAR'),
+])
+def test_date_gap_is_chosen_from_the_span(minimum, maximum, gap, rounding):
+    params = range_params(field_kind(SCHEMA, 'created'), minimum, maximum)
+    assert params == {'start': f'{minimum}/{rounding}', 'end': f'{maximum}+1{rounding}', 'gap': gap}
+
+
+def test_no_range_without_spread():
+    assert range_params(field_kind(SCHEMA, 'year'), None, None) is None
+    assert range_params(field_kind(SCHEMA, 'year'), 2000, 2000) is None
+
+
+class FakeClient:
+    core_url = 'http://solr.example/solr/books'
+
+    def __init__(self):
+        self.searches = 0
+        self.release = threading.Event()
+        self.fail = False
+        self.solr = SimpleNamespace(search=self.search)
+
+    def search(self, **params):
+        self.searches += 1
+        self.release.wait(5)
+        if self.fail:
+            raise ConnectionError('Solr nicht erreichbar')
+        return SimpleNamespace(hits=3, facets={'facet_fields': {'author': ['goethe', 2, None, 1]}})
+
+
+def test_concurrent_requests_share_one_computation():
+    cache, client = FieldStatsCache(), FakeClient()
+    info = field_kind(SCHEMA, 'author')
+    first = cache.get(client, info, 'values')
+    assert cache.get(client, info, 'values') is first
+    client.release.set()
+    assert first.result(timeout=5) == {'total': 3, 'missing': 1, 'with_value': 2,
+                                       'values': [('goethe', 2)], 'tokenized': False}
+    assert client.searches == 1
+
+
+def test_failures_are_not_cached_and_invalidate_recomputes():
+    cache, client = FieldStatsCache(), FakeClient()
+    client.release.set()
+    client.fail = True
+    info = field_kind(SCHEMA, 'author')
+    with pytest.raises(ConnectionError):
+        cache.get(client, info, 'values').result(timeout=5)
+    client.fail = False
+    result = cache.get(client, info, 'values').result(timeout=5)
+    assert cache.get(client, info, 'values').result() is result
+
+    cache.invalidate(client, 'author')
+    cache.get(client, info, 'values').result(timeout=5)
+    assert client.searches == 3
@@ -0,0 +1,67 @@
+"""
+Tests für die Laufzeitmessung: Einordnung der Solr-URLs, QTime, Prometheus-Export und Server-Timing.
+"""
+import pytest
+
+from benchmarks.synthetic_core import SyntheticCore
+from solr_helper import metrics
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.reset()
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('http://solr:8983/solr/books/select?q=*:*', ('search', 'books')),
+    ('http://solr:8983/solr/books/get', ('get', 'books')),
+    ('http://solr:8983/solr/books/schema/fields', ('schema', 'books')),
+    ('http://solr:8983/solr/books/update/', ('update', 'books')),
+    ('http://solr:8983/solr/books/replication', ('other', 'books')),
+    ('http://solr:8983/solr/admin/cores?action=STATUS', ('admin', '-')),
+    ('http://solr:8983/solr/books', ('other', 'books')),
+    ('http://proxy/search', ('other', '-')),
+])
+def test_classify_derives_operation_and_core(url, expected):
+    assert metrics.classify(url) == expected
+
+
+def test_qtime_is_read_from_the_response_header_only():
+    assert metrics.qtime_of(b'{"responseHeader":{"status":0,"QTime":42},"response":{}}') == 0.042
+    assert metrics.qtime_of(b'{"responseHeader":{"status":0},"response":{}}') is None
+    assert metrics.qtime_of(b'{"response":{"docs":[' + b' ' * 600 + b']},"QTime":5}') is None
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram('test_seconds', 'Test.', ('core',), (0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, 'a"b')
+    lines = histogram.render()
+    assert 'test_seconds_bucket{core="a\\"b",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{core="a\\"b",le="1"} 3' in lines
+    assert 'test_seconds_bucket{core="a\\"b",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{core="a\\"b"} 4' in lines
+
+
+def test_metrics_endpoint_is_off_by_default(web_client):
+    client = web_client({'books': SyntheticCore('books', 20)})
+    assert client.get('/metrics').status_code == 404
+
+
+def test_web_requests_report_solr_time_and_export_metrics(enabled_metrics, web_client):
+    core = SyntheticCore('books', 20)
+    client = web_client({'books': core})
+    response = client.post('/api/search', data={'search_type': 'text', 'search_field': 'title',
+                                                'search_query': core.docs[0]['title'].split()[0]})
+    assert response.status_code == 200
+    timing = response.headers['Server-Timing']
+    assert 'solr;dur=' in timing and 'total;dur=' in timing
+    assert '0 Solr-Anfragen' not in timing
+
+    exported = client.get('/metrics').get_data(as_text=True)
+    assert 'solrhelper_solr_request_seconds_count{operation="search",core="books"}' in exported
+    assert 'solrhelper_http_request_seconds_count{endpoint="api.api_search"} 1' in exported
@@ -0,0 +1,116 @@
+"""
+Tests für den QueryPlanner anhand kleiner Beispielschemas.
+"""
+import pytest
+
+from solr_helper.query_planner import QueryPlanner
+
+
+def _type(name, cls='solr.TextField', index=None, query=None, tokenizer='solr.StandardTokenizerFactory'):
+    """Feldtyp mit getrennter Index- und Query-Kette (Query ohne Gram-Filter)."""
+    base = [{'class': 'solr.LowerCaseFilterFactory'}]
+    field_type = {'name': name, 'class': cls}
+    if cls == 'solr.TextField':
+        field_type['indexAnalyzer'] = {'tokenizer': {'class': tokenizer}, 'filters': base + (index or [])}
+        field_type['queryAnalyzer'] = {'tokenizer': {'class': tokenizer}, 'filters': base + (query or [])}
+    return field_type
+
+
+FIELD_TYPES = [
+    _type('string', cls='solr.StrField'),
+    _type('text_general'),
+    _type('text_ngram', tokenizer='solr.KeywordTokenizerFactory',
+          index=[{'class': 'solr.NGramFilterFactory', 'minGramSize': '3', 'maxGramSize': '15'}]),
+    _type('text_edge', tokenizer='solr.KeywordTokenizerFactory',
+          index=[{'class': 'solr.EdgeNGramFilterFactory', 'minGramSize': '2', 'maxGramSize': '20'}]),
+    _type('text_edge_words', index=[{'class': 'solr.EdgeNGramFilterFactory', 'minGramSize': '2', 'maxGramSize': '20'}]),
+    _type('text_rev', index=[{'class': 'solr.ReversedWildcardFilterFactory'}]),
+]
+
+
+def _schema(fields, copy_fields=(), dynamic_fields=()):
+    return {
+        'unique_key': 'id',
+        'fields': [{'name': 'id', 'type': 'string', 'indexed': True, 'stored': True}]
+                  + [{'name': name, 'type': field_type, 'indexed': True, 'stored': True} for name, field_type in fields],
+        'dynamic_fields': [{'name': name, 'type': field_type, 'indexed': True, 'stored': True}
+                           for name, field_type in dynamic_fields],
+        'field_types': FIELD_TYPES,
+        'copy_fields': [{'source': source, 'dest': dest} for source, dest in copy_fields],
+    }
+
+
+# title hat eigene Hilfsfelder; all_ngram sammelt title und publisher; *_t wird per Muster kopiert
+LIBRARY_SCHEMA = _schema(
+    fields=[('title', 'text_general'), ('title_ngram', 'text_ngram'), ('title_edge', 'text_edge'),
+            ('publisher', 'text_general'), ('all_ngram', 'text_ngram'), ('signature', 'string'),
+            ('notes', 'text_rev'), ('t_ngram', 'text_ngram'), ('subject', 'text_general'),
+            ('subject_edge', 'text_edge_words'), ('signature_edge', 'text_edge')],
+    copy_fields=[('title', 'title_ngram'), ('title', 'title_edge'), ('title', 'all_ngram'),
+                 ('publisher', 'all_ngram'), ('*_t', 't_ngram'), ('subject', 'subject_edge'),
+                 ('signature', 'signature_edge')],
+    dynamic_fields=[('*_t', 'text_general')],
+)
+
+# Wie oben, aber title hat nur das gemeinsame N-Gram-Feld
+SHARED_ONLY_SCHEMA = _schema(
+    fields=[('title', 'text_general'), ('publisher', 'text_general'), ('all_ngram', 'text_ngram')],
+    copy_fields=[('title', 'all_ngram'), ('publisher', 'all_ngram')],
+)
+
+
+@pytest.mark.parametrize('field, term, strategy, query', [
+    # Teilstring im Gram-Bereich -> Term-Abfrage auf dem eigenen N-Gram-Feld
+    ('title', 'Mül', 'ngram', 'title_ngram:"mül"'),
+    ('title', 'Müller-Lüdenscheidt', 'wildcard', 'title:*Müller\\-Lüdenscheidt*'),
+    # Präfix -> Edge-N-Gram-Feld, ohne solches Feld eine Präfix-Abfrage
+    ('subject', 'Geschi*', 'edge', 'subject_edge:"geschi"'),
+    ('signature', 'AB-1*', 'edge', 'signature_edge:"ab-1"'),
+    ('subject', 'G*', 'prefix', 'subject:g*'),
+    ('publisher', 'Verl*', 'prefix', 'publisher:verl*'),
+    # Edge-N-Grams über den ganzen Wert passen nicht zum Wortanfang eines tokenisierten Feldes
+    ('title', 'Müller*', 'prefix', 'title:müller*'),
+    # Führender Stern -> Reversed-Wildcard-Feld, sonst Wildcard nur vorne
+    ('notes', '*ller', 'reversed', 'notes:*ller'),
+    ('title', '*ller', 'wildcard', 'title:*ller'),
+    # Mehrere Wörter
+    ('title', 'zwei worte', 'ngram', 'title_ngram:"zwei worte"'),
+    ('publisher', 'zwei worte', 'phrase', 'publisher:"zwei worte"'),
+    ('signature', 'zwei worte', 'wildcard', 'signature:*zwei\\ worte*'),
+    # Kurze Begriffe unterhalb minGramSize
+    ('title', 'Mü', 'wildcard', 'title:*Mü*'),
+    # Sonderzeichen und leere Eingabe
+    ('signature', 'a:b', 'wildcard', 'signature:*a\\:b*'),
+    ('title', '*', 'wildcard', 'title:*'),
+    # Maskierter Stern ist ein Zeichen, kein Platzhalter
+    ('signature', 'AB\\*', 'wildcard', 'signature:*AB\\**'),
+    ('publisher', 'C\\**', 'prefix', 'publisher:c\\**'),
+])
+def test_strategy_per_term_shape(field, term, strategy, query):
+    plan = QueryPlanner(LIBRARY_SCHEMA).plan(field, term)
+    assert (plan.strategy, plan.query) == (strategy, query)
+
+
+def test_shared_copy_field_target_is_not_used():
+    """all_ngram enthält auch publisher: eine Suche in title darf es nicht verwenden."""
+    planner = QueryPlanner(SHARED_ONLY_SCHEMA)
+    assert planner.plan('title', 'Mül').query == 'title:*Mül*'
+    assert planner.plan('publisher', 'Mül').query == 'publisher:*Mül*'
+    assert [name for name, _ in planner.candidates('title')] == ['title']
+
+
+def test_exclusive_target_is_preferred_over_shared_one():
+    planner = QueryPlanner(LIBRARY_SCHEMA)
+    assert [name for name, _ in planner.candidates('title')] == ['title', 'title_ngram', 'title_edge']
+    assert planner.plan('title', 'Mül').search_field == 'title_ngram'
+
+
+def test_pattern_source_is_not_exclusive():
+    """Ein per Muster (*_t) befülltes Ziel sammelt beliebig viele Felder."""
+    plan = QueryPlanner(LIBRARY_SCHEMA).plan('description_t', 'abcd')
+    assert (plan.strategy, plan.query) == ('wildcard', 'description_t:*abcd*')
+
+
+def test_label_names_the_helper_field():
+    plan = QueryPlanner(LIBRARY_SCHEMA).plan('title', 'Mül')
+    assert plan.label == 'N-Gram-Feld (title_ngram)'
@@ -0,0 +1,73 @@
+"""
+Tests für die Datensatz-Ansicht gegen den Fake-Solr aus benchmarks/: Feldgruppen und
+Wertseiten großer Dokumente lesen nur die Felder, die sie anzeigen.
+"""
+import re
+
+import pytest
+
+from benchmarks.synthetic_core import SyntheticCore
+from solr_helper.web.utils.helpers import FIELD_GROUP_SIZE, VALUE_PAGE_SIZE
+
+DOC_ID = 'sammlung/json'  # Endet wie die frühere JSON-Route
+
+
+@pytest.fixture
+def core():
+    core = SyntheticCore('a', 10)
+    big = {'id': DOC_ID, 'begriffe_ss': [f'schlagwort {i}' for i in range(VALUE_PAGE_SIZE * 3)]}
+    big.update({f'feld{i:03d}_t': 'text ' * 400 for i in range(FIELD_GROUP_SIZE * 3)})
+    core.update([big], versions=False)
+    return core
+
+
+@pytest.fixture
+def client(core, web_client, monkeypatch):
+    # Das Dokument ist größer als ein Viertel davon und wird nicht gecacht
+    monkeypatch.setenv('SOLRHELPER_DOCUMENT_CACHE_MAX_BYTES', '100000')
+    requested = []
+    get = core.get
+    monkeypatch.setattr(core, 'get', lambda ids, fl=None: requested.append(fl) or get(ids, fl))
+    test_client = web_client({'a': core})
+    test_client.requested = requested
+    return test_client
+
+
+def _next_url(html, endpoint):
+    return re.search(rf'hx-get="(/record-part/{endpoint}\?[^"]+)"', html).group(1).replace('&amp;', '&')
+
+
+def test_id_ending_like_an_htmx_route_shows_the_record(client):
+    response = client.get(f'/record/{DOC_ID}')
+    assert response.status_code == 200
+    assert 'Rohes JSON umschalten' in response.text
+    assert f'{FIELD_GROUP_SIZE * 3 + 3} Felder' in response.text
+
+
+def test_field_groups_fetch_only_their_fields(client):
+    html = client.get(f'/record/{DOC_ID}').text
+    client.requested.clear()
+
+    response = client.get(_next_url(html, 'fields'))
+    assert response.status_code == 200
+    assert len(client.requested) == 1
+    requested = client.requested[0].split(',')
+    assert len(requested) <= FIELD_GROUP_SIZE + 2  # Gruppe plus Unique Key und _version_
+    assert requested[2] in response.text
+
+
+def test_value_pages_fetch_only_their_field(client):
+    html = client.get(f'/record/{DOC_ID}').text
+    client.requested.clear()
+
+    response = client.get(_next_url(html, 'values'))
+    assert response.status_code == 200
+    assert client.requested == ['id,_version_,begriffe_ss']
+    assert f'schlagwort {VALUE_PAGE_SIZE}<' in response.text
+    assert f'schlagwort {VALUE_PAGE_SIZE * 2}<' not in response.text
+
+
+def test_raw_json_is_loaded_on_demand(client):
+    response = client.get('/record-part/json', query_string={'id': DOC_ID})
+    assert response.status_code == 200
+    assert 'schlagwort 0' in response.text
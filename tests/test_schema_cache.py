@@ -0,0 +1,61 @@
+"""
+Tests für die Revalidierung des Schema-Caches (ohne Solr).
+"""
+import pytest
+
+from solr_helper.schema_cache import SchemaCache
+
+
+class FakeClient:
+    core_url = 'http://solr.example/solr/books'
+
+    def __init__(self, zk_version=None):
+        self.zk_version = zk_version
+        self.schema = {'unique_key': 'id', 'fields': [{'name': 'id', 'type': 'string'}],
+                       'field_types': [{'name': 'string', 'class': 'solr.StrField'}]}
+        self.fetches = 0
+
+    def get_schema_fingerprint(self):
+        return None if self.zk_version is None else f"zk:{self.zk_version}"
+
+    def fetch_schema(self):
+        self.fetches += 1
+        return {key: list(value) if isinstance(value, list) else value for key, value in self.schema.items()}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SchemaCache(cache_dir=tmp_path, revalidate_after=0)
+
+
+def test_standalone_detects_schema_api_changes_including_field_types(cache):
+    client = FakeClient()
+    first = cache.get(client)
+    assert cache.get(client) is first  # Unverändert: bestehender Eintrag
+
+    client.schema['field_types'] = client.schema['field_types'] + [{'name': 'text', 'class': 'solr.TextField'}]
+    assert len(cache.get(client)['field_types']) == 2
+    assert client.fetches == 3  # Eine Anfrage pro Revalidierung, kein zweites Laden
+
+
+def test_cloud_fetches_only_when_zk_version_changes(cache):
+    client = FakeClient(zk_version=4)
+    cache.get(client)
+    cache.get(client)
+    assert client.fetches == 1
+
+    client.zk_version = 5
+    client.schema['fields'] = client.schema['fields'] + [{'name': 'title', 'type': 'text'}]
+    assert [f['name'] for f in cache.get(client)['fields']] == ['id', 'title']
+    assert client.fetches == 2
+
+
+def test_cached_schema_is_used_when_solr_is_down(cache):
+    client = FakeClient()
+    schema = cache.get(client)
+
+    def unreachable():
+        raise ConnectionError('Solr nicht erreichbar')
+
+    client.fetch_schema = unreachable
+    assert cache.get(client) == schema
@@ -0,0 +1,64 @@
+"""
+Tests für den Such-Cache: Generationen, Sperre bis zum Commit und Größenbegrenzung.
+"""
+import time
+
+import pytest
+
+from solr_helper.search_cache import SearchCache
+
+CORE = 'http://solr.example/solr/books'
+
+
+@pytest.fixture
+def cache():
+    return SearchCache(max_bytes=1000, ttl=60)
+
+
+def _key(query, core=CORE):
+    return (core, query, 'title', 10, 0, None, 'id', 'results')
+
+
+def test_result_from_before_an_invalidation_is_not_stored(cache):
+    generation = cache.generation(CORE)
+    cache.invalidate(CORE)  # Update, während die Suche noch lief
+    cache.put(_key('buch'), {'docs': []}, 10, generation)
+    assert cache.get(_key('buch')) is None
+
+    cache.put(_key('buch'), {'docs': []}, 10, cache.generation(CORE))
+    assert cache.get(_key('buch')) == {'docs': []}
+
+
+def test_invalidation_only_affects_its_core(cache):
+    other = 'http://solr.example/solr/films'
+    cache.put(_key('buch'), 1, 10, cache.generation(CORE))
+    cache.put(_key('buch', other), 2, 10, cache.generation(other))
+    cache.invalidate(CORE)
+    assert cache.get(_key('buch')) is None
+    assert cache.get(_key('buch', other)) == 2
+
+
+def test_nothing_is_stored_until_a_pending_write_is_visible(cache):
+    cache.invalidate(CORE, pending_for=0.05)  # z.B. commitWithin=50
+    cache.put(_key('buch'), 'alt', 10, cache.generation(CORE))
+    assert cache.get(_key('buch')) is None
+
+    time.sleep(0.06)
+    cache.put(_key('buch'), 'neu', 10, cache.generation(CORE))
+    assert cache.get(_key('buch')) == 'neu'
+
+
+def test_commit_lifts_the_pending_block(cache):
+    cache.invalidate(CORE, pending_for=60)
+    cache.invalidate(CORE, pending_for=0)
+    cache.put(_key('buch'), 'neu', 10, cache.generation(CORE))
+    assert cache.get(_key('buch')) == 'neu'
+
+
+def test_size_limit_evicts_oldest_and_skips_huge_results(cache):
+    for i in range(5):
+        cache.put(_key(f'q{i}'), i, 240, cache.generation(CORE))
+    assert cache.get(_key('q0')) is None
+    assert cache.get(_key('q4')) == 4
+    cache.put(_key('riesig'), 'x', 300, cache.generation(CORE))  # > max_bytes / 4
+    assert cache.get(_key('riesig')) is None
@@ -0,0 +1,61 @@
+"""
+Tests für die Suchvorschau und die Ergebnisseite aus gestreamten Templates gegen den Fake-Solr.
+"""
+from benchmarks.synthetic_core import SyntheticCore
+from solr_helper.search_cache import search_cache
+
+HOSTILE_ID = '<script>alert(1)</script>'
+
+
+def _core():
+    core = SyntheticCore('books', 20)
+    core.update([{'id': HOSTILE_ID, 'title': 'zauberwort im titel'}], versions=False)
+    return core
+
+
+def _preview(client, query, field='title'):
+    return client.post('/api/search', data={'search_type': 'text', 'search_field': field,
+                                            'search_query': query}).get_data(as_text=True)
+
+
+def test_preview_escapes_document_values_and_the_query(web_client):
+    client = web_client({'books': _core()})
+    html = _preview(client, 'zauberwort')
+    assert 'Suchergebnisse' in html
+    assert HOSTILE_ID not in html
+    assert '&lt;script&gt;alert(1)&lt;/script&gt;' in html
+
+    html = _preview(client, '<b>nirgends</b>')
+    assert '<b>nirgends</b>' not in html
+    assert '&lt;b&gt;nirgends&lt;/b&gt;' in html
+
+
+def test_preview_fragment_is_cached_until_the_core_changes(web_client):
+    client = web_client({'books': _core()})
+    first = _preview(client, 'zauberwort')
+    requests_before = client.server.requests
+    assert _preview(client, ' zauberwort ') == first
+    assert client.server.requests == requests_before
+
+    search_cache.invalidate(f'{client.server.url}/books')
+    assert _preview(client, 'zauberwort') == first
+    assert client.server.requests > requests_before
+
+
+def _text(chunk):
+    return chunk.decode() if isinstance(chunk, bytes) else chunk
+
+
+def test_result_page_sends_the_head_before_searching(web_client):
+    client = web_client({'books': _core()})
+    requests_before = client.server.requests
+    response = client.get('/search-results?query=zauberwort&field=title', buffered=False)
+    chunks = iter(response.response)
+    first = _text(next(chunks))
+    assert '<head' in first and 'zauberwort im titel' not in first
+    assert client.server.requests == requests_before
+
+    rest = ''.join(_text(chunk) for chunk in chunks)
+    response.close()
+    assert client.server.requests > requests_before
+    assert '&lt;script&gt;' in rest and HOSTILE_ID not in rest
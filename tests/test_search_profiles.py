@@ -0,0 +1,68 @@
+"""
+Tests für die Antwortprofile: Feldliste und Highlighting je Ansicht.
+"""
+import pytest
+
+from benchmarks.fake_solr import FakeSolrServer
+from benchmarks.synthetic_core import SyntheticCore
+from solr_helper.search_profiles import ResponseStats, get_profile, highlight_offset_source
+from solr_helper.solr_client import SolrClient
+
+SCHEMA = {
+    'fields': [{'name': 'id', 'type': 'string'},
+               {'name': 'title', 'type': 'text', 'storeOffsetsWithPositions': True},
+               {'name': 'body', 'type': 'text_tv'},
+               {'name': 'notes', 'type': 'text'}],
+    'dynamic_fields': [],
+    'field_types': [{'name': 'string', 'class': 'solr.StrField'},
+                    {'name': 'text', 'class': 'solr.TextField'},
+                    {'name': 'text_tv', 'class': 'solr.TextField', 'termVectors': 'true',
+                     'termPositions': 'true', 'termOffsets': 'true'}],
+}
+
+
+@pytest.mark.parametrize('profile', ['preview', 'results'])
+def test_list_views_load_only_key_and_searched_field(profile):
+    params = get_profile(profile).params('id', 'title', SCHEMA)
+    assert params['fl'] == 'id,title'
+    assert params['hl.fl'] == 'title'
+    assert params['hl.requireFieldMatch'] == 'true'
+    assert params['hl.offsetSource'] == 'POSTINGS'
+
+
+def test_full_profile_loads_all_fields():
+    params = get_profile('full').params('id', 'title')
+    assert 'fl' not in params
+    assert params['hl.requireFieldMatch'] == 'false'
+    assert get_profile(None).name == 'full'
+    with pytest.raises(ValueError):
+        get_profile('kompakt')
+
+
+def test_offset_source_follows_the_schema():
+    assert highlight_offset_source('title', SCHEMA) == 'POSTINGS'
+    assert highlight_offset_source('body', SCHEMA) == 'TERM_VECTORS'
+    assert highlight_offset_source('notes', SCHEMA) is None
+    assert highlight_offset_source('fehlt', SCHEMA) is None
+
+
+def test_stats_report_savings_against_full_documents():
+    stats = ResponseStats()
+    stats.record('full', 10000, 10)
+    stats.record('results', 2500, 10)
+    snapshot = stats.snapshot()
+    assert snapshot['results']['bytes_per_doc'] == 250
+    assert snapshot['results']['saved_percent'] == 75.0
+    assert 'saved_percent' not in snapshot['full']
+
+
+def test_result_list_search_transfers_only_the_projected_fields():
+    core = SyntheticCore('a', 50)
+    word = core.docs[0]['title'].split()[0]
+    with FakeSolrServer({'a': core}) as server:
+        client = SolrClient(server.url, 'a')
+        results = client.search_documents(word, field='title', rows=5, profile='results')
+        full = client.search_documents(word, field='title', rows=5, profile='full')
+    assert results['docs'] and all(set(doc) <= {'id', 'title'} for doc in results['docs'])
+    assert results['profile'] == 'results'
+    assert all('author_s' in doc for doc in full['docs'])
@@ -0,0 +1,120 @@
+"""
+Tests für den Produktivbetrieb: Auswahl des WSGI-Servers, Zurücksetzen nach einem Fork und
+geordnetes Beenden unter waitress.
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+from benchmarks.fake_solr import FakeSolrServer
+from benchmarks.synthetic_core import SyntheticCore
+from solr_helper import document_cache, server, solr_client, transport
+from solr_helper.server import choose_server, reset_after_fork
+
+SRC = Path(__file__).resolve().parents[1] / 'src'
+
+
+@pytest.mark.parametrize('requested, workers, installed, expected', [
+    ('auto', 1, ['waitress', 'gunicorn'], 'waitress'),
+    ('auto', 4, ['waitress', 'gunicorn'], 'gunicorn'),
+    ('auto', 1, ['gunicorn'], 'gunicorn'),
+    ('gunicorn', 1, ['waitress', 'gunicorn'], 'gunicorn'),
+])
+def test_choose_server(monkeypatch, requested, workers, installed, expected):
+    monkeypatch.setattr(server, 'available_servers', lambda: installed)
+    assert choose_server(requested, workers) == expected
+
+
+@pytest.mark.parametrize('requested, workers, installed', [
+    ('auto', 1, []),
+    ('gunicorn', 2, ['waitress']),
+    ('waitress', 2, ['waitress', 'gunicorn']),
+    ('auto', 2, ['waitress']),
+])
+def test_unsuitable_server_is_refused(monkeypatch, requested, workers, installed):
+    monkeypatch.setattr(server, 'available_servers', lambda: installed)
+    with pytest.raises(RuntimeError):
+        choose_server(requested, workers)
+
+
+def test_reset_after_fork_replaces_sessions_and_pools(monkeypatch, tmp_path):
+    monkeypatch.setenv('SOLRHELPER_SCHEMA_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(solr_client, '_clients', type(solr_client._clients)())
+    with FakeSolrServer({'a': SyntheticCore('a', 20)}) as fake:
+        inherited_session = transport.get_session(fake.url)
+        inherited_pool = document_cache._prefetch_pool
+        reset_after_fork()
+
+        assert transport.get_session(fake.url) is not inherited_session
+        assert document_cache._prefetch_pool is not inherited_pool
+        client = solr_client.get_client(fake.url, 'a')
+        assert client.get_document_by_id('id', 'doc0000001', use_cache=False)['id'] == 'doc0000001'
+        client.prefetch_documents('id', ['doc0000002']).result(timeout=5)
+        requests_before = fake.requests
+        assert client.get_document_by_id('id', 'doc0000002')['id'] == 'doc0000002'
+        assert fake.requests == requests_before
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f'Port {port} nicht erreichbar')
+
+
+def test_waitress_finishes_running_requests_on_sigterm():
+    pytest.importorskip('waitress')
+    port = _free_port()
+    script = textwrap.dedent(f"""
+        import time
+        from flask import Flask
+        from solr_helper.server import serve
+
+        app = Flask('langsam')
+
+        @app.route('/langsam')
+        def langsam():
+            time.sleep(1)
+            return 'fertig'
+
+        serve(app, '127.0.0.1', {port}, server='waitress', threads=2, graceful_timeout=5)
+    """)
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    process = subprocess.Popen([sys.executable, '-c', script], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_for_port(port)
+        responses = []
+        request = threading.Thread(
+            target=lambda: responses.append(requests.get(f'http://127.0.0.1:{port}/langsam', timeout=10)))
+        request.start()
+        time.sleep(0.3)
+        process.send_signal(signal.SIGTERM)
+        request.join(10)
+
+        assert [r.text for r in responses] == ['fertig']
+        assert process.wait(10) == 0
+        with pytest.raises(requests.ConnectionError):
+            requests.get(f'http://127.0.0.1:{port}/langsam', timeout=2)
+    finally:
+        if process.poll() is None:
+            process.kill()
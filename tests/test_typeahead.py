@@ -0,0 +1,85 @@
+"""
+Tests für Feldnamen- und Wertvorschläge (ohne Solr).
+"""
+import pytest
+
+from solr_helper.typeahead import FieldIndex, ValueSuggestions
+
+SCHEMA = {
+    'fields': [{'name': 'id', 'type': 'string'},
+               {'name': 'title', 'type': 'text'},
+               {'name': 'author_txt', 'type': 'text'},
+               {'name': 'internal_blob', 'type': 'binary', 'indexed': False}],
+    'dynamic_fields': [{'name': '*_txt', 'type': 'text', 'multiValued': True},
+                       {'name': 'attr_*', 'type': 'string'}],
+    'field_types': [],
+}
+
+
+@pytest.fixture
+def index():
+    return FieldIndex(SCHEMA)
+
+
+def _names(suggestions):
+    return [s['name'] for s in suggestions]
+
+
+def test_name_start_ranks_before_name_segments(index):
+    assert _names(index.suggest('tit')) == ['title']
+    assert _names(index.suggest('txt')) == ['*_txt', 'author_txt']
+    assert _names(index.suggest('AUT')) == ['author_txt']
+
+
+def test_unindexed_fields_are_not_suggested(index):
+    assert index.suggest('internal') == []
+    assert 'internal_blob' not in _names(index.suggest(''))
+
+
+def test_dynamic_match_is_suggested_as_concrete_field(index):
+    first = index.suggest('verlag_txt')[0]
+    assert (first['name'], first['pattern'], first['multiValued']) == ('verlag_txt', '*_txt', True)
+    assert _names(index.suggest('attr_farbe'))[0] == 'attr_farbe'
+
+
+def test_index_is_built_once_per_schema_object():
+    assert FieldIndex.for_schema(SCHEMA) is FieldIndex.for_schema(SCHEMA)
+    assert FieldIndex.for_schema(dict(SCHEMA)) is not FieldIndex.for_schema(SCHEMA)
+
+
+class FakeClient:
+    core_url = 'http://solr.example/solr/books'
+
+    def __init__(self, values):
+        self.values = values
+        self.requests = []
+
+    def suggest_values(self, field, prefix, limit):
+        self.requests.append(prefix)
+        return [(value, count) for value, count in self.values if value.startswith(prefix)][:limit]
+
+
+def test_longer_prefix_is_filtered_from_a_complete_shorter_result():
+    client = FakeClient([('goethe', 9), ('gogol', 4), ('grass', 2)])
+    suggestions = ValueSuggestions()
+    assert suggestions.get(client, 'author', 'g', 10) == [('goethe', 9), ('gogol', 4), ('grass', 2)]
+    assert suggestions.get(client, 'author', 'go', 10) == [('goethe', 9), ('gogol', 4)]
+    assert suggestions.get(client, 'author', 'goe', 5) == [('goethe', 9)]
+    assert client.requests == ['g']
+    assert suggestions.stats()['hits'] == 2
+
+
+def test_truncated_result_is_not_reused_for_longer_prefixes():
+    client = FakeClient([(f'wert{i:02d}', 1) for i in range(30)])
+    suggestions = ValueSuggestions()
+    suggestions.get(client, 'tag', 'w', 10)  # Abgeschnitten: es gibt mehr als 10 Werte
+    assert suggestions.get(client, 'tag', 'wert2', 10)[0] == ('wert20', 1)
+    assert client.requests == ['w', 'wert2']
+
+
+def test_expired_entries_ask_solr_again():
+    client = FakeClient([('goethe', 9)])
+    suggestions = ValueSuggestions(ttl=0)
+    suggestions.get(client, 'author', 'g', 10)
+    suggestions.get(client, 'author', 'g', 10)
+    assert client.requests == ['g', 'g']